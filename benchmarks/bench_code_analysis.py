@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark for code analysis: single-pass if nesting against the previous
+per-node recount on deeply nested modules.
+
+Run from the repository root: python benchmarks/bench_code_analysis.py [functions]
+"""
+
+import sys
+import os
+import ast
+import time
+from typing import List, Tuple
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.code_analysis import MAX_IF_NESTING, CodeAnalysisResult, _AnalysisVisitor
+
+
+def count_nested_level(node, current_level=0):
+    """Previous per-node nesting count (quadratic overall)"""
+    if isinstance(node, ast.If):
+        current_level += 1
+        max_level = current_level
+        
+        for child in ast.iter_child_nodes(node):
+            max_level = max(max_level, count_nested_level(child, current_level))
+        
+        return max_level
+    
+    max_level = current_level
+    for child in ast.iter_child_nodes(node):
+        max_level = max(max_level, count_nested_level(child, current_level))
+    
+    return max_level
+
+
+def deep_ifs_quadratic(tree) -> List[Tuple[int, int]]:
+    """Previous deep-if detection"""
+    deep_ifs = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.If):
+            nested_level = count_nested_level(node)
+            if nested_level > MAX_IF_NESTING:
+                deep_ifs.append((node.lineno, nested_level))
+    return sorted(deep_ifs)
+
+
+def generate_nested_module(functions: int, depth: int) -> str:
+    """Generate a module of functions with deeply nested if statements"""
+    lines = []
+    for f in range(functions):
+        lines.append(f"def func_{f}(x):")
+        for level in range(depth):
+            indent = '    ' * (level + 1)
+            lines.append(f"{indent}value_{level} = x + {level}")
+            lines.append(f"{indent}if x > {level}:")
+        lines.append('    ' * (depth + 1) + "return x")
+    return '\n'.join(lines) + '\n'
+
+
+# Benchmark linear nesting computation against the previous per-node recount
+if __name__ == "__main__":
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    
+    for depth in (10, 30, 60, 90):
+        code = generate_nested_module(functions, depth)
+        tree = ast.parse(code)
+        
+        start = time.perf_counter()
+        expected = deep_ifs_quadratic(tree)
+        old_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        result = CodeAnalysisResult()
+        _AnalysisVisitor(result).visit(tree)
+        new_time = time.perf_counter() - start
+        
+        assert sorted(result.deep_ifs) == expected
+        print(f"depth {depth:3d}: per-node recount {old_time * 1000:8.1f} ms, "
+              f"single pass {new_time * 1000:6.1f} ms ({old_time / new_time:5.1f}x)")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for code generation: linear scaling against the previous
+if/elif generator, incremental regeneration and streaming peak memory.
+
+Run from the repository root: python benchmarks/bench_code_generator.py
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, List, Sequence
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.code_generator import (FOOTER_TEMPLATE, HEADER_TEMPLATE, IncrementalCodeGenerator, apply_code_edits,
+                                 generate_gui_code, generate_gui_code_to)
+
+
+def generate_gui_code_legacy(project_name: str, widgets: Sequence[Dict[str, Any]],
+                             generated_at: datetime) -> str:
+    """Previous if/elif implementation, the reference output for generate_gui_code"""
+    code_lines = HEADER_TEMPLATE.format(
+        date=generated_at.strftime("%Y-%m-%d %H:%M:%S"),
+        class_name=project_name.replace(' ', '_'),
+        title=project_name
+    ).split('\n')[:-1]
+    
+    for i, widget in enumerate(widgets):
+        widget_type = widget.get('type', 'QPushButton')
+        widget_name = widget.get('name', f'widget_{i+1}')
+        widget_text = widget.get('text', widget_name)
+        
+        if widget_type == 'QPushButton':
+            code_lines.append(f"        {widget_name} = QPushButton('{widget_text}')")
+            code_lines.append(f"        main_layout.addWidget({widget_name})")
+        elif widget_type == 'Label':
+            code_lines.append(f"        {widget_name} = QLabel('{widget_text}')")
+            code_lines.append(f"        main_layout.addWidget({widget_name})")
+        elif widget_type == 'Text Edit':
+            code_lines.append(f"        {widget_name} = QTextEdit()")
+            code_lines.append(f"        {widget_name}.setPlaceholderText('{widget_text}')")
+            code_lines.append(f"        main_layout.addWidget({widget_name})")
+        elif widget_type == 'Line Edit':
+            code_lines.append(f"        {widget_name} = QLineEdit()")
+            code_lines.append(f"        {widget_name}.setPlaceholderText('{widget_text}')")
+            code_lines.append(f"        main_layout.addWidget({widget_name})")
+        elif widget_type == 'Check Box':
+            code_lines.append(f"        {widget_name} = QCheckBox('{widget_text}')")
+            code_lines.append(f"        main_layout.addWidget({widget_name})")
+        
+        if widget_type == 'QPushButton':
+            code_lines.append(f"        {widget_name}.clicked.connect(self.on_{widget_name}_clicked)")
+    
+    for i, widget in enumerate(widgets):
+        widget_type = widget.get('type', 'QPushButton')
+        widget_name = widget.get('name', f'widget_{i+1}')
+        
+        if widget_type == 'QPushButton':
+            code_lines.append("")
+            code_lines.append(f"    def on_{widget_name}_clicked(self):")
+            code_lines.append(f"        \"\"\"Handle {widget_name} click\"\"\"")
+            code_lines.append(f"        print('{widget_name} clicked')")
+    
+    code_lines.extend(FOOTER_TEMPLATE.format(class_name=project_name.replace(' ', '_')).split('\n'))
+    return '\n'.join(code_lines)
+
+
+def sample_widgets(count: int) -> List[Dict[str, Any]]:
+    """Build a design mixing all widget types"""
+    types = ['QPushButton', 'Label', 'Text Edit', 'Line Edit', 'Check Box', 'Slider']
+    return [{'id': f'widget_{i+1}', 'type': types[i % len(types)], 'name': f'widget_{i+1}',
+             'text': f'Item {i+1}'} for i in range(count)]
+
+
+# Benchmark: linear scaling and output identical to the previous implementation
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+    
+    generated_at = datetime(2024, 1, 1)
+    per_widget = {}
+    
+    for count in (1000, 10000, 100000):
+        widgets = sample_widgets(count)
+        
+        start = time.perf_counter()
+        expected = generate_gui_code_legacy('Bench Project', widgets, generated_at)
+        legacy_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        code = generate_gui_code('Bench Project', widgets, generated_at)
+        new_time = time.perf_counter() - start
+        
+        assert code == expected
+        per_widget[count] = new_time / count
+        print(f"{count:7d} widgets: legacy {legacy_time * 1000:8.1f} ms, "
+              f"emitters {new_time * 1000:8.1f} ms ({len(code) // 1024} KiB)")
+    
+    # Time per widget must stay flat as designs grow
+    assert per_widget[100000] < per_widget[10000] * 2, "code generation does not scale linearly"
+    print("✓ Linear scaling")
+    
+    # Incremental regeneration after a single widget edit
+    widgets = sample_widgets(10000)
+    generator = IncrementalCodeGenerator()
+    previous = generator.generate('Bench Project', widgets, generated_at).code
+    widgets[0]['text'] = 'Renamed'
+    
+    start = time.perf_counter()
+    update = generator.generate('Bench Project', widgets, generated_at)
+    incremental_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    code = generate_gui_code('Bench Project', widgets, generated_at)
+    full_time = time.perf_counter() - start
+    
+    assert update.code == code
+    assert apply_code_edits(previous, update.edits) == code
+    assert update.regenerated == 1 and len(update.edits) == 1
+    edit_size = sum(len(edit.text) for edit in update.edits)
+    print(f"  10000 widgets, one edit: full {full_time * 1000:.1f} ms, "
+          f"incremental {incremental_time * 1000:.1f} ms "
+          f"({update.regenerated} fragment, {edit_size} of {len(code)} chars in {len(update.edits)} edit)")
+    
+    # Peak memory: in-memory generation vs streaming to a file
+    widgets = sample_widgets(100000)
+    bench_dir = tempfile.mkdtemp(prefix='code_generator_bench_')
+    bench_path = os.path.join(bench_dir, 'generated.py')
+    try:
+        tracemalloc.start()
+        code = generate_gui_code_legacy('Bench Project', widgets, generated_at)
+        legacy_peak = tracemalloc.get_traced_memory()[1]
+        del code
+        tracemalloc.reset_peak()
+        
+        base = tracemalloc.get_traced_memory()[0]
+        generate_gui_code_to(bench_path, 'Bench Project', widgets, generated_at)
+        stream_peak = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        
+        with open(bench_path, 'r', encoding='utf-8') as f:
+            assert f.read() == generate_gui_code('Bench Project', widgets, generated_at)
+        print(f" 100000 widgets peak memory: join {legacy_peak / 2**20:.1f} MiB, "
+              f"streamed {stream_peak / 2**20:.1f} MiB")
+        assert stream_peak < legacy_peak / 4
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the command dispatcher: history memory and trimming,
+coalescing, command logs, undo_many and the async lane.
+
+Run from the repository root: python benchmarks/bench_command_dispatcher.py
+"""
+
+import sys
+import os
+from collections import deque
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.command_dispatcher import (COALESCE_WINDOW, HISTORY_UNCOMPACTED, AddWidgetCommand, AddWidgetsCommand,
+                                     AnalyzeCodeCommand, Command, CommandDispatcher, GenerateCodeCommand,
+                                     MoveWidgetsCommand, RemoveWidgetsCommand, UpdateWidgetCommand,
+                                     UpdateWidgetsCommand)
+
+
+class ListHistoryDispatcher(CommandDispatcher):
+    """Previous list history trimmed with pop(0) and no byte budget"""
+    
+    def __init__(self, max_history: int = 100):
+        super().__init__(max_history)
+        self.command_history = []
+    
+    def _push_history(self, command: Command):
+        self.command_history.append(command)
+        if len(self.command_history) > self.max_history:
+            self.command_history.pop(0)
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+    from types import SimpleNamespace
+    
+    # Benchmark history memory with large generated code and analysis payloads
+    class _BenchCore:
+        def __init__(self):
+            self.revision = 0
+        
+        def generate_code_update(self, widgets=None):
+            self.revision += 1
+            code = ''.join(f"        self.widget_{i} = QPushButton('Button {i} r{self.revision}')\n"
+                           for i in range(5000))
+            return SimpleNamespace(code=code, edits=[])
+        
+        def analyze_code(self, code):
+            return {'total_lines': code.count('\n'), 'issues': [{'line': i, 'message': 'print'} for i in range(500)]}
+    
+    def fill(history_dispatcher):
+        core = _BenchCore()
+        for _ in range(50):
+            history_dispatcher.execute_command(GenerateCodeCommand(core))
+            history_dispatcher.execute_command(AnalyzeCodeCommand(core.generate_code_update().code, core))
+    
+    import contextlib
+    import io
+    
+    results = {}
+    for label, history_dispatcher in (('list', ListHistoryDispatcher(max_history=100)),
+                                      ('deque', CommandDispatcher(max_history=100))):
+        tracemalloc.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fill(history_dispatcher)
+        elapsed = time.perf_counter() - start
+        results[label] = (tracemalloc.get_traced_memory()[0], elapsed, len(history_dispatcher.command_history))
+        tracemalloc.stop()
+    
+    for label, (memory, elapsed, count) in results.items():
+        print(f"{label:5s} history: {count} commands, {memory / 2**20:6.1f} MiB, {elapsed:.2f} s")
+    
+    # Old commands still undo, and their payloads are restored on access
+    with contextlib.redirect_stdout(io.StringIO()):
+        core = _BenchCore()
+        dispatcher = CommandDispatcher()
+        for _ in range(HISTORY_UNCOMPACTED + 2):
+            dispatcher.execute_command(GenerateCodeCommand(core))
+        oldest = dispatcher.command_history[0]
+        assert oldest._code is None and 'r1' in oldest.generated_code
+    
+    # Count trimming: pop(0) on a list is O(n), popleft on a deque O(1)
+    for label, history in (('list', list(range(100000))), ('deque', deque(range(100000)))):
+        evict = history.popleft if isinstance(history, deque) else lambda: history.pop(0)
+        start = time.perf_counter()
+        for i in range(50000):
+            history.append(i)
+            evict()
+        print(f"{label:5s} trimming at 100000 commands: {(time.perf_counter() - start) / 50000 * 1e6:.2f} us per command")
+    
+    # Coalescing: a 1000-step drag becomes one history entry
+    positions = {'widget_1': (0, 0)}
+    
+    def move_widgets(new_positions):
+        previous = {widget_id: positions[widget_id] for widget_id in new_positions}
+        positions.update(new_positions)
+        return previous
+    
+    drag_core = SimpleNamespace(move_widgets=move_widgets)
+    for label, window in (('separate', 0.0), ('coalesced', COALESCE_WINDOW)):
+        history_dispatcher = CommandDispatcher(max_history=2000, coalesce_window=window)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for i in range(1000):
+                history_dispatcher.execute_command(MoveWidgetsCommand({'widget_1': (i, i)}, drag_core))
+            elapsed = time.perf_counter() - start
+            history_dispatcher.undo()
+        print(f"{label:9s} drag of 1000 moves: {len(history_dispatcher.command_history) + 1} history entries, "
+              f"{history_dispatcher.history_bytes} bytes left after one undo, {elapsed * 1000:.0f} ms; "
+              f"position after one undo {positions['widget_1']}")
+        positions['widget_1'] = (0, 0)
+    
+    # Command log: record a session, then rebuild and replay it quietly from the file
+    import tempfile
+    from core.app_core import AppCore
+    
+    log_path = os.path.join(tempfile.mkdtemp(prefix='command_log_bench_'), 'session.jsonl')
+    with contextlib.redirect_stdout(io.StringIO()):
+        session_core = AppCore()
+        session_core.project.name = 'Bench'
+        recorder = CommandDispatcher(max_history=10000)
+        recorder.start_log(log_path)
+        for i in range(500):
+            recorder.execute_command(AddWidgetCommand('QPushButton', {'text': f'Button {i}'}, session_core))
+            for step in range(5):
+                recorder.execute_command(MoveWidgetsCommand({f'widget_{i + 1}': (i + step, step)}, session_core))
+            if i % 50 == 49:
+                with recorder.transaction("Remove pair"):
+                    recorder.execute_command(RemoveWidgetsCommand([f'widget_{i}'], session_core))
+                    recorder.execute_command(UpdateWidgetsCommand({f'widget_{i + 1}': {'color': 'red'}}, session_core))
+                recorder.undo()
+                recorder.redo()
+        recorder.execute_command(GenerateCodeCommand(session_core))
+        recorder.stop_log()
+    
+    player = CommandDispatcher(max_history=10000)
+    with contextlib.redirect_stdout(io.StringIO()):
+        replay_core = AppCore()
+        replay_core.project.name = 'Bench'
+        start = time.perf_counter()
+        records = player.read_log(log_path)
+        read_time = time.perf_counter() - start
+        start = time.perf_counter()
+        player.replay(records, replay_core)
+        replay_time = time.perf_counter() - start
+    
+    # Same design (timestamps differ)
+    def design(core):
+        return [(w.id, w.type, w.position, w.size, w.properties) for w in core.project.widgets]
+    
+    assert design(replay_core) == design(session_core)
+    assert len(player.command_history) == len(recorder.command_history)
+    print(f"command log: {len(records)} operations ({os.path.getsize(log_path) / 1024:.0f} KiB) "
+          f"read in {read_time * 1000:.1f} ms, replayed quietly in {replay_time * 1000:.0f} ms, "
+          f"{len(player.command_history)} history entries as recorded")
+    
+    # Jumping back: one snapshot restore + short replay against undoing every command
+    undo_times = {}
+    for label in ('stepwise', 'snapshot'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            bench_core = AppCore()
+            bench_dispatcher = CommandDispatcher(max_history=20000, coalesce_window=0,
+                                                 core=bench_core if label == 'snapshot' else None)
+            bench_dispatcher.execute_command(AddWidgetsCommand([('QLabel', {'text': f'Label {i}'})
+                                                                for i in range(5000)], bench_core))
+            for i in range(3000):
+                widget_id = f'widget_{i % 5000 + 1}'
+                if i % 3 == 0:
+                    bench_dispatcher.execute_command(AddWidgetCommand('QPushButton', {}, bench_core))
+                elif i % 3 == 1:
+                    bench_dispatcher.execute_command(MoveWidgetsCommand({widget_id: (i, i)}, bench_core))
+                else:
+                    bench_dispatcher.execute_command(UpdateWidgetCommand(widget_id, {'color': i}, bench_core))
+            start = time.perf_counter()
+            if label == 'snapshot':
+                bench_dispatcher.undo_many(3000)
+            else:
+                for _ in range(3000):
+                    bench_dispatcher.undo()
+            undo_times[label] = (time.perf_counter() - start, design(bench_core))
+    
+    assert undo_times['stepwise'][1] == undo_times['snapshot'][1]
+    print(f"undo 3000 of 3001 steps on 5000+ widgets: stepwise {undo_times['stepwise'][0] * 1000:.0f} ms, "
+          f"snapshot + replay {undo_times['snapshot'][0] * 1000:.0f} ms")
+    
+    # Async lane: analyses of 4 large sources, time the caller is blocked and
+    # total time; results must enter the history in submission order
+    sources = [''.join(f"def function_{i}_{j}(value):\n    return value * {j}  # scale\n"
+                       for j in range(5000)) for i in range(4)]
+    lane_core = AppCore()
+    lane_times = {}
+    for label in ('synchronous', 'threads', 'processes'):
+        lane_dispatcher = CommandDispatcher(core=lane_core, use_processes=label == 'processes')
+        with contextlib.redirect_stdout(io.StringIO()):
+            if label == 'processes':
+                lane_dispatcher._executor('process').submit(int).result()  # Start workers untimed
+            labelled_sources = [source + f'# {label}\n' for source in sources]
+            start = time.perf_counter()
+            if label == 'synchronous':
+                for source in labelled_sources:
+                    lane_dispatcher.execute_command(AnalyzeCodeCommand(source, lane_core))
+                blocked = time.perf_counter() - start
+            else:
+                futures = [lane_dispatcher.execute_async(AnalyzeCodeCommand(source, lane_core))
+                           for source in labelled_sources]
+                blocked = time.perf_counter() - start
+                assert all(future.result().success for future in futures)
+            total = time.perf_counter() - start
+            lane_dispatcher.shutdown()
+        assert [command.code for command in lane_dispatcher.command_history] == labelled_sources, label
+        lane_times[label] = (blocked, total)
+    for label, (blocked, total) in lane_times.items():
+        print(f"{label:11s} analysis of 4 x 10000-line sources: caller blocked {blocked * 1000:6.1f} ms, "
+              f"done after {total * 1000:6.0f} ms")
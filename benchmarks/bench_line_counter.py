@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark for line counting: binary chunk counting and the process pool
+against decoding files with readlines().
+
+Run from the repository root: python benchmarks/bench_line_counter.py [files]
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.line_counter import count_lines_many
+
+
+def count_lines_readlines(file_path: str) -> int:
+    """Previous approach: decode the file and count readlines()"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return len(f.readlines())
+    except:
+        return 0
+
+
+# Benchmark against the readlines() approach
+if __name__ == "__main__":
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    processes = os.cpu_count() or 1
+    
+    bench_dir = tempfile.mkdtemp(prefix='line_counter_bench_')
+    try:
+        paths = []
+        sample = "def handler(value):\n    return value * 2  # sample line\n" * 100
+        for i in range(file_count):
+            sub_dir = os.path.join(bench_dir, f"pkg_{i // 500}")
+            os.makedirs(sub_dir, exist_ok=True)
+            path = os.path.join(sub_dir, f"module_{i}.py")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(sample)
+            paths.append(path)
+        
+        print(f"Benchmark: {file_count} files, {len(sample)} bytes each")
+        
+        start = time.perf_counter()
+        expected = [count_lines_readlines(path) for path in paths]
+        print(f"  readlines():         {time.perf_counter() - start:.3f}s")
+        
+        start = time.perf_counter()
+        result = count_lines_many(paths)
+        print(f"  count_lines():       {time.perf_counter() - start:.3f}s")
+        assert result == expected
+        
+        start = time.perf_counter()
+        result = count_lines_many(paths, processes=processes)
+        print(f"  process pool ({processes}):   {time.perf_counter() - start:.3f}s")
+        assert result == expected
+    
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the spatial grid: hit-tests and rectangle queries against
+linear scans over all widget rectangles.
+
+Run from the repository root: python benchmarks/bench_spatial_index.py
+"""
+
+import sys
+import os
+import random
+import time
+from typing import Dict, List
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.spatial_index import Rect, SpatialGrid
+
+
+def scan_point(rects: Dict[str, Rect], x: float, y: float) -> List[str]:
+    """Linear hit-test over all rectangles"""
+    return [item_id for item_id, (rx, ry, width, height) in rects.items()
+            if rx <= x < rx + width and ry <= y < ry + height]
+
+
+def scan_rect(rects: Dict[str, Rect], x: float, y: float, width: float, height: float) -> List[str]:
+    """Linear overlap query over all rectangles"""
+    return [item_id for item_id, (rx, ry, rw, rh) in rects.items()
+            if rx < x + width and x < rx + rw and ry < y + height and y < ry + rh]
+
+
+# Benchmark grid queries against linear scans
+if __name__ == "__main__":
+    random.seed(1)
+    count = 5000
+    canvas = 4000
+    rects = {f'widget_{i + 1}': (random.randrange(canvas), random.randrange(canvas),
+                                 random.randrange(20, 200), random.randrange(20, 60))
+             for i in range(count)}
+    
+    start = time.perf_counter()
+    grid = SpatialGrid()
+    for item_id, rect in rects.items():
+        grid.insert(item_id, rect)
+    build_time = time.perf_counter() - start
+    
+    points = [(random.uniform(0, canvas), random.uniform(0, canvas)) for _ in range(2000)]
+    boxes = [(random.uniform(0, canvas), random.uniform(0, canvas), 300, 200) for _ in range(500)]
+    
+    start = time.perf_counter()
+    expected_points = [sorted(scan_point(rects, x, y)) for x, y in points]
+    expected_boxes = [sorted(scan_rect(rects, *box)) for box in boxes]
+    scan_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    found_points = [grid.query_point(x, y) for x, y in points]
+    found_boxes = [grid.query_rect(*box) for box in boxes]
+    grid_time = time.perf_counter() - start
+    
+    assert [sorted(ids) for ids in found_points] == expected_points
+    assert [sorted(ids) for ids in found_boxes] == expected_boxes
+    print(f"{count} widgets, {len(points)} hit-tests + {len(boxes)} rect queries: "
+          f"scan {scan_time * 1000:.1f} ms, grid {grid_time * 1000:.1f} ms "
+          f"({scan_time / grid_time:.0f}x, build {build_time * 1000:.1f} ms)")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the widget store: removals by id against list scans and the
+memory of compact records against widget dicts.
+
+Run from the repository root: python benchmarks/bench_widget_store.py
+"""
+
+import sys
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.widget_store import DEFAULT_POSITION, DEFAULT_SIZE, WidgetRecord, WidgetStore
+
+
+def find_widget_index(widgets: List[Dict[str, Any]], widget_id: str) -> Optional[int]:
+    """Previous linear id lookup in the widget list"""
+    for i, widget in enumerate(widgets):
+        if widget['id'] == widget_id:
+            return i
+    return None
+
+
+# Benchmark id lookups and removals against list scans
+if __name__ == "__main__":
+    count = 10000
+    widgets = [{'id': f'widget_{i + 1}', 'type': 'QPushButton'} for i in range(count)]
+    ids = [widget['id'] for widget in widgets]
+    random.seed(1)
+    random.shuffle(ids)
+    
+    widget_list = [dict(widget) for widget in widgets]
+    start = time.perf_counter()
+    for widget_id in ids[:count // 2]:
+        del widget_list[find_widget_index(widget_list, widget_id)]
+    list_time = time.perf_counter() - start
+    
+    store = WidgetStore.from_list([dict(widget) for widget in widgets])
+    start = time.perf_counter()
+    for widget_id in ids[:count // 2]:
+        store.remove(widget_id)
+    store_time = time.perf_counter() - start
+    
+    assert [w['id'] for w in store] == [w['id'] for w in widget_list]
+    assert store.allocate_id() == f'widget_{count + 1}'
+    print(f"{count // 2} removals from {count} widgets: list scan {list_time * 1000:.1f} ms, "
+          f"store {store_time * 1000:.2f} ms ({list_time / store_time:.0f}x)")
+    
+    # Memory of 100k widgets: dicts as built by the previous add_widget vs records
+    
+    def make_dict(i):
+        properties = {'name': f'button_{i}', 'text': f'Button {i}', 'position': (10 + i % 500, 10 + i // 500)}
+        return {
+            'id': f'widget_{i + 1}',
+            'type': 'QPushButton',
+            'name': properties.get('name'),
+            'text': properties.get('text'),
+            'properties': properties,
+            'position': properties.get('position', DEFAULT_POSITION),
+            'size': properties.get('size', DEFAULT_SIZE),
+            'created': datetime.now().isoformat()
+        }
+    
+    def make_record(i):
+        properties = {'name': f'button_{i}', 'text': f'Button {i}', 'position': (10 + i % 500, 10 + i // 500)}
+        return WidgetRecord(f'widget_{i + 1}', 'QPushButton', name=properties.get('name'),
+                            text=properties.get('text'), properties=properties,
+                            position=properties.get('position', DEFAULT_POSITION),
+                            size=properties.get('size', DEFAULT_SIZE))
+    
+    count = 100000
+    sizes = {}
+    for label, factory in (('dicts', make_dict), ('records', make_record)):
+        tracemalloc.start()
+        widgets = [factory(i) for i in range(count)]
+        sizes[label] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del widgets
+    
+    assert make_record(7).to_dict()['properties'] == make_dict(7)['properties']
+    print(f"{count} widgets: dicts {sizes['dicts'] / 2**20:.1f} MiB, "
+          f"records {sizes['records'] / 2**20:.1f} MiB ({sizes['dicts'] / sizes['records']:.1f}x smaller)")
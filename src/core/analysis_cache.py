@@ -0,0 +1,272 @@
+"""
+Analysis Cache - content-addressed cache for code analysis results.
+Keeps recently analyzed sources (AST and metrics) in a bounded LRU keyed by
+a hash of the source text and the analyzer version, optionally spilling
+metrics to a size-bounded on-disk cache under the project directory.
+Disk writes run on a background thread, off the (GUI) thread analyzing.
+"""
+
+import os
+import json
+import queue
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Dict, Any, Optional, Tuple
+
+from core.atomic_io import atomic_open
+from core.code_analysis import ANALYZER_VERSION, CodeAnalysisResult, analyze_source
+
+
+# On-disk cache directory, created inside the project directory
+CACHE_DIR_NAME = '.gui_constructor_cache'
+
+DEFAULT_MAX_ENTRIES = 128
+
+# On-disk cache budget; the least recently written or read entries are removed first
+MAX_DISK_BYTES = 64 * 1024 * 1024
+MAX_DISK_ENTRIES = 10000
+
+# Result fields stored as lists of tuples
+_TUPLE_LIST_FIELDS = ('long_lines', 'deep_ifs')
+
+
+def source_key(code: str) -> str:
+    """
+    Build cache key for a source text.
+    
+    Args:
+        code: Python source code
+    
+    Returns:
+        str: Analyzer version and content hash
+    """
+    digest = hashlib.blake2b(code.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+    return f"v{ANALYZER_VERSION}_{digest}"
+
+
+def _result_to_json(result: CodeAnalysisResult) -> Dict[str, Any]:
+    data = asdict(result)
+    data.pop('tree', None)
+    return data
+
+
+def _result_from_json(data: Dict[str, Any]) -> CodeAnalysisResult:
+    for name in _TUPLE_LIST_FIELDS:
+        data[name] = [tuple(item) for item in data.get(name, [])]
+    if data.get('syntax_error') is not None:
+        data['syntax_error'] = tuple(data['syntax_error'])
+    return CodeAnalysisResult(**data)
+
+
+class AnalysisCache:
+    """
+    Bounded LRU cache of CodeAnalysisResult objects.
+    
+    Cached results are shared between callers and must be treated as read-only.
+    Results loaded from disk carry metrics only (tree is None). The disk
+    cache is bounded by max_disk_bytes and max_disk_entries.
+    """
+    
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = MAX_DISK_BYTES, max_disk_entries: int = MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_disk_entries = max_disk_entries
+        self.background_writes = True  # False writes on the analyzing thread (e.g. in worker processes)
+        self._entries: "OrderedDict[str, CodeAnalysisResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_queue: "queue.Queue[Tuple[str, str, CodeAnalysisResult]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._disk_index_dir: Optional[str] = None
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()  # File name -> bytes, oldest first
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_evictions = 0
+    
+    def set_disk_dir(self, disk_dir: Optional[str]):
+        """Set directory for the on-disk cache (None keeps the cache in memory only)"""
+        self.disk_dir = disk_dir
+    
+    def analyze(self, code: str) -> CodeAnalysisResult:
+        """
+        Analyze source code, reusing a cached result for identical text.
+        
+        Args:
+            code: Python source code
+        
+        Returns:
+            CodeAnalysisResult: Cached or freshly computed result
+        """
+        key = source_key(code)
+        
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        
+        result = self._load_from_disk(key)
+        if result is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._store(key, result)
+            return result
+        
+        result = analyze_source(code)
+        with self._lock:
+            self.misses += 1
+            self._store(key, result)
+        self._schedule_save(key, result)
+        return result
+    
+    def _store(self, key: str, result: CodeAnalysisResult):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _load_from_disk(self, key: str) -> Optional[CodeAnalysisResult]:
+        disk_dir = self.disk_dir
+        if not disk_dir:
+            return None
+        
+        name = f"{key}.json"
+        path = os.path.join(disk_dir, name)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = _result_from_json(json.load(f))
+        except Exception as e:
+            print(f"✗ Error loading analysis cache entry: {e}")
+            return None
+        
+        # Entries still in use are evicted last, also when read before the first write
+        with self._lock:
+            if self._disk_index_dir != disk_dir:
+                self._load_disk_index(disk_dir)
+            if name in self._disk_index:
+                self._disk_index.move_to_end(name)
+        return result
+    
+    def _schedule_save(self, key: str, result: CodeAnalysisResult):
+        """Write a result to the disk cache on the writer thread"""
+        disk_dir = self.disk_dir
+        if not disk_dir:
+            return
+        if not self.background_writes:
+            self._save_to_disk(disk_dir, key, result)
+            return
+        
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name='analysis-cache-writer', daemon=True)
+                self._writer.start()
+        self._write_queue.put((disk_dir, key, result))
+    
+    def _write_loop(self):
+        while True:
+            disk_dir, key, result = self._write_queue.get()
+            try:
+                self._save_to_disk(disk_dir, key, result)
+            finally:
+                self._write_queue.task_done()
+    
+    def flush(self):
+        """Wait until scheduled disk writes are done"""
+        self._write_queue.join()
+    
+    def _save_to_disk(self, disk_dir: str, key: str, result: CodeAnalysisResult) -> bool:
+        name = f"{key}.json"
+        try:
+            data = json.dumps(_result_to_json(result), separators=(',', ':'))
+            with atomic_open(os.path.join(disk_dir, name), 'w', encoding='utf-8') as f:
+                f.write(data)
+            with self._lock:
+                self.disk_writes += 1
+                self._add_to_disk_index(disk_dir, name, len(data.encode('utf-8')))
+            return True
+        except Exception as e:
+            print(f"✗ Error saving analysis cache entry: {e}")
+            return False
+    
+    def _add_to_disk_index(self, disk_dir: str, name: str, size: int):
+        """Record a written entry and evict the oldest ones past the disk budget (lock held)"""
+        if self._disk_index_dir != disk_dir:
+            self._load_disk_index(disk_dir)
+        
+        self._disk_bytes += size - self._disk_index.pop(name, 0)
+        self._disk_index[name] = size
+        
+        while len(self._disk_index) > 1 and (self._disk_bytes > self.max_disk_bytes or
+                                             len(self._disk_index) > self.max_disk_entries):
+            old_name, old_size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= old_size
+            self.disk_evictions += 1
+            try:
+                os.remove(os.path.join(disk_dir, old_name))
+            except OSError:
+                pass
+    
+    def _load_disk_index(self, disk_dir: str):
+        """Index the entries already in a cache directory, oldest first"""
+        entries = []
+        try:
+            with os.scandir(disk_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name, stat.st_size))
+        except OSError:
+            pass
+        entries.sort()
+        self._disk_index_dir = disk_dir
+        self._disk_index = OrderedDict((name, size) for _, name, size in entries)
+        self._disk_bytes = sum(self._disk_index.values())
+    
+    def clear(self):
+        """Drop in-memory entries and reset counters (the disk cache is kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = self.disk_writes = self.disk_evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and cache size"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'disk_writes': self.disk_writes,
+                'disk_evictions': self.disk_evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'disk_dir': self.disk_dir
+            }
+
+
+_default_cache = AnalysisCache()
+
+# Scheduled disk writes are lost with the daemon writer thread otherwise
+atexit.register(_default_cache.flush)
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Get the process-wide analysis cache"""
+    return _default_cache
+
+
+def analyze_source_cached(code: str) -> CodeAnalysisResult:
+    """Analyze source code through the process-wide cache (result is read-only)"""
+    return _default_cache.analyze(code)
@@ -0,0 +1,126 @@
+"""
+Analysis Pipeline - runs code analysis over project files on a process pool.
+Streams per-file results back to the caller as each file finishes.
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence
+
+from core.analysis_cache import analyze_source_cached, get_analysis_cache
+from core.code_analysis import collect_issues, complexity_report
+
+
+# Futures kept in flight per worker; keeps cancellation responsive
+IN_FLIGHT_PER_WORKER = 4
+
+
+def _init_worker(cache_dir: Optional[str]):
+    """Point the worker's analysis cache at the project's on-disk cache"""
+    cache = get_analysis_cache()
+    cache.set_disk_dir(cache_dir)
+    # Worker processes exit without waiting for a writer thread
+    cache.background_writes = False
+
+
+def analyze_file(file_path: str) -> Dict[str, Any]:
+    """
+    Analyze a single Python file (runs in a worker process).
+    
+    Args:
+        file_path: Path to Python file
+    
+    Returns:
+        Dict: File path, issues and complexity report (or error)
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            code = f.read()
+    except OSError as e:
+        return {'path': file_path, 'error': str(e), 'issues': [], 'report': {}}
+    
+    try:
+        result = analyze_source_cached(code)
+        return {
+            'path': file_path,
+            'issues': collect_issues(result),
+            'report': complexity_report(result)
+        }
+    except Exception as e:
+        return {'path': file_path, 'error': str(e), 'issues': [], 'report': {}}
+
+
+class ProjectAnalysisPipeline:
+    """Analyzes a set of files in parallel and yields results as they complete"""
+    
+    def __init__(self, file_paths: Sequence[str], max_workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None):
+        self.file_paths = list(file_paths)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Defaults to the current project's on-disk analysis cache
+        self.cache_dir = cache_dir if cache_dir is not None else get_analysis_cache().disk_dir
+    
+    def iter_results(self, is_cancelled: Optional[Callable[[], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Run analysis, yielding one result per file in completion order.
+        
+        Args:
+            is_cancelled: Polled between results; pending files are dropped when it returns True
+        
+        Yields:
+            Dict: Result of analyze_file
+        """
+        if not self.file_paths:
+            return
+        
+        # Forking a process with running (Qt, pool) threads is unsafe
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                   initargs=(self.cache_dir,), mp_context=multiprocessing.get_context('spawn'))
+        paths = iter(self.file_paths)
+        in_flight = set()
+        limit = self.max_workers * IN_FLIGHT_PER_WORKER
+        
+        try:
+            while True:
+                while len(in_flight) < limit:
+                    path = next(paths, None)
+                    if path is None:
+                        break
+                    in_flight.add(pool.submit(analyze_file, path))
+                
+                if not in_flight:
+                    break
+                
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                
+                if is_cancelled and is_cancelled():
+                    break
+        finally:
+            for future in in_flight:
+                future.cancel()
+            pool.shutdown(wait=False)
+    
+    @staticmethod
+    def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate per-file results into project totals"""
+        summary = {
+            'files': len(results),
+            'issues': 0,
+            'errors': 0,
+            'complexity_score': 0,
+            'issues_by_severity': {}
+        }
+        
+        for result in results:
+            if 'error' in result or 'error' in result.get('report', {}):
+                summary['errors'] += 1
+            summary['complexity_score'] += result.get('report', {}).get('complexity_score', 0)
+            for issue in result.get('issues', []):
+                summary['issues'] += 1
+                severity = issue.get('severity', 'low')
+                summary['issues_by_severity'][severity] = summary['issues_by_severity'].get(severity, 0) + 1
+        
+        return summary
@@ -7,97 +7,240 @@ PyQt5 compatible version.
 import os
 import sys
 import importlib
-import json
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from typing import (Dict, Any, Callable, Iterable, Iterator, List, Optional, Sequence, TextIO,
+                    Tuple, Union)
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from core.analysis_cache import CACHE_DIR_NAME, analyze_source_cached, get_analysis_cache
+from core.code_generator import CodeUpdate, IncrementalCodeGenerator, generate_gui_code_to
+from core.file_table import FileTable
+from core.project_file import (PROJECT_DB_NAME, PROJECT_JSON_NAME, is_project_db, read_project_file,
+                               write_project_db, write_project_json)
+from core.project_journal import JOURNAL_COMPACT_RECORDS, JOURNAL_DIR_NAME, ProjectJournal
+from core.project_scanner import ProgressCallback, ProjectScanner, ScanCancelled
+from core.settings_service import SettingsService
+from core.widget_store import DEFAULT_POSITION, DEFAULT_SIZE, WidgetRecord, WidgetStore
+
 
 @dataclass
 class ProjectState:
     """Current project state data class"""
     path: Optional[str] = None
     name: Optional[str] = None
-    widgets: List[Dict] = field(default_factory=list)
-    code: Optional[str] = None
+    widgets: WidgetStore = field(default_factory=WidgetStore)
+    code: Optional[str] = None       # In-memory generated code (None if only written to code_path)
+    code_path: Optional[str] = None  # File the generated code was streamed to
     metadata: Dict[str, Any] = field(default_factory=dict)
+    files: Optional[FileTable] = None  # Scanned files; only the summary is saved
     modified: bool = False
     created: str = field(default_factory=lambda: datetime.now().isoformat())
     last_modified: str = field(default_factory=lambda: datetime.now().isoformat())
 
 
+@dataclass
+class WidgetChange:
+    """Notification about widgets added, updated or removed in one operation"""
+    kind: str              # 'added', 'updated', 'removed' or 'reset' (all widgets replaced)
+    widget_ids: List[str]
+
+
+WidgetChangeListener = Callable[[WidgetChange], None]
+
+
+@dataclass
+class ProjectScan:
+    """Result of AppCore.scan_project, applied with AppCore.apply_project_scan"""
+    path: str
+    files: Optional[FileTable]
+    analysis: Dict[str, Any]
+
+
+def code_metrics(code: str) -> Dict[str, Any]:
+    """
+    Compute the metrics and issues of AppCore.analyze_code.
+    
+    A module-level function without core state, so it can run in a worker process.
+    
+    Args:
+        code: Source code to analyze
+    
+    Returns:
+        Dict: Analysis results
+    """
+    result = analyze_source_cached(code)
+    
+    metrics = {
+        'total_lines': result.total_lines,
+        'code_lines': result.code_lines,
+        'comment_lines': result.comment_lines,
+        'blank_lines': result.blank_lines,
+        'imports': result.line_imports,
+        'functions': result.line_functions,
+        'classes': result.line_classes,
+        'average_line_length': result.total_line_length,
+        'issues': []
+    }
+    
+    # Check for issues, in line order (long line before print on the same line)
+    findings = [(line, 0) for line, _ in result.long_lines] + [(line, 1) for line in result.print_calls]
+    for line, kind in sorted(findings):
+        if kind == 0:
+            metrics['issues'].append({
+                'line': line,
+                'type': 'style',
+                'message': 'Line too long (> 100 characters)',
+                'severity': 'low'
+            })
+        else:
+            metrics['issues'].append({
+                'line': line,
+                'type': 'style',
+                'message': 'Consider using logging instead of print',
+                'severity': 'low'
+            })
+    
+    # Calculate averages
+    if metrics['code_lines'] > 0:
+        metrics['average_line_length'] = metrics['average_line_length'] / metrics['total_lines']
+    
+    # Determine complexity level
+    complexity_score = metrics['functions'] * 2 + metrics['classes'] * 3
+    if complexity_score > 20:
+        complexity = 'high'
+    elif complexity_score > 10:
+        complexity = 'medium'
+    else:
+        complexity = 'low'
+    
+    metrics['complexity'] = complexity
+    metrics['complexity_score'] = complexity_score
+    return metrics
+
+
 class AppCore:
     """Central brain of the application. Manages state and logic."""
     
     def __init__(self):
         self.project = ProjectState()
-        self.settings = self._load_settings()
+        self.settings = SettingsService()
         self.modules = {}
         self.commands = []
+        self.code_generator = IncrementalCodeGenerator()
+        self.change_listeners: List[WidgetChangeListener] = []
+        self.journal: Optional[ProjectJournal] = None  # Set once the project has a snapshot
+        self._generate_lock = threading.Lock()  # Code generation may run in a command worker thread
         
         print("✓ AppCore initialized")
     
-    def _load_settings(self) -> Dict[str, Any]:
-        """Load application settings from file or create defaults"""
-        settings_file = "gui_constructor_settings.json"
-        default_settings = {
-            "theme": "light",
-            "autosave": True,
-            "autosave_interval": 300,  # 5 minutes
-            "ai_enabled": False,
-            "code_style": "pep8",
-            "recent_projects": [],
-            "window_width": 1400,
-            "window_height": 800,
-            "plugins_enabled": True
-        }
-        
-        if os.path.exists(settings_file):
-            try:
-                with open(settings_file, 'r') as f:
-                    loaded_settings = json.load(f)
-                # Merge with defaults
-                default_settings.update(loaded_settings)
-                print(f"✓ Settings loaded from {settings_file}")
-            except Exception as e:
-                print(f"✗ Error loading settings: {e}")
-        
-        return default_settings
+    def save_settings(self) -> bool:
+        """Write pending settings changes now (they are saved in the background otherwise)"""
+        return self.settings.flush()
     
-    def save_settings(self):
-        """Save current settings to file"""
-        settings_file = "gui_constructor_settings.json"
-        try:
-            with open(settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
-            print(f"✓ Settings saved to {settings_file}")
-            return True
-        except Exception as e:
-            print(f"✗ Error saving settings: {e}")
-            return False
+    def close(self):
+        """Write pending settings and close the project journal (on application exit)"""
+        self._close_journal()
+        self.settings.close()
     
-    def load_project(self, project_path: str) -> bool:
+    def load_project(self, project_path: str, progress_callback: Optional[ProgressCallback] = None,
+                     is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
         """
         Load and analyze project directory.
         
         Args:
             project_path: Path to project directory
+            progress_callback: Optional scan progress callback (see ProjectScanner.scan)
+            is_cancelled: Optional callable polled to abort loading
             
         Returns:
-            bool: Success status
+            bool: Success status (False if cancelled)
         """
         if not os.path.exists(project_path):
             print(f"✗ Project path does not exist: {project_path}")
             return False
         
         try:
+            # Analyze project structure before switching, so a cancelled
+            # load leaves the current project untouched
+            scan = self.scan_project(project_path, progress_callback, is_cancelled)
+        except ScanCancelled:
+            print(f"✗ Project loading cancelled: {project_path}")
+            return False
+        
+        return self.apply_project_scan(scan, is_cancelled)
+    
+    def scan_project(self, project_path: str, progress_callback: Optional[ProgressCallback] = None,
+                     is_cancelled: Optional[Callable[[], bool]] = None) -> ProjectScan:
+        """
+        Analyze a project directory without changing the current project.
+        
+        Safe to call from a worker thread; apply the result on the GUI
+        thread with apply_project_scan.
+        
+        Args:
+            project_path: Path to project directory
+            progress_callback: Optional scan progress callback (see ProjectScanner.scan)
+            is_cancelled: Optional callable polled to abort scanning
+        
+        Returns:
+            ProjectScan: Scanned files and their summary
+        
+        Raises:
+            ScanCancelled: is_cancelled returned True
+        """
+        try:
+            scanner = ProjectScanner(project_path)
+            table = scanner.scan(progress_callback, is_cancelled)
+            analysis = table.summary()
+            print(f"✓ Project analyzed: {len(table)} files, {analysis['python_files']} "
+                  f"Python files ({scanner.stats['reused']} cached, {scanner.stats['read']} read)")
+            return ProjectScan(project_path, table, analysis)
+            
+        except ScanCancelled:
+            raise
+        except Exception as e:
+            print(f"✗ Error analyzing project: {e}")
+            return ProjectScan(project_path, None, {'error': str(e)})
+    
+    def apply_project_scan(self, scan: ProjectScan, is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Switch to a scanned project (on the GUI thread).
+        
+        Args:
+            scan: Result of scan_project
+            is_cancelled: Checked once more before switching, so a superseded
+                load never replaces a newer project
+        
+        Returns:
+            bool: Success status (False if cancelled)
+        """
+        if is_cancelled is not None and is_cancelled():
+            print(f"✗ Project loading cancelled: {scan.path}")
+            return False
+        
+        try:
+            project_path = scan.path
+            project_file = self._find_project_file(project_path)
+            if project_file is not None:
+                # Saved design plus changes journaled after it (e.g. before a crash)
+                if not self.open_project_file(project_file):
+                    return False
+            else:
+                self._close_journal()
+                self.project = ProjectState()
+                self.code_generator.reset()
             self.project.path = project_path
-            self.project.name = os.path.basename(project_path)
-            self.project.modified = False
-            self.project.last_modified = datetime.now().isoformat()
+            if project_file is None:
+                self.project.name = os.path.basename(project_path)
+                self.journal = self._attach_journal(project_path)
+            self.project.files = scan.files
+            self.project.metadata['analysis'] = scan.analysis
             
-            # Analyze project structure
-            self._analyze_project_structure(project_path)
+            # Keep analysis results across restarts
+            get_analysis_cache().set_disk_dir(os.path.join(project_path, CACHE_DIR_NAME))
+            self.project.last_modified = datetime.now().isoformat()
             
             # Add to recent projects
             self._add_to_recent_projects(project_path)
@@ -109,92 +252,35 @@ class AppCore:
             print(f"✗ Error loading project: {e}")
             return False
     
-    def _analyze_project_structure(self, path: str):
-        """Analyze project directory structure"""
-        try:
-            analysis = {
-                'files': [],
-                'directories': [],
-                'python_files': 0,
-                'total_size': 0,
-                'file_types': {}
-            }
-            
-            for root, dirs, files in os.walk(path):
-                # Skip virtual environments and hidden directories
-                skip_dirs = ['venv', '.venv', '.git', '__pycache__', '.idea', '.vscode']
-                dirs[:] = [d for d in dirs if d not in skip_dirs and not d.startswith('.')]
-                
-                for dir_name in dirs:
-                    dir_path = os.path.join(root, dir_name)
-                    analysis['directories'].append(dir_path)
-                
-                for file_name in files:
-                    file_path = os.path.join(root, file_name)
-                    
-                    # Get file info
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        file_ext = os.path.splitext(file_name)[1].lower()
-                        
-                        file_info = {
-                            'name': file_name,
-                            'path': file_path,
-                            'size': file_size,
-                            'extension': file_ext,
-                            'relative_path': os.path.relpath(file_path, path)
-                        }
-                        
-                        analysis['files'].append(file_info)
-                        analysis['total_size'] += file_size
-                        
-                        # Count file types
-                        analysis['file_types'][file_ext] = analysis['file_types'].get(file_ext, 0) + 1
-                        
-                        # Count Python files
-                        if file_ext == '.py':
-                            analysis['python_files'] += 1
-                            # Try to get line count
-                            try:
-                                with open(file_path, 'r', encoding='utf-8') as f:
-                                    lines = f.readlines()
-                                    file_info['lines'] = len(lines)
-                            except:
-                                file_info['lines'] = 0
-                        
-                    except OSError:
-                        continue
-            
-            self.project.metadata['analysis'] = analysis
-            print(f"✓ Project analyzed: {len(analysis['files'])} files, {analysis['python_files']} Python files")
-            
-        except Exception as e:
-            print(f"✗ Error analyzing project: {e}")
-            self.project.metadata['analysis'] = {'error': str(e)}
+    def iter_project_files(self, ext: Optional[str] = None, min_size: Optional[int] = None,
+                           offset: int = 0, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily query files found by the last project analysis.
+        
+        Args:
+            ext: Only files with this extension (e.g. '.py')
+            min_size: Only files of at least this many bytes
+            offset: Number of matching files to skip
+            limit: Maximum number of files to return
+        
+        Returns:
+            Iterator: File info dicts
+        """
+        if self.project.files is None:
+            return iter(())
+        return self.project.files.iter_files(ext=ext, min_size=min_size, offset=offset, limit=limit)
     
     def _add_to_recent_projects(self, project_path: str):
         """Add project to recent projects list"""
-        recent = self.settings.get('recent_projects', [])
-        
-        # Remove if already in list
-        if project_path in recent:
-            recent.remove(project_path)
-        
-        # Add to beginning
-        recent.insert(0, project_path)
-        
-        # Keep only last 10
-        recent = recent[:10]
-        
-        self.settings['recent_projects'] = recent
-        self.save_settings()
+        self.settings.add_recent_project(project_path)
     
-    def save_project(self, file_path: Optional[str] = None) -> bool:
+    def save_project(self, file_path: Optional[str] = None, project_format: Optional[str] = None) -> bool:
         """
         Save current project.
         
         Args:
             file_path: Optional custom save path
+            project_format: 'json' or 'sqlite' (defaults to the project_format setting)
             
         Returns:
             bool: Success status
@@ -204,22 +290,20 @@ class AppCore:
             return False
         
         save_path = file_path or self.project.path
+        project_format = project_format or self.settings.get('project_format', 'json')
         
         try:
-            # Create project data
-            project_data = {
-                'name': self.project.name,
-                'path': self.project.path,
-                'widgets': self.project.widgets,
-                'metadata': self.project.metadata,
-                'created': self.project.created,
-                'last_modified': datetime.now().isoformat()
-            }
+            # Saving to another directory continues in the journal there
+            if self.journal is None or self.journal.directory != os.path.join(save_path, JOURNAL_DIR_NAME):
+                self._close_journal()
+                self.journal = self._attach_journal(save_path)
             
-            # Save to file
-            project_file = os.path.join(save_path, 'gui_constructor_project.json')
-            with open(project_file, 'w') as f:
-                json.dump(project_data, f, indent=2)
+            # The snapshot covers all journaled changes, so the journal is emptied
+            project_file = self._project_file_path(save_path, project_format)
+            if not self.journal.compact(self._project_data(),
+                                        lambda data: self._write_project_file(project_file, data),
+                                        background=False):
+                return False
             
             self.project.modified = False
             self.project.last_modified = datetime.now().isoformat()
@@ -231,6 +315,153 @@ class AppCore:
             print(f"✗ Error saving project: {e}")
             return False
     
+    def _project_data(self) -> Dict[str, Any]:
+        """Get project data in the project file layout"""
+        return {
+            'name': self.project.name,
+            'path': self.project.path,
+            'widgets': self.project.widgets.to_list(),
+            'metadata': self.project.metadata,
+            'created': self.project.created,
+            'last_modified': datetime.now().isoformat()
+        }
+    
+    def _project_file_path(self, project_dir: str, project_format: str) -> str:
+        name = PROJECT_DB_NAME if project_format == 'sqlite' else PROJECT_JSON_NAME
+        return os.path.join(project_dir, name)
+    
+    def _find_project_file(self, project_dir: str) -> Optional[str]:
+        """Get the newest saved project file in a directory (None if there is none)"""
+        paths = [os.path.join(project_dir, name) for name in (PROJECT_JSON_NAME, PROJECT_DB_NAME)]
+        paths = [path for path in paths if os.path.isfile(path)]
+        return max(paths, key=os.path.getmtime) if paths else None
+    
+    def _attach_journal(self, project_dir: str) -> ProjectJournal:
+        """
+        Start journaling into a project directory without losing records left there.
+        
+        Records newer than the directory's project file belong to the current
+        project if it lives there and are replayed into it (crash recovery).
+        Otherwise they are another project's unsaved changes, about to be
+        overwritten by a save, and are moved to a backup directory.
+        """
+        project_file = self._find_project_file(project_dir)
+        start_seq = 0
+        if project_file is not None:
+            start_seq = read_project_file(project_file, include_analysis=False).get('journal_seq') or 0
+        
+        journal = ProjectJournal(project_dir, start_seq=start_seq)
+        if journal.last_seq <= start_seq:
+            return journal
+        
+        if self.project.path and os.path.abspath(self.project.path) == os.path.abspath(project_dir):
+            recovered = journal.replay(self.project.widgets, after_seq=start_seq)
+            if recovered:
+                self._mark_modified()
+                print(f"✓ Recovered {recovered} unsaved changes from the project journal")
+        else:
+            backup = journal.backup()
+            print(f"✓ Kept unsaved journal of the previous project in {project_dir}: {backup}")
+        return journal
+    
+    def _write_project_file(self, project_file: str, data: Dict[str, Any]):
+        # Written atomically, so a failed save keeps the previous file
+        if is_project_db(project_file):
+            write_project_db(project_file, data)
+        else:
+            write_project_json(project_file, data)
+    
+    def autosave(self) -> bool:
+        """
+        Make unsaved widget changes durable.
+        
+        Only fsyncs the journal records written since the last autosave; once
+        the journal grows past JOURNAL_COMPACT_RECORDS it is compacted into the
+        project file in the background. A project without a snapshot yet gets
+        a full save first.
+        
+        Returns:
+            bool: Success status
+        """
+        if self.journal is None:
+            if not self.project.path or not self.project.modified:
+                return True
+            return self.save_project()
+        
+        try:
+            self.journal.sync()
+            if self.journal.pending >= JOURNAL_COMPACT_RECORDS:
+                # The snapshot goes next to the journal it replaces
+                project_file = self._project_file_path(os.path.dirname(self.journal.directory),
+                                                       self.settings.get('project_format', 'json'))
+                self.journal.compact(self._project_data(),
+                                     lambda data: self._write_project_file(project_file, data))
+            return True
+        except Exception as e:
+            print(f"✗ Error during autosave: {e}")
+            return False
+    
+    def _close_journal(self, discard: bool = False):
+        if self.journal is not None:
+            try:
+                if discard:
+                    self.journal.discard()
+                else:
+                    self.journal.close()
+            except Exception as e:
+                print(f"✗ Error closing project journal: {e}")
+            self.journal = None
+    
+    def discard_unsaved_changes(self):
+        """Drop journaled changes so they are not recovered on the next open"""
+        self._close_journal(discard=True)
+    
+    def open_project_file(self, file_path: str, include_analysis: bool = False) -> bool:
+        """
+        Open a saved project file (gui_constructor_project.json or .guiproj).
+        
+        Args:
+            file_path: Project file
+            include_analysis: Also load the stored project analysis; by default only
+                widgets and the remaining metadata are read
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            data = read_project_file(file_path, include_analysis)
+            widgets = WidgetStore.from_list(data.get('widgets') or [])
+            
+            # Recover changes made after the snapshot (e.g. before a crash)
+            journal_seq = data.get('journal_seq') or 0
+            journal = ProjectJournal(os.path.dirname(os.path.abspath(file_path)), start_seq=journal_seq)
+            recovered = journal.replay(widgets, after_seq=journal_seq)
+        except Exception as e:
+            print(f"✗ Error opening project file: {e}")
+            return False
+        
+        project = ProjectState(
+            path=data.get('path') or os.path.dirname(os.path.abspath(file_path)),
+            name=data.get('name'),
+            widgets=widgets,
+            metadata=data.get('metadata') or {}
+        )
+        if data.get('created'):
+            project.created = data['created']
+        if data.get('last_modified'):
+            project.last_modified = data['last_modified']
+        if recovered:
+            project.modified = True
+        
+        self._close_journal()
+        self.project = project
+        self.journal = journal
+        self.code_generator.reset()
+        print(f"✓ Project opened: {file_path} ({len(widgets)} widgets)")
+        if recovered:
+            print(f"✓ Recovered {recovered} unsaved changes from the project journal")
+        return True
+    
     def generate_gui_code(self) -> str:
         """
         Generate Python GUI code based on current design.
@@ -238,103 +469,82 @@ class AppCore:
         Returns:
             str: Generated Python code
         """
-        if not self.project.widgets:
-            return "# No widgets to generate code for\n# Add widgets using the designer tools."
-        
-        code_lines = [
-            "# Generated by GUI Constructor",
-            "# Date: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "",
-            "import sys",
-            "from PyQt5.QtWidgets import (",
-            "    QApplication, QMainWindow, QWidget,",
-            "    QVBoxLayout, QHBoxLayout, QPushButton,",
-            "    QLabel, QTextEdit, QLineEdit, QCheckBox,",
-            "    QRadioButton, QComboBox, QListWidget, QTreeWidget,",
-            "    QTableWidget, QGroupBox, QTabWidget, QToolBox,",
-            "    QScrollArea, QFrame, QSlider, QProgressBar",
-            ")",
-            "from PyQt5.QtCore import Qt, QSize",
-            "from PyQt5.QtGui import QFont, QIcon",
-            "",
-            "",
-            f"class {self.project.name.replace(' ', '_')}Window(QMainWindow):",
-            "    \"\"\"Generated GUI Window\"\"\"",
-            "",
-            "    def __init__(self):",
-            "        super().__init__()",
-            f"        self.setWindowTitle('{self.project.name}')",
-            "        self.setGeometry(100, 100, 800, 600)",
-            "        self._setup_ui()",
-            "",
-            "    def _setup_ui(self):",
-            "        \"\"\"Setup user interface\"\"\"",
-            "        central_widget = QWidget()",
-            "        self.setCentralWidget(central_widget)",
-            "        main_layout = QVBoxLayout(central_widget)",
-            ""
-        ]
-        
-        # Add widget creation code
-        for i, widget in enumerate(self.project.widgets):
-            widget_type = widget.get('type', 'QPushButton')
-            widget_name = widget.get('name', f'widget_{i+1}')
-            widget_text = widget.get('text', widget_name)
-            
-            if widget_type == 'QPushButton':
-                code_lines.append(f"        {widget_name} = QPushButton('{widget_text}')")
-                code_lines.append(f"        main_layout.addWidget({widget_name})")
-            elif widget_type == 'Label':
-                code_lines.append(f"        {widget_name} = QLabel('{widget_text}')")
-                code_lines.append(f"        main_layout.addWidget({widget_name})")
-            elif widget_type == 'Text Edit':
-                code_lines.append(f"        {widget_name} = QTextEdit()")
-                code_lines.append(f"        {widget_name}.setPlaceholderText('{widget_text}')")
-                code_lines.append(f"        main_layout.addWidget({widget_name})")
-            elif widget_type == 'Line Edit':
-                code_lines.append(f"        {widget_name} = QLineEdit()")
-                code_lines.append(f"        {widget_name}.setPlaceholderText('{widget_text}')")
-                code_lines.append(f"        main_layout.addWidget({widget_name})")
-            elif widget_type == 'Check Box':
-                code_lines.append(f"        {widget_name} = QCheckBox('{widget_text}')")
-                code_lines.append(f"        main_layout.addWidget({widget_name})")
+        return self.generate_code_update().code
+    
+    def generate_code_update(self, widgets: Optional[Sequence[WidgetRecord]] = None) -> CodeUpdate:
+        """
+        Generate GUI code, re-emitting only widgets changed since the last call.
+        
+        Thread-safe; a worker thread passes a widget_snapshot taken on the
+        GUI thread instead of reading the live widgets.
+        
+        Args:
+            widgets: Widgets to generate code for (defaults to the project widgets)
+        
+        Returns:
+            CodeUpdate: Full code plus line edits against the previously generated code
+        """
+        if widgets is None:
+            widgets = self.project.widgets
+        
+        with self._generate_lock:
+            if not widgets:
+                return self.code_generator.replace(
+                    "# No widgets to generate code for\n# Add widgets using the designer tools."
+                )
             
-            # Add connections for buttons
-            if widget_type == 'QPushButton':
-                code_lines.append(f"        {widget_name}.clicked.connect(self.on_{widget_name}_clicked)")
-        
-        # Add event methods
-        for i, widget in enumerate(self.project.widgets):
-            widget_type = widget.get('type', 'QPushButton')
-            widget_name = widget.get('name', f'widget_{i+1}')
+            update = self.code_generator.generate(self.project.name, widgets)
+            self.project.code = update.code
+            self.project.code_path = None
+        print(f"✓ Generated GUI code with {len(widgets)} widgets "
+              f"({update.regenerated} regenerated)")
+        return update
+    
+    def generate_gui_code_to(self, target: Union[str, TextIO]) -> bool:
+        """
+        Stream generated GUI code to a file or text stream without building it in memory.
+        
+        A path target is written atomically and remembered as project.code_path;
+        the in-memory project.code is dropped and loaded lazily by get_generated_code.
+        
+        Args:
+            target: File path or writable text stream
             
-            if widget_type == 'QPushButton':
-                code_lines.append("")
-                code_lines.append(f"    def on_{widget_name}_clicked(self):")
-                code_lines.append(f"        \"\"\"Handle {widget_name} click\"\"\"")
-                code_lines.append(f"        print('{widget_name} clicked')")
-        
-        code_lines.extend([
-            "",
-            "",
-            "def main():",
-            "    \"\"\"Main application entry point\"\"\"",
-            "    app = QApplication(sys.argv)",
-            f"    window = {self.project.name.replace(' ', '_')}Window()",
-            "    window.show()",
-            "    sys.exit(app.exec_())",
-            "",
-            "",
-            "if __name__ == '__main__':",
-            "    main()",
-            ""
-        ])
-        
-        self.project.code = '\n'.join(code_lines)
+        Returns:
+            bool: Success status
+        """
+        if not self.project.widgets:
+            print("✗ No widgets to generate code for")
+            return False
+        
+        try:
+            generate_gui_code_to(target, self.project.name, self.project.widgets)
+        except Exception as e:
+            print(f"✗ Error writing generated code: {e}")
+            return False
+        
+        if isinstance(target, str):
+            self.project.code = None
+            self.project.code_path = target
         print(f"✓ Generated GUI code with {len(self.project.widgets)} widgets")
+        return True
+    
+    def get_generated_code(self) -> Optional[str]:
+        """
+        Get generated code, loading it from code_path if it was streamed to a file.
+        
+        Returns:
+            str: Generated code, or None if no code was generated
+        """
+        if self.project.code is None and self.project.code_path:
+            try:
+                with open(self.project.code_path, 'r', encoding='utf-8') as f:
+                    self.project.code = f.read()
+            except Exception as e:
+                print(f"✗ Error loading generated code: {e}")
         return self.project.code
     
-    def add_widget(self, widget_type: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+    def add_widget(self, widget_type: str, properties: Dict[str, Any]) -> WidgetRecord:
         """
         Add widget to current project.
         
@@ -343,25 +553,26 @@ class AppCore:
             properties: Widget properties
             
         Returns:
-            Dict: Created widget data
-        """
-        widget_id = f"widget_{len(self.project.widgets) + 1}"
-        widget_data = {
-            'id': widget_id,
-            'type': widget_type,
-            'name': properties.get('name', widget_id),
-            'text': properties.get('text', widget_type),
-            'properties': properties,
-            'position': properties.get('position', (10, 10)),
-            'size': properties.get('size', (100, 30)),
-            'created': datetime.now().isoformat()
-        }
+            WidgetRecord: Created widget data (to_dict() gives the dict form)
+        """
+        widget_id = self.project.widgets.allocate_id()
+        widget_data = WidgetRecord(
+            widget_id,
+            widget_type,
+            name=properties.get('name', widget_id),
+            text=properties.get('text', widget_type),
+            properties=properties,
+            position=properties.get('position', DEFAULT_POSITION),
+            size=properties.get('size', DEFAULT_SIZE)
+        )
         
-        self.project.widgets.append(widget_data)
-        self.project.modified = True
-        self.project.last_modified = datetime.now().isoformat()
+        self.project.widgets.add(widget_data)
+        self._mark_modified()
+        if self.journal is not None:
+            self.journal.put([widget_data])
         
         print(f"✓ Added widget: {widget_type} ({widget_id})")
+        self._notify_change('added', [widget_id])
         return widget_data
     
     def remove_widget(self, widget_id: str) -> bool:
@@ -374,16 +585,16 @@ class AppCore:
         Returns:
             bool: Success status
         """
-        for i, widget in enumerate(self.project.widgets):
-            if widget['id'] == widget_id:
-                del self.project.widgets[i]
-                self.project.modified = True
-                self.project.last_modified = datetime.now().isoformat()
-                print(f"✓ Removed widget: {widget_id}")
-                return True
+        if self.project.widgets.remove(widget_id) is None:
+            print(f"✗ Widget not found: {widget_id}")
+            return False
         
-        print(f"✗ Widget not found: {widget_id}")
-        return False
+        self._mark_modified()
+        if self.journal is not None:
+            self.journal.remove([widget_id])
+        print(f"✓ Removed widget: {widget_id}")
+        self._notify_change('removed', [widget_id])
+        return True
     
     def update_widget(self, widget_id: str, properties: Dict[str, Any]) -> bool:
         """
@@ -396,17 +607,296 @@ class AppCore:
         Returns:
             bool: Success status
         """
-        for widget in self.project.widgets:
-            if widget['id'] == widget_id:
-                widget['properties'].update(properties)
-                widget['last_modified'] = datetime.now().isoformat()
-                self.project.modified = True
-                self.project.last_modified = datetime.now().isoformat()
-                print(f"✓ Updated widget: {widget_id}")
-                return True
+        widget = self.project.widgets.get(widget_id)
+        if widget is None:
+            print(f"✗ Widget not found: {widget_id}")
+            return False
+        
+        widget.update_properties(properties)
+        self._mark_modified()
+        if self.journal is not None:
+            self.journal.put([widget])
+        print(f"✓ Updated widget: {widget_id}")
+        self._notify_change('updated', [widget_id])
+        return True
+    
+    def add_widgets(self, widgets: Iterable[Tuple[str, Dict[str, Any]]]) -> List[WidgetRecord]:
+        """
+        Add several widgets as one modification (e.g. from a template).
+        
+        Args:
+            widgets: (widget_type, properties) pairs in design order
+            
+        Returns:
+            List: Created widgets
+        """
+        store = self.project.widgets
+        created = time.time()
+        records = []
+        
+        for widget_type, properties in widgets:
+            widget_id = store.allocate_id()
+            records.append(store.add(WidgetRecord(
+                widget_id,
+                widget_type,
+                name=properties.get('name', widget_id),
+                text=properties.get('text', widget_type),
+                properties=properties,
+                position=properties.get('position', DEFAULT_POSITION),
+                size=properties.get('size', DEFAULT_SIZE),
+                created=created
+            )))
+        
+        if records:
+            self._mark_modified()
+            if self.journal is not None:
+                self.journal.put(records)
+            print(f"✓ Added {len(records)} widgets")
+            self._notify_change('added', [record.id for record in records])
+        return records
+    
+    def update_widgets(self, updates: Dict[str, Dict[str, Any]], replace: bool = False) -> List[str]:
+        """
+        Update properties of several widgets as one modification.
+        
+        Args:
+            updates: Widget id -> properties to merge
+            replace: Replace the properties instead of merging them
+            
+        Returns:
+            List: Ids of updated widgets (unknown ids are skipped)
+        """
+        store = self.project.widgets
+        timestamp = time.time()
+        updated = []
+        missing = 0
+        
+        for widget_id, properties in updates.items():
+            widget = store.get(widget_id)
+            if widget is None:
+                missing += 1
+            elif replace:
+                widget.replace_properties(properties, timestamp)
+                updated.append(widget_id)
+            else:
+                widget.update_properties(properties, timestamp)
+                updated.append(widget_id)
+        
+        if missing:
+            print(f"✗ Widgets not found: {missing}")
+        if updated:
+            self._mark_modified()
+            if self.journal is not None:
+                self.journal.put(store.get(widget_id) for widget_id in updated)
+            print(f"✓ Updated {len(updated)} widgets")
+            self._notify_change('updated', updated)
+        return updated
+    
+    def remove_widgets(self, widget_ids: Iterable[str]) -> List[Tuple[int, WidgetRecord]]:
+        """
+        Remove several widgets as one modification.
+        
+        Args:
+            widget_ids: Ids of widgets to remove (unknown ids are skipped)
+            
+        Returns:
+            List: (position, widget) of removed widgets, for restore_widgets
+        """
+        removed = self.project.widgets.remove_many(widget_ids)
+        
+        if removed:
+            self._mark_modified()
+            if self.journal is not None:
+                self.journal.remove(record.id for _, record in removed)
+            print(f"✓ Removed {len(removed)} widgets")
+            self._notify_change('removed', [record.id for _, record in removed])
+        return removed
+    
+    def restore_widgets(self, removed: List[Tuple[int, WidgetRecord]]) -> bool:
+        """
+        Put removed widgets back at their previous positions.
+        
+        Args:
+            removed: Result of remove_widgets
+            
+        Returns:
+            bool: Success status
+        """
+        try:
+            self.project.widgets.insert_many(removed)
+        except ValueError as e:
+            print(f"✗ Error restoring widgets: {e}")
+            return False
+        
+        if removed:
+            self._mark_modified()
+            if self.journal is not None:
+                self.journal.insert(removed)
+            print(f"✓ Restored {len(removed)} widgets")
+            self._notify_change('added', [record.id for _, record in removed])
+        return True
+    
+    def move_widgets(self, positions: Dict[str, Tuple[int, int]]) -> Dict[str, Tuple[int, int]]:
+        """
+        Move several widgets as one modification.
+        
+        Args:
+            positions: Widget id -> new (x, y)
+            
+        Returns:
+            Dict: Widget id -> previous (x, y) of moved widgets, for undo
+        """
+        store = self.project.widgets
+        previous = {}
+        
+        for widget_id, position in positions.items():
+            widget = store.get(widget_id)
+            if widget is not None:
+                previous[widget_id] = widget.position
+                store.move(widget_id, position=tuple(position))
+        
+        if previous:
+            self._mark_modified()
+            if self.journal is not None:
+                self.journal.put(store.get(widget_id) for widget_id in previous)
+            print(f"✓ Moved {len(previous)} widgets")
+            self._notify_change('updated', list(previous))
+        return previous
+    
+    def widget_snapshot(self, base: Optional[Tuple[WidgetRecord, ...]] = None) -> Tuple[WidgetRecord, ...]:
+        """Copy the current widgets (sharing unchanged ones with base), for restore_widget_snapshot"""
+        return self.project.widgets.snapshot(base)
+    
+    def restore_widget_snapshot(self, snapshot: Tuple[WidgetRecord, ...]):
+        """
+        Replace all widgets with a snapshot from widget_snapshot.
+        
+        Args:
+            snapshot: Widgets to restore (kept intact, they are copied)
+        """
+        store = self.project.widgets
+        store.restore(snapshot)
+        self._mark_modified()
+        if self.journal is not None:
+            self.journal.reset(store)
+        print(f"✓ Restored widget snapshot ({len(store)} widgets)")
+        self._notify_change('reset', [record.id for record in store])
+    
+    def hit_test(self, x: float, y: float) -> Optional[str]:
+        """Get id of the topmost widget at a canvas point (None if empty)"""
+        hits = self.project.widgets.spatial.query_point(x, y)
+        return hits[0] if hits else None
+    
+    def widgets_in_rect(self, x: float, y: float, width: float, height: float,
+                        contained: bool = True) -> List[str]:
+        """
+        Get ids of widgets in a rubber-band rectangle.
         
-        print(f"✗ Widget not found: {widget_id}")
-        return False
+        Args:
+            x, y, width, height: Selection rectangle (negative sizes are normalised)
+            contained: Only select widgets lying completely inside the rectangle
+            
+        Returns:
+            List: Widget ids, bottom to top
+        """
+        if width < 0:
+            x, width = x + width, -width
+        if height < 0:
+            y, height = y + height, -height
+        return self.project.widgets.spatial.query_rect(x, y, width, height, contained)
+    
+    def align_positions(self, widget_ids: List[str], mode: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Compute positions aligning widgets to their common bounding box.
+        
+        Args:
+            widget_ids: Widgets to align
+            mode: 'left', 'center' or 'right'
+            
+        Returns:
+            Dict: Widget id -> new (x, y) for widgets that have to move
+        """
+        spatial = self.project.widgets.spatial
+        rects = {widget_id: spatial.get_rect(widget_id) for widget_id in widget_ids}
+        rects = {widget_id: rect for widget_id, rect in rects.items() if rect is not None}
+        if len(rects) < 2:
+            return {}
+        
+        left = min(x for x, _, _, _ in rects.values())
+        right = max(x + width for x, _, width, _ in rects.values())
+        
+        positions = {}
+        for widget_id, (x, y, width, _) in rects.items():
+            if mode == 'left':
+                new_x = left
+            elif mode == 'right':
+                new_x = right - width
+            elif mode == 'center':
+                new_x = (left + right - width) // 2
+            else:
+                raise ValueError(f"Unknown alignment: {mode}")
+            if new_x != x:
+                positions[widget_id] = (new_x, y)
+        return positions
+    
+    def snap_position(self, x: float, y: float, widget_id: Optional[str] = None,
+                      tolerance: int = 5) -> Tuple[int, int]:
+        """
+        Snap a widget position to the grid (if enabled) and to nearby widget edges.
+        
+        Args:
+            x, y: Proposed top-left position
+            widget_id: Widget being moved (its size is used; it is not snapped to itself)
+            tolerance: Maximum distance in pixels to snap to another widget's edge
+            
+        Returns:
+            Tuple: Snapped (x, y)
+        """
+        store = self.project.widgets
+        widget = store.get(widget_id) if widget_id else None
+        width, height = widget.size if widget is not None else (0, 0)
+        
+        if self.settings.get('snap_to_grid'):
+            grid = self.settings.get('grid_size', 10) or 1
+            x = round(x / grid) * grid
+            y = round(y / grid) * grid
+        
+        best_x = best_y = None
+        neighbours = store.spatial.query_rect(x - tolerance, y - tolerance,
+                                              width + 2 * tolerance, height + 2 * tolerance)
+        for other_id in neighbours:
+            if other_id == widget_id:
+                continue
+            ox, oy, other_width, other_height = store.spatial.get_rect(other_id)
+            for edge in (ox, ox + other_width):
+                if abs(edge - x) <= tolerance and (best_x is None or abs(edge - x) < abs(best_x - x)):
+                    best_x = edge
+            for edge in (oy, oy + other_height):
+                if abs(edge - y) <= tolerance and (best_y is None or abs(edge - y) < abs(best_y - y)):
+                    best_y = edge
+        
+        return (int(best_x if best_x is not None else x), int(best_y if best_y is not None else y))
+    
+    def add_change_listener(self, listener: WidgetChangeListener):
+        """Register callback called once per widget add/update/remove operation"""
+        self.change_listeners.append(listener)
+    
+    def remove_change_listener(self, listener: WidgetChangeListener):
+        """Unregister change callback"""
+        if listener in self.change_listeners:
+            self.change_listeners.remove(listener)
+    
+    def _notify_change(self, kind: str, widget_ids: List[str]):
+        change = WidgetChange(kind, widget_ids)
+        for listener in list(self.change_listeners):
+            try:
+                listener(change)
+            except Exception as e:
+                print(f"✗ Error in change listener: {e}")
+    
+    def _mark_modified(self):
+        self.project.modified = True
+        self.project.last_modified = datetime.now().isoformat()
     
     def refactor_code(self, code: str, refactor_type: str = 'optimize') -> str:
         """
@@ -476,77 +966,7 @@ class AppCore:
             Dict: Analysis results
         """
         try:
-            lines = code.split('\n')
-            
-            metrics = {
-                'total_lines': len(lines),
-                'code_lines': 0,
-                'comment_lines': 0,
-                'blank_lines': 0,
-                'imports': 0,
-                'functions': 0,
-                'classes': 0,
-                'average_line_length': 0,
-                'issues': []
-            }
-            
-            for i, line in enumerate(lines, 1):
-                stripped = line.strip()
-                
-                # Count line types
-                if stripped == '':
-                    metrics['blank_lines'] += 1
-                elif stripped.startswith('#'):
-                    metrics['comment_lines'] += 1
-                else:
-                    metrics['code_lines'] += 1
-                
-                # Count imports
-                if stripped.startswith(('import ', 'from ')):
-                    metrics['imports'] += 1
-                
-                # Count functions and classes
-                if stripped.startswith('def '):
-                    metrics['functions'] += 1
-                elif stripped.startswith('class '):
-                    metrics['classes'] += 1
-                
-                # Calculate average line length
-                metrics['average_line_length'] += len(line)
-                
-                # Check for issues
-                if len(line) > 100:
-                    metrics['issues'].append({
-                        'line': i,
-                        'type': 'style',
-                        'message': 'Line too long (> 100 characters)',
-                        'severity': 'low'
-                    })
-                
-                if 'print(' in line and not stripped.startswith('#'):
-                    metrics['issues'].append({
-                        'line': i,
-                        'type': 'style',
-                        'message': 'Consider using logging instead of print',
-                        'severity': 'low'
-                    })
-            
-            # Calculate averages
-            if metrics['code_lines'] > 0:
-                metrics['average_line_length'] = metrics['average_line_length'] / len(lines)
-            
-            # Determine complexity level
-            complexity_score = metrics['functions'] * 2 + metrics['classes'] * 3
-            if complexity_score > 20:
-                complexity = 'high'
-            elif complexity_score > 10:
-                complexity = 'medium'
-            else:
-                complexity = 'low'
-            
-            metrics['complexity'] = complexity
-            metrics['complexity_score'] = complexity_score
-            
+            metrics = code_metrics(code)
             print(f"✓ Code analyzed: {metrics['total_lines']} lines, {len(metrics['issues'])} issues found")
             return metrics
             
@@ -612,12 +1032,16 @@ class AppCore:
             'modified': self.project.modified,
             'created': self.project.created,
             'last_modified': self.project.last_modified,
-            'has_code': self.project.code is not None
+            'has_code': self.project.code is not None or self.project.code_path is not None,
+            'analysis_cache': get_analysis_cache().stats()
         }
     
     def clear_project(self):
-        """Clear current project"""
+        """Clear current project (journaled changes are kept for recovery)"""
+        self._close_journal()
         self.project = ProjectState()
+        self.code_generator.reset()
+        get_analysis_cache().set_disk_dir(None)
         print("✓ Project cleared")
 
 
@@ -0,0 +1,140 @@
+"""
+Atomic IO - crash-safe file writes for generated code, indexes and caches.
+Data is written to a temp file in the target directory and moved over the
+target with os.replace (the safe_write_file approach of gui_constructor_v1_1),
+so readers see either the old or the new file, never a partial one.
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import IO, Iterator
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it; done once, before threads start writing
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
+
+
+def backup_path(path: str) -> str:
+    """Get timestamped backup name for a file"""
+    return f"{path}.bak.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def _target_mode(path: str) -> int:
+    """Permissions for the replacing file: those of the target, or what open() would give a new file"""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def _fsync_dir(dirpath: str):
+    """Flush a directory entry change (e.g. a rename) to disk"""
+    if os.name != 'posix':
+        return  # Directories cannot be opened for fsync on Windows
+    fd = os.open(dirpath, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_path(path: str, backup: bool = False, fsync: bool = False) -> Iterator[str]:
+    """
+    Get a temp path that replaces path when the block exits without error.
+    
+    For writers that need a file name rather than a file object (e.g. sqlite).
+    The new file keeps the permissions of the target (or gets the umask
+    default of a new file). On error the temp file is removed and the target
+    is left untouched.
+    
+    Args:
+        path: Target file path
+        backup: Copy an existing target to a timestamped .bak file first
+        fsync: Flush the temp file to disk before replacing, and the
+            directory after, so the replacement survives a crash
+    
+    Yields:
+        str: Temp file path in the target directory
+    """
+    dirpath = os.path.dirname(path) or '.'
+    os.makedirs(dirpath, exist_ok=True)
+    
+    if backup and os.path.exists(path):
+        try:
+            shutil.copy2(path, backup_path(path))
+        except Exception as e:
+            print(f"✗ Error creating backup of {path}: {e}")
+    
+    fd, tmp_path = tempfile.mkstemp(dir=dirpath, prefix='.tmp_write_')
+    os.close(fd)
+    try:
+        yield tmp_path
+        # mkstemp creates the file owner-only
+        os.chmod(tmp_path, _target_mode(path))
+        if fsync:
+            fd = os.open(tmp_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        os.replace(tmp_path, path)
+        if fsync:
+            _fsync_dir(dirpath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = 'w', encoding: str = 'utf-8',
+                backup: bool = False, fsync: bool = False) -> Iterator[IO]:
+    """
+    Open a temp file that replaces path when the block exits without error.
+    
+    On error the temp file is removed and the target is left untouched.
+    
+    Args:
+        path: Target file path
+        mode: 'w' for text or 'wb' for binary
+        encoding: Text encoding (ignored for binary mode)
+        backup: Copy an existing target to a timestamped .bak file first
+        fsync: Flush the file and the directory to disk (see atomic_path)
+    
+    Yields:
+        IO: Writable file object
+    """
+    with atomic_path(path, backup=backup, fsync=fsync) as tmp_path:
+        with open(tmp_path, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+
+
+def safe_write_file(path: str, content: str, encoding: str = 'utf-8', backup: bool = True) -> bool:
+    """
+    Atomically write text to a file, keeping a backup of the old version.
+    
+    Args:
+        path: Target file path
+        content: Text to write
+        encoding: Text encoding
+        backup: Copy an existing file to a timestamped .bak file first
+    
+    Returns:
+        bool: Success status
+    """
+    try:
+        with atomic_open(path, 'w', encoding=encoding, backup=backup) as f:
+            f.write(content)
+        return True
+    except Exception as e:
+        print(f"✗ Error writing {path}: {e}")
+        return False
@@ -0,0 +1,381 @@
+"""
+Code Analysis Engine - single-parse source analysis shared by AppCore and plugins.
+Parses a source once, collects all AST metrics and issues in one NodeVisitor
+pass and all line-based metrics in one line pass.
+"""
+
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Bump whenever analysis output changes; invalidates cached results
+ANALYZER_VERSION = 1
+
+# Lines longer than this are reported as style issues
+MAX_LINE_LENGTH = 100
+
+# If statements nested deeper than this are reported as complexity issues
+MAX_IF_NESTING = 3
+
+# Substrings counted by the keyword-based complexity estimate
+COMPLEXITY_KEYWORDS = ('if ', 'for ', 'while ', 'def ', 'class ')
+
+
+@dataclass
+class CodeAnalysisResult:
+    """Combined result of line and AST analysis for one source"""
+    # Line metrics
+    total_lines: int = 0
+    code_lines: int = 0
+    comment_lines: int = 0
+    blank_lines: int = 0
+    total_line_length: int = 0
+    line_imports: int = 0
+    line_functions: int = 0
+    line_classes: int = 0
+    keyword_points: float = 0.0
+    
+    # Line findings: (line, length) and line numbers
+    long_lines: List[Tuple[int, int]] = field(default_factory=list)
+    print_calls: List[int] = field(default_factory=list)       # print( anywhere in a non-comment line
+    print_statements: List[int] = field(default_factory=list)  # lines starting with print(
+    
+    # AST metrics
+    syntax_error: Optional[Tuple[str, Optional[int]]] = None
+    functions: int = 0
+    classes: int = 0
+    imports: int = 0
+    if_statements: int = 0
+    loops: int = 0
+    try_blocks: int = 0
+    
+    # AST findings: line numbers and (line, nesting level)
+    bare_excepts: List[int] = field(default_factory=list)
+    deep_ifs: List[Tuple[int, int]] = field(default_factory=list)
+    
+    tree: Optional[ast.AST] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def parsed(self) -> bool:
+        """True if the source parsed without syntax errors"""
+        return self.syntax_error is None
+
+
+class _AnalysisVisitor(ast.NodeVisitor):
+    """
+    Collects all AST metrics and issues in a single traversal.
+    
+    Every visit returns the maximum if-nesting depth of the visited subtree,
+    so the nesting level of each if statement is known after one pass.
+    """
+    
+    def __init__(self, result: CodeAnalysisResult):
+        self.result = result
+    
+    def generic_visit(self, node) -> int:
+        depth = 0
+        for child in ast.iter_child_nodes(node):
+            child_depth = self.visit(child)
+            if child_depth > depth:
+                depth = child_depth
+        return depth
+    
+    def visit_FunctionDef(self, node) -> int:
+        self.result.functions += 1
+        return self.generic_visit(node)
+    
+    def visit_ClassDef(self, node) -> int:
+        self.result.classes += 1
+        return self.generic_visit(node)
+    
+    def visit_Import(self, node) -> int:
+        self.result.imports += 1
+        return self.generic_visit(node)
+    
+    def visit_ImportFrom(self, node) -> int:
+        self.result.imports += 1
+        return self.generic_visit(node)
+    
+    def visit_For(self, node) -> int:
+        self.result.loops += 1
+        return self.generic_visit(node)
+    
+    def visit_While(self, node) -> int:
+        self.result.loops += 1
+        return self.generic_visit(node)
+    
+    def visit_Try(self, node) -> int:
+        self.result.try_blocks += 1
+        return self.generic_visit(node)
+    
+    def visit_ExceptHandler(self, node) -> int:
+        if node.type is None:
+            self.result.bare_excepts.append(getattr(node, 'lineno', 0))
+        return self.generic_visit(node)
+    
+    def visit_If(self, node) -> int:
+        self.result.if_statements += 1
+        # Nested level counts this if plus the deepest chain of ifs (and elifs) below it
+        nested_level = 1 + self.generic_visit(node)
+        if nested_level > MAX_IF_NESTING:
+            self.result.deep_ifs.append((getattr(node, 'lineno', 0), nested_level))
+        return nested_level
+
+
+def _analyze_lines(code: str, result: CodeAnalysisResult):
+    """Collect all line-based metrics in one pass"""
+    lines = code.split('\n')
+    result.total_lines = len(lines)
+    
+    for i, line in enumerate(lines, 1):
+        stripped = line.strip()
+        line_length = len(line)
+        result.total_line_length += line_length
+        
+        if stripped == '':
+            result.blank_lines += 1
+        elif stripped.startswith('#'):
+            result.comment_lines += 1
+        else:
+            result.code_lines += 1
+        
+        if stripped.startswith(('import ', 'from ')):
+            result.line_imports += 1
+        if stripped.startswith('def '):
+            result.line_functions += 1
+        elif stripped.startswith('class '):
+            result.line_classes += 1
+        
+        if line_length > MAX_LINE_LENGTH:
+            result.long_lines.append((i, line_length))
+        if 'print(' in line and not stripped.startswith('#'):
+            result.print_calls.append(i)
+            if stripped.startswith('print('):
+                result.print_statements.append(i)
+        
+        if any(keyword in line for keyword in COMPLEXITY_KEYWORDS):
+            result.keyword_points += 1
+        if ' and ' in line or ' or ' in line:
+            result.keyword_points += 0.5
+
+
+def _analyze_tree(source: str, result: CodeAnalysisResult, wrapped: bool = False) -> Optional[ast.AST]:
+    """
+    Parse source and collect AST metrics into result.
+    
+    Args:
+        source: Source to parse
+        result: Result to fill (syntax_error is set on failure)
+        wrapped: Source is a class-body block wrapped in one extra class line;
+            the wrapper itself is skipped and line numbers are shifted back
+    
+    Returns:
+        ast.AST: Parsed tree, or None on syntax error
+    """
+    first_line = 1 if wrapped else 0
+    
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        lineno = max(e.lineno - first_line, 1) if e.lineno else e.lineno
+        result.syntax_error = (e.msg, lineno)
+        return None
+    except ValueError as e:
+        # e.g. null bytes in source
+        result.syntax_error = (str(e), None)
+        return None
+    
+    visitor = _AnalysisVisitor(result)
+    if wrapped:
+        ast.increment_lineno(tree, -first_line)
+        # Wrapped statements, then any top-level statements after them
+        for node in tree.body[0].body + tree.body[1:]:
+            visitor.visit(node)
+    else:
+        visitor.visit(tree)
+    
+    # Report AST findings in source order
+    result.bare_excepts.sort()
+    result.deep_ifs.sort()
+    
+    return tree
+
+
+def analyze_source(code: str) -> CodeAnalysisResult:
+    """
+    Analyze source code with a single parse.
+    
+    Args:
+        code: Python source code
+    
+    Returns:
+        CodeAnalysisResult: Line metrics, AST metrics and findings
+    """
+    result = CodeAnalysisResult()
+    _analyze_lines(code, result)
+    result.tree = _analyze_tree(code, result)
+    return result
+
+
+def analyze_block(code: str, body_indent: str = '', class_header: bool = False) -> CodeAnalysisResult:
+    """
+    Analyze one block of a larger source on its own.
+    
+    Line numbers in the result are relative to the block. Summing the results
+    of consecutive blocks gives the same metrics as analyzing the whole source.
+    
+    Args:
+        code: Block lines
+        body_indent: Indentation of a class-body block ('' for top-level blocks)
+        class_header: Block starts a class whose body continues in later blocks
+    
+    Returns:
+        CodeAnalysisResult: Metrics and findings for the block (without tree)
+    """
+    result = CodeAnalysisResult()
+    _analyze_lines(code, result)
+    
+    if class_header:
+        # Give the class a body so its header parses on its own
+        _analyze_tree(f"{code}\n{body_indent}pass", result)
+    elif body_indent:
+        _analyze_tree(f"class _Block:\n{code}", result, wrapped=True)
+    else:
+        _analyze_tree(code, result)
+    
+    return result
+
+
+def collect_issues(result: CodeAnalysisResult) -> List[Dict[str, Any]]:
+    """
+    Build the issue list reported by the analysis plugin.
+    
+    Args:
+        result: Analysis result
+    
+    Returns:
+        List: Issue dicts (type, message, line, severity)
+    """
+    issues = []
+    
+    if result.syntax_error:
+        message, line = result.syntax_error
+        issues.append({
+            'type': 'error',
+            'message': f'Syntax error: {message}',
+            'line': line,
+            'severity': 'high'
+        })
+    else:
+        # AST issues in source order
+        findings = [(line, 0, 0) for line in result.bare_excepts] + \
+                   [(line, 1, level) for line, level in result.deep_ifs]
+        for line, kind, level in sorted(findings):
+            if kind == 0:
+                issues.append({
+                    'type': 'warning',
+                    'message': 'Bare except clause',
+                    'line': line,
+                    'severity': 'medium'
+                })
+            else:
+                issues.append({
+                    'type': 'complexity',
+                    'message': f'Deeply nested if statements ({level} levels)',
+                    'line': line,
+                    'severity': 'low'
+                })
+    
+    # Simple pattern checks, in line order (print before long line on the same line)
+    findings = [(line, 0, 0) for line in result.print_statements] + \
+               [(line, 1, length) for line, length in result.long_lines]
+    for line, kind, length in sorted(findings):
+        if kind == 0:
+            issues.append({
+                'type': 'style',
+                'message': 'Consider using logging instead of print',
+                'line': line,
+                'severity': 'low'
+            })
+        else:
+            issues.append({
+                'type': 'style',
+                'message': f'Line too long ({length} characters)',
+                'line': line,
+                'severity': 'low'
+            })
+    
+    return issues
+
+
+def complexity_report(result: CodeAnalysisResult) -> Dict[str, Any]:
+    """
+    Build the complexity report of the analysis plugin.
+    
+    Args:
+        result: Analysis result
+    
+    Returns:
+        Dict: Metrics, complexity score and level, recommendations (or a syntax error)
+    """
+    if result.syntax_error:
+        message, line = result.syntax_error
+        return {
+            'error': f'Syntax error: {message}',
+            'line': line
+        }
+    
+    metrics = {
+        'functions': result.functions,
+        'classes': result.classes,
+        'imports': result.imports,
+        'if_statements': result.if_statements,
+        'loops': result.loops,
+        'try_blocks': result.try_blocks
+    }
+    
+    # Calculate complexity score
+    complexity_score = (
+        metrics['functions'] * 2 +
+        metrics['classes'] * 3 +
+        metrics['if_statements'] * 1 +
+        metrics['loops'] * 2 +
+        metrics['try_blocks'] * 1
+    )
+    
+    # Determine complexity level
+    if complexity_score > 50:
+        complexity_level = "Very High"
+    elif complexity_score > 30:
+        complexity_level = "High"
+    elif complexity_score > 15:
+        complexity_level = "Medium"
+    else:
+        complexity_level = "Low"
+    
+    return {
+        'metrics': metrics,
+        'complexity_score': complexity_score,
+        'complexity_level': complexity_level,
+        'recommendations': _recommendations(metrics)
+    }
+
+
+def _recommendations(metrics: Dict[str, int]) -> List[str]:
+    """Generate recommendations based on metrics"""
+    recommendations = []
+    
+    if metrics['functions'] > 10:
+        recommendations.append("Consider splitting large module into smaller ones")
+    
+    if metrics['if_statements'] > 15:
+        recommendations.append("High number of if statements - consider polymorphism")
+    
+    if metrics['try_blocks'] > 5:
+        recommendations.append("Multiple try blocks - consider error handling strategy")
+    
+    if not recommendations:
+        recommendations.append("Code structure looks good")
+    
+    return recommendations
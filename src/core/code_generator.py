@@ -0,0 +1,489 @@
+"""
+Code Generator - template-driven PyQt5 code generation for GUI designs.
+Per-widget-type emitters are registered once with pre-parsed templates;
+layout code and event handlers are emitted in a single pass over the design.
+IncrementalCodeGenerator caches per-widget fragments and reports line edits
+against the previously generated code.
+"""
+
+import io
+import operator
+import shutil
+import string
+import difflib
+import tempfile
+from itertools import accumulate
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Sequence, TextIO, Tuple, Union
+
+from core.atomic_io import atomic_open
+from core.widget_store import WidgetRecord
+
+
+# Widget creation code goes into _setup_ui
+LAYOUT_INDENT = "        "
+
+# Changed ranges up to this many segments are diffed exactly, larger ones
+# are replaced as a whole
+DIFF_MATCH_LIMIT = 1000
+
+# Handler code kept in memory while streaming to a file (characters)
+HANDLER_SPOOL_SIZE = 1024 * 1024
+
+HEADER_TEMPLATE = '''# Generated by GUI Constructor
+# Date: {date}
+
+import sys
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget,
+    QVBoxLayout, QHBoxLayout, QPushButton,
+    QLabel, QTextEdit, QLineEdit, QCheckBox,
+    QRadioButton, QComboBox, QListWidget, QTreeWidget,
+    QTableWidget, QGroupBox, QTabWidget, QToolBox,
+    QScrollArea, QFrame, QSlider, QProgressBar
+)
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QFont, QIcon
+
+
+class {class_name}Window(QMainWindow):
+    """Generated GUI Window"""
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle('{title}')
+        self.setGeometry(100, 100, 800, 600)
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Setup user interface"""
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+
+'''
+
+FOOTER_TEMPLATE = '''
+
+def main():
+    """Main application entry point"""
+    app = QApplication(sys.argv)
+    window = {class_name}Window()
+    window.show()
+    sys.exit(app.exec_())
+
+
+if __name__ == '__main__':
+    main()
+'''
+
+
+def _compile_template(lines: Iterable[str]) -> Callable[[str, str], str]:
+    """
+    Pre-parse template lines into one render function of (name, text).
+    
+    Only plain {name} and {text} fields are allowed (no conversions or format
+    specs). The template is parsed once into a %-format string; rendering
+    substitutes the values, nothing in the template is evaluated.
+    """
+    template = ''.join(lines)
+    parts = []
+    order = []  # Field per %s: 0 for name, 1 for text
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        parts.append(literal.replace('%', '%%'))
+        if field_name is None:
+            continue
+        if field_name not in ('name', 'text') or format_spec or conversion:
+            raise ValueError(f"Unsupported template field: {field_name}")
+        parts.append('%s')
+        order.append(0 if field_name == 'name' else 1)
+    
+    fmt = ''.join(parts)
+    if not order:
+        constant = fmt % ()
+        return lambda name, text: constant
+    if len(order) == 1:
+        index = order[0]
+        return lambda name, text: fmt % ((name, text)[index],)
+    pick = operator.itemgetter(*order)
+    return lambda name, text: fmt % pick((name, text))
+
+
+@dataclass
+class WidgetEmitter:
+    """Code templates for one widget type ({name} and {text} are substituted)"""
+    widget_type: str
+    layout: List[str]                                   # statements in _setup_ui
+    handlers: List[str] = field(default_factory=list)   # class-level lines
+    
+    def __post_init__(self):
+        self._layout = _compile_template(f"{LAYOUT_INDENT}{line}\n" for line in self.layout)
+        self._handlers = _compile_template(f"{line}\n" for line in self.handlers) if self.handlers else None
+    
+    def emit(self, layout_out: TextIO, handlers_out: TextIO, name: str, text: str):
+        """Write code for one widget"""
+        layout_out.write(self._layout(name, text))
+        if self._handlers:
+            handlers_out.write(self._handlers(name, text))
+    
+    def render(self, name: str, text: str) -> Tuple[str, str]:
+        """Get (layout, handlers) code for one widget"""
+        return self._layout(name, text), self._handlers(name, text) if self._handlers else ''
+
+
+_emitters: Dict[str, WidgetEmitter] = {}
+
+# Bumped on every registration; invalidates cached fragments
+_registry_version = 0
+
+
+def register_emitter(emitter: WidgetEmitter):
+    """Register (or replace) the emitter for a widget type"""
+    global _registry_version
+    _emitters[emitter.widget_type] = emitter
+    _registry_version += 1
+
+
+def get_emitter(widget_type: str) -> Optional[WidgetEmitter]:
+    """Get emitter for a widget type (None if the type generates no code)"""
+    return _emitters.get(widget_type)
+
+
+register_emitter(WidgetEmitter(
+    'QPushButton',
+    ["{name} = QPushButton('{text}')",
+     "main_layout.addWidget({name})",
+     "{name}.clicked.connect(self.on_{name}_clicked)"],
+    ["",
+     "    def on_{name}_clicked(self):",
+     '        """Handle {name} click"""',
+     "        print('{name} clicked')"]
+))
+register_emitter(WidgetEmitter(
+    'Label',
+    ["{name} = QLabel('{text}')",
+     "main_layout.addWidget({name})"]
+))
+register_emitter(WidgetEmitter(
+    'Text Edit',
+    ["{name} = QTextEdit()",
+     "{name}.setPlaceholderText('{text}')",
+     "main_layout.addWidget({name})"]
+))
+register_emitter(WidgetEmitter(
+    'Line Edit',
+    ["{name} = QLineEdit()",
+     "{name}.setPlaceholderText('{text}')",
+     "main_layout.addWidget({name})"]
+))
+register_emitter(WidgetEmitter(
+    'Check Box',
+    ["{name} = QCheckBox('{text}')",
+     "main_layout.addWidget({name})"]
+))
+
+
+def _widget_signature(index: int, widget: Union[WidgetRecord, Dict[str, Any]]) -> Tuple[str, str, str]:
+    """Get (type, name, text) the code for a widget is emitted from"""
+    if type(widget) is WidgetRecord:
+        # Attribute access; much faster than the dict-compatible get()
+        name = widget.name if widget.name is not None else f'widget_{index+1}'
+        return (widget.type if widget.type is not None else 'QPushButton', name,
+                widget.text if widget.text is not None else name)
+    name = widget['name'] if 'name' in widget else f'widget_{index+1}'
+    return widget.get('type', 'QPushButton'), name, widget.get('text', name)
+
+
+def write_gui_code(out: TextIO, project_name: str, widgets: Sequence[Dict[str, Any]],
+                   generated_at: Optional[datetime] = None, spool_size: Optional[int] = None):
+    """
+    Write generated PyQt5 code for a design to a text stream.
+    
+    Args:
+        out: Stream to write to
+        project_name: Project name (used for the window class and title)
+        widgets: Widget dicts in design order
+        generated_at: Timestamp for the header (defaults to now)
+        spool_size: Keep at most this many characters of handler code in
+            memory before spilling it to a temp file (None keeps all in memory)
+    """
+    generated_at = generated_at or datetime.now()
+    class_name = project_name.replace(' ', '_')
+    
+    out.write(HEADER_TEMPLATE.format(
+        date=generated_at.strftime("%Y-%m-%d %H:%M:%S"),
+        class_name=class_name,
+        title=project_name
+    ))
+    
+    # Handlers follow the layout code, so they are collected alongside it
+    if spool_size is None:
+        handlers_out = io.StringIO()
+    else:
+        handlers_out = tempfile.SpooledTemporaryFile(max_size=spool_size, mode='w+', encoding='utf-8')
+    emitters = _emitters
+    
+    with handlers_out:
+        for i, widget in enumerate(widgets):
+            widget_type, name, text = _widget_signature(i, widget)
+            emitter = emitters.get(widget_type)
+            if emitter is not None:
+                emitter.emit(out, handlers_out, name, text)
+        
+        handlers_out.seek(0)
+        shutil.copyfileobj(handlers_out, out)
+    
+    out.write(FOOTER_TEMPLATE.format(class_name=class_name))
+
+
+def generate_gui_code_to(target: Union[str, TextIO], project_name: str,
+                         widgets: Sequence[Dict[str, Any]], generated_at: Optional[datetime] = None):
+    """
+    Stream generated code to a file path or an open text stream.
+    
+    The code is never held in memory as a whole: it is written in chunks,
+    handler code is spooled to disk past HANDLER_SPOOL_SIZE, and a path
+    target is replaced atomically only after the whole module is written.
+    
+    Args:
+        target: File path or writable text stream
+        project_name: Project name (used for the window class and title)
+        widgets: Widget dicts in design order
+        generated_at: Timestamp for the header (defaults to now)
+    """
+    if isinstance(target, str):
+        with atomic_open(target, 'w', encoding='utf-8') as f:
+            write_gui_code(f, project_name, widgets, generated_at, spool_size=HANDLER_SPOOL_SIZE)
+    else:
+        write_gui_code(target, project_name, widgets, generated_at, spool_size=HANDLER_SPOOL_SIZE)
+
+
+def generate_gui_code(project_name: str, widgets: Sequence[Dict[str, Any]],
+                      generated_at: Optional[datetime] = None) -> str:
+    """
+    Generate PyQt5 code for a design.
+    
+    Returns:
+        str: Generated Python code
+    """
+    out = io.StringIO()
+    write_gui_code(out, project_name, widgets, generated_at)
+    return out.getvalue()
+
+
+
+@dataclass
+class CodeEdit:
+    """Replace lines [start_line, end_line) of the previous code with text"""
+    start_line: int
+    end_line: int
+    text: str
+
+
+@dataclass
+class CodeUpdate:
+    """Generated code and the edits turning the previous code into it"""
+    code: str
+    edits: List[CodeEdit] = field(default_factory=list)
+    regenerated: int = 0   # widgets whose fragment was emitted again
+    reused: int = 0        # widgets whose cached fragment was reused
+
+
+def apply_code_edits(code: str, edits: Sequence[CodeEdit]) -> str:
+    """
+    Apply edits from a CodeUpdate to the previous code.
+    
+    Args:
+        code: Previously generated code
+        edits: Edits in ascending line order
+    
+    Returns:
+        str: Updated code
+    """
+    lines = code.splitlines(keepends=True)
+    # Apply from the bottom so earlier line numbers stay valid
+    for edit in reversed(edits):
+        lines[edit.start_line:edit.end_line] = [edit.text]
+    return ''.join(lines)
+
+
+class _Fragment(NamedTuple):
+    """Cached code for one widget"""
+    signature: Tuple[str, str, str]   # (type, name, text) the code was emitted from
+    layout: str
+    layout_lines: int
+    handlers: str
+    handler_lines: int
+
+
+class IncrementalCodeGenerator:
+    """
+    Code generator that caches the fragment emitted for each widget.
+    
+    Fragments are keyed by widget id and reused while the widget's type, name
+    and text are unchanged, so after a small edit only dirty widgets are
+    emitted again. Each update also carries a line diff against the code
+    returned by the previous call, for editors that apply changes in place.
+    """
+    
+    def __init__(self):
+        self._fragments: Dict[str, _Fragment] = {}
+        self._registry_version = _registry_version
+        self._segments: List[str] = []      # code pieces, each ending with a newline
+        self._line_offsets: List[int] = [0] # first line of each segment, plus total
+        self._regions: List[int] = [0, 0]   # segment boundaries of header/layout/handlers/footer
+    
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the last generated code"""
+        return self._line_offsets[-1]
+    
+    def reset(self):
+        """Drop cached fragments and the previous code"""
+        self._fragments = {}
+        self._segments = []
+        self._line_offsets = [0]
+        self._regions = [0, 0]
+    
+    def replace(self, code: str) -> CodeUpdate:
+        """
+        Replace the tracked code with arbitrary text (e.g. a placeholder).
+        
+        Returns:
+            CodeUpdate: Update with a single edit replacing the whole code
+        """
+        edit = CodeEdit(0, self.line_count, code)
+        self.reset()
+        self._segments = code.splitlines(keepends=True)
+        self._line_offsets = list(range(len(self._segments) + 1))
+        self._regions = [0, len(self._segments)]
+        return CodeUpdate(code=code, edits=[edit])
+    
+    def generate(self, project_name: str, widgets: Sequence[Dict[str, Any]],
+                 generated_at: Optional[datetime] = None) -> CodeUpdate:
+        """
+        Generate code for a design, reusing fragments of unchanged widgets.
+        
+        Args:
+            project_name: Project name (used for the window class and title)
+            widgets: Widget dicts in design order
+            generated_at: Timestamp for the header (defaults to now)
+        
+        Returns:
+            CodeUpdate: Full code (same as generate_gui_code) and edits
+        """
+        if self._registry_version != _registry_version:
+            self._fragments = {}
+            self._registry_version = _registry_version
+        
+        generated_at = generated_at or datetime.now()
+        class_name = project_name.replace(' ', '_')
+        
+        # Header and footer lines are separate segments so only the date line
+        # changes between runs
+        segments = HEADER_TEMPLATE.format(
+            date=generated_at.strftime("%Y-%m-%d %H:%M:%S"),
+            class_name=class_name,
+            title=project_name
+        ).splitlines(keepends=True)
+        header_lines = len(segments)
+        
+        cached = self._fragments
+        fragments = {}
+        used = []
+        regenerated = 0
+        
+        for i, widget in enumerate(widgets):
+            signature = _widget_signature(i, widget)
+            key = widget.id if type(widget) is WidgetRecord else widget.get('id')
+            if key is None:
+                key = signature[1]
+            
+            fragment = cached.get(key)
+            if fragment is None or fragment.signature != signature:
+                fragment = self._emit_fragment(signature)
+                regenerated += 1
+            fragments[key] = fragment
+            used.append(fragment)
+        
+        layouts = [fragment for fragment in used if fragment.layout]
+        handlers = [fragment for fragment in used if fragment.handlers]
+        footer = FOOTER_TEMPLATE.format(class_name=class_name).splitlines(keepends=True)
+        
+        segments += [fragment.layout for fragment in layouts]
+        segments += [fragment.handlers for fragment in handlers]
+        segments += footer
+        
+        regions = [0, header_lines, header_lines + len(layouts)]
+        regions.append(regions[-1] + len(handlers))
+        regions.append(len(segments))
+        
+        line_counts = [1] * header_lines
+        line_counts += [fragment.layout_lines for fragment in layouts]
+        line_counts += [fragment.handler_lines for fragment in handlers]
+        line_counts += [1] * len(footer)
+        line_offsets = list(accumulate(line_counts, initial=0))
+        
+        edits = self._diff(segments, regions)
+        self._fragments = fragments
+        self._segments = segments
+        self._line_offsets = line_offsets
+        self._regions = regions
+        
+        return CodeUpdate(
+            code=''.join(segments),
+            edits=edits,
+            regenerated=regenerated,
+            reused=len(widgets) - regenerated
+        )
+    
+    @staticmethod
+    def _emit_fragment(signature: Tuple[str, str, str]) -> _Fragment:
+        widget_type, name, text = signature
+        emitter = _emitters.get(widget_type)
+        if emitter is None:
+            return _Fragment(signature, '', 0, '', 0)
+        layout, handlers = emitter.render(name, text)
+        return _Fragment(signature, layout, layout.count('\n'), handlers, handlers.count('\n'))
+    
+    def _diff(self, segments: List[str], regions: List[int]) -> List[CodeEdit]:
+        """
+        Line edits from the previous segments to new ones.
+        
+        Unchanged prefixes and suffixes are trimmed per region (header, layout,
+        handlers, footer), so the cost is linear and a single widget change
+        yields one edit per region it touches. Small remaining ranges are
+        matched exactly to split scattered changes into separate edits.
+        """
+        old = self._segments
+        offsets = self._line_offsets
+        old_regions = self._regions
+        if len(old_regions) != len(regions):
+            old_regions = [0, len(old)]
+            regions = [0, len(segments)]
+        
+        edits = []
+        for r in range(len(regions) - 1):
+            i1, i2 = old_regions[r], old_regions[r + 1]
+            j1, j2 = regions[r], regions[r + 1]
+            
+            while i1 < i2 and j1 < j2 and old[i1] == segments[j1]:
+                i1 += 1
+                j1 += 1
+            while i1 < i2 and j1 < j2 and old[i2 - 1] == segments[j2 - 1]:
+                i2 -= 1
+                j2 -= 1
+            if i1 == i2 and j1 == j2:
+                continue
+            
+            if 0 < i2 - i1 <= DIFF_MATCH_LIMIT and 0 < j2 - j1 <= DIFF_MATCH_LIMIT:
+                matcher = difflib.SequenceMatcher(None, old[i1:i2], segments[j1:j2], autojunk=False)
+                for tag, a1, a2, b1, b2 in matcher.get_opcodes():
+                    if tag != 'equal':
+                        edits.append(CodeEdit(offsets[i1 + a1], offsets[i1 + a2],
+                                              ''.join(segments[j1 + b1:j1 + b2])))
+            else:
+                edits.append(CodeEdit(offsets[i1], offsets[i2], ''.join(segments[j1:j2])))
+        
+        return edits
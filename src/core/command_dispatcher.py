@@ -4,12 +4,76 @@ Implements command pattern for undo/redo functionality.
 PyQt5 compatible version.
 """
 
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, Deque, Hashable, Iterator, List, Optional, Callable, Tuple, Union
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+import functools
 import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import zlib
 from datetime import datetime
 
+from core.atomic_io import atomic_open
+
+
+# Commands further back in the history than this are compacted
+HISTORY_UNCOMPACTED = 10
+
+# Estimated memory budget of the undo history (the newest command is always kept)
+MAX_HISTORY_BYTES = 32 * 1024 * 1024
+
+# Seconds between two mergeable commands for them to form one undo step
+COALESCE_WINDOW = 1.0
+
+# History entries between widget snapshots used by undo_many / revert_to
+SNAPSHOT_INTERVAL = 50
+
+# First line of command logs and saved histories
+HISTORY_LOG_FORMAT = 'gui_constructor_command_log'
+HISTORY_LOG_VERSION = 1
+
+# Worker threads of execute_async per execution kind ('cpu' work only runs
+# in parallel in the process pool, threads just keep it off the GUI thread)
+ASYNC_WORKERS = {'io': 4, 'cpu': 1}
+
+_SCALAR_TYPES = frozenset((str, bytes, int, float, bool, type(None)))
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Roughly estimate the deep size of a command payload in bytes.
+    
+    Follows containers and __slots__ objects (e.g. WidgetRecord); other
+    objects are counted shallowly so shared state like the core is not walked.
+    """
+    size = sys.getsizeof(value)
+    if type(value) in _SCALAR_TYPES or _depth > 8:
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(key, _depth + 1) + estimate_size(item, _depth + 1)
+                          for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset, deque)):
+        return size + sum(estimate_size(item, _depth + 1) for item in value)
+    slots = getattr(type(value), '__slots__', None)
+    if slots:
+        return size + sum(estimate_size(getattr(value, name, None), _depth + 1) for name in slots)
+    return size
+
+
+def _compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode('utf-8'), 6)
+
+
+def _decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode('utf-8')
+
 
 @dataclass
 class CommandResult:
@@ -28,12 +92,27 @@ class CommandResult:
 class Command(ABC):
     """Abstract base class for all commands"""
     
+    # Attributes referencing shared application state, not counted as payload
+    shared_attributes = ('core', 'snapshot')
+    
+    # False for commands that leave the widgets unchanged (skipped when
+    # replaying history from a widget snapshot)
+    changes_widgets = True
+    
+    # Where execute_async runs the command: 'inline' on the calling thread,
+    # 'io' or 'cpu' on a worker (see CommandDispatcher.execute_async)
+    execution_kind = 'inline'
+    
     def __init__(self, name: str, description: str = ""):
         self.name = name
         self.description = description
         self.timestamp = datetime.now().isoformat()
         self.executed = False
         self.result: Optional[CommandResult] = None
+        self.history_size = 0  # Estimated bytes, maintained by CommandDispatcher
+        self.executed_at: Optional[float] = None  # time.time() of the last successful execution
+        self.snapshot = None  # Widgets after this command, set by CommandDispatcher
+        self.snapshot_size = 0  # Estimated bytes not shared with the previous snapshot
     
     @abstractmethod
     def execute(self) -> CommandResult:
@@ -49,6 +128,84 @@ class Command(ABC):
         """Redo the command"""
         return self.execute()
     
+    def estimate_size(self) -> int:
+        """Estimated memory held by the command, for the history byte budget"""
+        size = 0
+        for key, value in vars(self).items():
+            if key not in self.shared_attributes:
+                size += estimate_size(value)
+        if self.result is not None:
+            size += estimate_size(self.result.data)
+        return size + self.snapshot_size
+    
+    def compact(self):
+        """
+        Shrink large payloads once the command is deep in the history.
+        
+        Undo and redo must keep working; payloads may be compressed or
+        dropped and recomputed when accessed. Called repeatedly, so it must
+        be cheap when there is nothing left to compact.
+        """
+        pass
+    
+    def merge_key(self) -> Optional[Hashable]:
+        """
+        Key of the target this command changes, for coalescing.
+        
+        Consecutive commands of the same type with equal keys may be merged
+        into one undo step; None (the default) disables merging.
+        """
+        return None
+    
+    def merge(self, other: 'Command') -> bool:
+        """
+        Absorb a later, already executed command with the same merge key.
+        
+        Afterwards undo() must revert both and redo() must reapply both.
+        
+        Returns:
+            bool: False if the commands cannot be merged
+        """
+        return False
+    
+    def prepare(self):
+        """
+        Capture the state a worker needs, on the thread calling execute_async.
+        
+        Commands running on a worker must not read state the GUI thread keeps
+        changing (e.g. the live widgets); copy it here instead.
+        """
+        pass
+    
+    def process_task(self) -> Optional[Tuple[Callable, tuple]]:
+        """
+        Picklable (function, args) computing the result in a worker process.
+        
+        Only used for 'cpu' commands when the dispatcher has a process pool;
+        finish_task then turns the value into the result. None (the default)
+        runs execute() on a worker thread.
+        """
+        return None
+    
+    def finish_task(self, value: Any) -> CommandResult:
+        """Complete the command with the value of its process_task (overridden together with it)"""
+        raise TypeError(f"{type(self).__name__} has no process_task to finish")
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # process_task and finish_task only work as a pair
+        if (cls.process_task is not Command.process_task) != (cls.finish_task is not Command.finish_task):
+            raise TypeError(f"{cls.__name__} must override both process_task and finish_task")
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        """
+        Constructor arguments (without core) as JSON-serialisable values.
+        
+        Used to log and replay commands; None (the default) means the
+        command cannot be serialised.
+        """
+        return None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert command to dictionary for serialization"""
         return {
@@ -69,10 +226,15 @@ class AddWidgetCommand(Command):
         self.properties = properties
         self.core = core
         self.widget_data = None
+        self._created = None  # Copy of the widget as added, for redo
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        return {'widget_type': self.widget_type, 'properties': self.properties}
     
     def execute(self) -> CommandResult:
         try:
             self.widget_data = self.core.add_widget(self.widget_type, self.properties)
+            self._created = self.widget_data.copy()
             self.executed = True
             
             self.result = CommandResult(
@@ -90,6 +252,27 @@ class AddWidgetCommand(Command):
         
         return self.result
     
+    def redo(self) -> CommandResult:
+        # Re-add the same widget (same id), so later commands still find it
+        if self._created is None:
+            return self.execute()
+        
+        record = self._created.copy()
+        if not self.core.restore_widgets([(len(self.core.project.widgets), record)]):
+            return CommandResult(
+                success=False,
+                message=f"Failed to re-add widget {record.id}"
+            )
+        
+        self.widget_data = record
+        self.executed = True
+        self.result = CommandResult(
+            success=True,
+            message=f"Added {self.widget_type} to canvas",
+            data={'widget_data': self.widget_data}
+        )
+        return self.result
+    
     def undo(self) -> CommandResult:
         if not self.executed or not self.widget_data:
             return CommandResult(
@@ -121,23 +304,397 @@ class AddWidgetCommand(Command):
             )
 
 
+class AddWidgetsCommand(Command):
+    """Command to add several widgets to canvas as one undo step"""
+    
+    def __init__(self, widgets: List[Tuple[str, Dict[str, Any]]], core):
+        super().__init__("Add Widgets", f"Add {len(widgets)} widgets to canvas")
+        self.widgets = widgets
+        self.core = core
+        self.widget_ids: List[str] = []
+        self._created = []  # Copies of the widgets as added, for redo
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        return {'widgets': [[widget_type, properties] for widget_type, properties in self.widgets]}
+    
+    def execute(self) -> CommandResult:
+        try:
+            records = self.core.add_widgets(self.widgets)
+            self.widget_ids = [record.id for record in records]
+            self._created = [record.copy() for record in records]
+            self.executed = True
+            
+            self.result = CommandResult(
+                success=True,
+                message=f"Added {len(records)} widgets to canvas",
+                data={'widget_ids': self.widget_ids}
+            )
+            
+        except Exception as e:
+            self.result = CommandResult(
+                success=False,
+                message=f"Failed to add widgets: {e}",
+                error=str(e)
+            )
+        
+        return self.result
+    
+    def redo(self) -> CommandResult:
+        # Re-add the same widgets (same ids) at the end of the design
+        if not self._created:
+            return self.execute()
+        
+        end = len(self.core.project.widgets)
+        if not self.core.restore_widgets([(end + i, record.copy()) for i, record in enumerate(self._created)]):
+            return CommandResult(
+                success=False,
+                message="Failed to re-add widgets"
+            )
+        
+        self.executed = True
+        self.result = CommandResult(
+            success=True,
+            message=f"Added {len(self._created)} widgets to canvas",
+            data={'widget_ids': self.widget_ids}
+        )
+        return self.result
+    
+    def undo(self) -> CommandResult:
+        if not self.executed:
+            return CommandResult(
+                success=False,
+                message="Command not executed yet"
+            )
+        
+        try:
+            removed = self.core.remove_widgets(self.widget_ids)
+            return CommandResult(
+                success=True,
+                message=f"Removed {len(removed)} widgets from canvas",
+                data={'widget_ids': self.widget_ids}
+            )
+        except Exception as e:
+            return CommandResult(
+                success=False,
+                message=f"Failed to undo: {e}",
+                error=str(e)
+            )
+
+
+class UpdateWidgetsCommand(Command):
+    """Command to update properties of several widgets as one undo step"""
+    
+    def __init__(self, updates: Dict[str, Dict[str, Any]], core):
+        super().__init__("Update Widgets", f"Update {len(updates)} widgets")
+        self.updates = updates
+        self.core = core
+        self.previous: Dict[str, Dict[str, Any]] = {}
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        return {'updates': self.updates}
+    
+    def execute(self) -> CommandResult:
+        try:
+            widgets = self.core.project.widgets
+            self.previous = {
+                widget_id: widgets[widget_id].properties
+                for widget_id in self.updates if widget_id in widgets
+            }
+            updated = self.core.update_widgets(self.updates)
+            self.executed = True
+            
+            self.result = CommandResult(
+                success=True,
+                message=f"Updated {len(updated)} widgets",
+                data={'widget_ids': updated}
+            )
+            
+        except Exception as e:
+            self.result = CommandResult(
+                success=False,
+                message=f"Failed to update widgets: {e}",
+                error=str(e)
+            )
+        
+        return self.result
+    
+    def merge_key(self) -> Optional[Hashable]:
+        # Same widgets and same properties, e.g. typing into one property field
+        return frozenset((widget_id, frozenset(properties)) for widget_id, properties in self.updates.items())
+    
+    def merge(self, other: Command) -> bool:
+        # previous still holds the state before the first update
+        self.updates = {widget_id: {**properties, **other.updates[widget_id]}
+                        for widget_id, properties in self.updates.items()}
+        return True
+    
+    def undo(self) -> CommandResult:
+        if not self.executed:
+            return CommandResult(
+                success=False,
+                message="Command not executed yet"
+            )
+        
+        try:
+            restored = self.core.update_widgets(self.previous, replace=True)
+            return CommandResult(
+                success=True,
+                message=f"Restored properties of {len(restored)} widgets",
+                data={'widget_ids': restored}
+            )
+        except Exception as e:
+            return CommandResult(
+                success=False,
+                message=f"Failed to undo: {e}",
+                error=str(e)
+            )
+
+
+class UpdateWidgetCommand(UpdateWidgetsCommand):
+    """Command to update properties of one widget"""
+    
+    def __init__(self, widget_id: str, properties: Dict[str, Any], core):
+        super().__init__({widget_id: properties}, core)
+        self.name = "Update Widget"
+        self.description = f"Update {widget_id}"
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        (widget_id, properties), = self.updates.items()
+        return {'widget_id': widget_id, 'properties': properties}
+
+
+class RemoveWidgetsCommand(Command):
+    """Command to remove several widgets from canvas as one undo step"""
+    
+    def __init__(self, widget_ids: List[str], core):
+        super().__init__("Remove Widgets", f"Remove {len(widget_ids)} widgets from canvas")
+        self.widget_ids = widget_ids
+        self.core = core
+        self.removed = []
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        return {'widget_ids': list(self.widget_ids)}
+    
+    def execute(self) -> CommandResult:
+        try:
+            self.removed = self.core.remove_widgets(self.widget_ids)
+            self.executed = True
+            
+            self.result = CommandResult(
+                success=True,
+                message=f"Removed {len(self.removed)} widgets from canvas",
+                data={'widget_ids': [record.id for _, record in self.removed]}
+            )
+            
+        except Exception as e:
+            self.result = CommandResult(
+                success=False,
+                message=f"Failed to remove widgets: {e}",
+                error=str(e)
+            )
+        
+        return self.result
+    
+    def undo(self) -> CommandResult:
+        if not self.executed:
+            return CommandResult(
+                success=False,
+                message="Command not executed yet"
+            )
+        
+        if self.core.restore_widgets(self.removed):
+            return CommandResult(
+                success=True,
+                message=f"Restored {len(self.removed)} widgets",
+                data={'widget_ids': [record.id for _, record in self.removed]}
+            )
+        return CommandResult(
+            success=False,
+            message="Failed to restore removed widgets"
+        )
+
+
+class MoveWidgetsCommand(Command):
+    """Command to move several widgets (e.g. alignment) as one undo step"""
+    
+    def __init__(self, positions: Dict[str, Tuple[int, int]], core, name: str = "Move Widgets"):
+        super().__init__(name, f"Move {len(positions)} widgets")
+        self.positions = positions
+        self.core = core
+        self.previous: Dict[str, Tuple[int, int]] = {}
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        return {'positions': {widget_id: list(position) for widget_id, position in self.positions.items()},
+                'name': self.name}
+    
+    def execute(self) -> CommandResult:
+        try:
+            self.previous = self.core.move_widgets(self.positions)
+            self.executed = True
+            
+            self.result = CommandResult(
+                success=True,
+                message=f"Moved {len(self.previous)} widgets",
+                data={'widget_ids': list(self.previous)}
+            )
+            
+        except Exception as e:
+            self.result = CommandResult(
+                success=False,
+                message=f"Failed to move widgets: {e}",
+                error=str(e)
+            )
+        
+        return self.result
+    
+    def merge_key(self) -> Optional[Hashable]:
+        # Same action on the same widgets, e.g. successive positions of one drag
+        # (an align left followed by an align right stays two steps)
+        return self.name, frozenset(self.positions)
+    
+    def merge(self, other: Command) -> bool:
+        # previous still holds the positions before the first move
+        self.positions = other.positions
+        return True
+    
+    def undo(self) -> CommandResult:
+        if not self.executed:
+            return CommandResult(
+                success=False,
+                message="Command not executed yet"
+            )
+        
+        try:
+            self.core.move_widgets(self.previous)
+            return CommandResult(
+                success=True,
+                message=f"Moved {len(self.previous)} widgets back",
+                data={'widget_ids': list(self.previous)}
+            )
+        except Exception as e:
+            return CommandResult(
+                success=False,
+                message=f"Failed to undo: {e}",
+                error=str(e)
+            )
+
+
+class CompositeCommand(Command):
+    """Several executed commands undone and redone as one step (a transaction)"""
+    
+    def __init__(self, name: str, description: str = ""):
+        super().__init__(name, description)
+        self.children: List[Command] = []
+    
+    def add(self, command: Command):
+        """Add an executed command"""
+        self.children.append(command)
+        self.executed = True
+    
+    def execute(self) -> CommandResult:
+        # Children were executed when they were added; this reapplies them (redo)
+        done = []
+        for command in self.children:
+            result = command.redo()
+            if not result.success:
+                for executed in reversed(done):
+                    executed.undo()
+                return CommandResult(
+                    success=False,
+                    message=f"Failed to redo {command.name}: {result.message}",
+                    error=result.error
+                )
+            done.append(command)
+        
+        self.executed = True
+        return CommandResult(
+            success=True,
+            message=f"{self.name}: {len(self.children)} commands",
+            data={'commands': len(self.children)}
+        )
+    
+    def undo(self) -> CommandResult:
+        for command in reversed(self.children):
+            result = command.undo()
+            if not result.success:
+                return CommandResult(
+                    success=False,
+                    message=f"Failed to undo {command.name}: {result.message}",
+                    error=result.error
+                )
+        
+        return CommandResult(
+            success=True,
+            message=f"Undone {self.name}: {len(self.children)} commands",
+            data={'commands': len(self.children)}
+        )
+    
+    def estimate_size(self) -> int:
+        # A snapshot taken by CommandDispatcher is attached to the composite itself
+        return (sys.getsizeof(self) + sum(command.estimate_size() for command in self.children) +
+                self.snapshot_size)
+    
+    def compact(self):
+        for command in self.children:
+            command.compact()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data['commands'] = [command.to_dict() for command in self.children]
+        return data
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        # Children are serialised by CommandDispatcher.serialize_command
+        return {'name': self.name, 'description': self.description}
+
+
 class GenerateCodeCommand(Command):
     """Command to generate code"""
     
+    changes_widgets = False
+    execution_kind = 'cpu'
+    
     def __init__(self, core):
         super().__init__("Generate Code", "Generate GUI code from design")
         self.core = core
-        self.generated_code = None
+        self._code: Optional[str] = None
+        self._compressed_code: Optional[bytes] = None
+        self._widgets = None  # Widget snapshot taken by prepare()
+    
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        return {}
+    
+    @property
+    def generated_code(self) -> Optional[str]:
+        if self._code is None and self._compressed_code is not None:
+            return _decompress_text(self._compressed_code)
+        return self._code
+    
+    @generated_code.setter
+    def generated_code(self, code: Optional[str]):
+        self._code = code
+        self._compressed_code = None
+    
+    def compact(self):
+        # Generated code compresses well (~10x)
+        if self._code is not None:
+            self._compressed_code = _compress_text(self._code)
+            self._code = None
+    
+    def prepare(self):
+        self._widgets = self.core.widget_snapshot()
     
     def execute(self) -> CommandResult:
         try:
-            self.generated_code = self.core.generate_gui_code()
+            widgets, self._widgets = self._widgets, None
+            update = self.core.generate_code_update(widgets)
+            self.generated_code = update.code
             self.executed = True
             
             return CommandResult(
                 success=True,
                 message="Code generated successfully",
-                data={'code': self.generated_code}
+                data={'code': self.generated_code, 'edits': update.edits}
             )
         except Exception as e:
             return CommandResult(
@@ -157,12 +714,63 @@ class GenerateCodeCommand(Command):
 class AnalyzeCodeCommand(Command):
     """Command to analyze code"""
     
+    changes_widgets = False
+    execution_kind = 'cpu'
+    
     def __init__(self, code: str, core):
         super().__init__("Analyze Code", "Analyze code for issues and metrics")
         self.code = code
         self.core = core
         self.analysis_result = None
     
+    def to_args(self) -> Optional[Dict[str, Any]]:
+        return {'code': self.code}
+    
+    @property
+    def code(self) -> str:
+        if self._code is None:
+            return _decompress_text(self._compressed_code)
+        return self._code
+    
+    @code.setter
+    def code(self, code: str):
+        self._code = code
+        self._compressed_code = None
+    
+    @property
+    def analysis_result(self) -> Optional[Dict[str, Any]]:
+        if self._analysis is None and self._analysis_dropped:
+            # Recomputed on demand (cheap with the analysis cache), not kept
+            return self.core.analyze_code(self.code)
+        return self._analysis
+    
+    @analysis_result.setter
+    def analysis_result(self, analysis: Optional[Dict[str, Any]]):
+        self._analysis = analysis
+        self._analysis_dropped = False
+    
+    def compact(self):
+        if self._code is not None:
+            self._compressed_code = _compress_text(self._code)
+            self._code = None
+        if self._analysis is not None:
+            self._analysis = None
+            self._analysis_dropped = True
+    
+    def process_task(self) -> Optional[Tuple[Callable, tuple]]:
+        from core.app_core import code_metrics
+        return code_metrics, (self.code,)
+    
+    def finish_task(self, value: Any) -> CommandResult:
+        self.analysis_result = value
+        self.executed = True
+        print(f"✓ Code analyzed: {value['total_lines']} lines, {len(value['issues'])} issues found")
+        return CommandResult(
+            success=True,
+            message="Code analysis completed",
+            data={'analysis': value}
+        )
+    
     def execute(self) -> CommandResult:
         try:
             self.analysis_result = self.core.analyze_code(self.code)
@@ -188,13 +796,61 @@ class AnalyzeCodeCommand(Command):
         )
 
 
+def _synchronized(method):
+    """Run a CommandDispatcher method under its history lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+CompletionListener = Callable[[Command, CommandResult], None]
+
+
 class CommandDispatcher:
-    """Manages command execution, undo, and redo"""
+    """
+    Manages command execution, undo, and redo.
     
-    def __init__(self, max_history: int = 100):
-        self.command_history: List[Command] = []
-        self.undo_stack: List[Command] = []
+    The history is bounded by command count and by an estimated byte
+    budget; the oldest commands are evicted first. Commands older than the
+    HISTORY_UNCOMPACTED most recent ones are compacted (see Command.compact).
+    With a core, every SNAPSHOT_INTERVAL-th entry keeps a snapshot of the
+    widgets, so undo_many and revert_to can jump back many steps with one
+    snapshot restore and a short replay instead of undoing each command.
+    
+    execute_async runs long commands on worker threads or processes; their
+    results enter the history in submission order. History methods are
+    thread-safe, but commands executed synchronously and undo/redo must be
+    called from one thread (the GUI thread).
+    """
+    
+    def __init__(self, max_history: int = 100, max_history_bytes: int = MAX_HISTORY_BYTES,
+                 coalesce_window: float = COALESCE_WINDOW, core=None,
+                 snapshot_interval: int = SNAPSHOT_INTERVAL, use_processes: bool = False):
+        self.core = core
+        self._lock = threading.RLock()
+        self.use_processes = use_processes  # Run process_task of 'cpu' commands in a process pool
+        self._executors: Dict[str, Executor] = {}
+        self._submitted = 0  # Submission number of the next execute_async call
+        self._next_to_apply = 0
+        self._completed: Dict[int, Tuple[Command, CommandResult, Future]] = {}
+        self.completion_listeners: List[CompletionListener] = []  # Called on the completing thread
+        self.snapshot_interval = snapshot_interval
+        self._since_snapshot = snapshot_interval  # First entry gets a snapshot
+        self._last_snapshot = None
+        self.command_history: Deque[Command] = deque()
+        self.undo_stack: Deque[Command] = deque()  # Undone commands, for redo
         self.max_history = max_history
+        self.max_history_bytes = max_history_bytes
+        self.history_bytes = 0
+        self.evicted_commands = 0  # Dropped from the front of the history since it was cleared
+        self.coalesce_window = coalesce_window
+        self._transactions: List[CompositeCommand] = []
+        self._coalesce_target: Optional[Command] = None  # Last added command, while mergeable
+        self._coalesce_time = 0.0
+        self.command_types: Dict[type, str] = {}  # Command class -> registered type name
+        self._log_file = None
         self.registered_commands: Dict[str, Callable] = {}
         
         # Register default commands
@@ -203,13 +859,21 @@ class CommandDispatcher:
     def _register_default_commands(self):
         """Register default command types"""
         self.register_command_type("add_widget", AddWidgetCommand)
+        self.register_command_type("add_widgets", AddWidgetsCommand)
+        self.register_command_type("update_widget", UpdateWidgetCommand)
+        self.register_command_type("update_widgets", UpdateWidgetsCommand)
+        self.register_command_type("remove_widgets", RemoveWidgetsCommand)
+        self.register_command_type("move_widgets", MoveWidgetsCommand)
         self.register_command_type("generate_code", GenerateCodeCommand)
         self.register_command_type("analyze_code", AnalyzeCodeCommand)
+        self.register_command_type("composite", CompositeCommand)
     
     def register_command_type(self, command_type: str, command_class):
         """Register a new command type"""
         self.registered_commands[command_type] = command_class
+        self.command_types[command_class] = command_type
     
+    @_synchronized
     def execute_command(self, command: Command) -> CommandResult:
         """
         Execute a command and add to history.
@@ -221,23 +885,290 @@ class CommandDispatcher:
             CommandResult: Execution result
         """
         result = command.execute()
-        
+        self._record(command, result)
+        return result
+    
+    def _record(self, command: Command, result: CommandResult):
+        """Add an executed command to the history (or report its failure)"""
         if result.success:
-            # Add to history
-            self.command_history.append(command)
+            command.executed_at = time.time()
             
             # Clear redo stack
             self.undo_stack.clear()
             
-            # Limit history size
-            if len(self.command_history) > self.max_history:
-                self.command_history.pop(0)
+            # Merged into the previous step of the same gesture
+            if self._coalesce(command):
+                self._log({'op': 'execute', 'merge': True, **self.serialize_command(command)})
+                return
+            self._log({'op': 'execute', **self.serialize_command(command)})
             
-            print(f"✓ Command executed: {command.name}")
+            # Add to history (or to the open transaction)
+            if self._transactions:
+                self._transactions[-1].add(command)
+            else:
+                self._push_history(command)
+                print(f"✓ Command executed: {command.name}")
+            self._coalesce_target = command
+            self._coalesce_time = time.monotonic()
         else:
             print(f"✗ Command failed: {command.name} - {result.message}")
+    
+    def execute_async(self, command: Command) -> 'Future[CommandResult]':
+        """
+        Execute a command without blocking the caller.
         
-        return result
+        'inline' commands run at once on the calling thread; 'io' and 'cpu'
+        commands run on a worker thread after prepare() captured their
+        input, 'cpu' commands with a process_task in the process pool if
+        use_processes is set. Whatever order the commands finish in, they
+        are added to the history in submission order; the future resolves
+        and completion listeners are called once the command is in the
+        history (or failed).
+        
+        Args:
+            command: Command to execute
+        
+        Returns:
+            Future: Resolves to the CommandResult
+        """
+        future: Future = Future()
+        with self._lock:
+            seq = self._submitted
+            self._submitted += 1
+        
+        kind = command.execution_kind
+        try:
+            command.prepare()
+            if kind not in ASYNC_WORKERS:
+                self._complete(seq, command, self._run(command), future)
+                return future
+            
+            task = command.process_task() if kind == 'cpu' and self.use_processes else None
+            if task is not None:
+                function, args = task
+                work = self._executor('process').submit(function, *args)
+                work.add_done_callback(lambda done: self._complete(seq, command, self._finish(command, done), future))
+            else:
+                work = self._executor(kind).submit(self._run, command)
+                work.add_done_callback(lambda done: self._complete(seq, command, done.result(), future))
+        except Exception as e:
+            self._complete(seq, command, CommandResult(
+                success=False,
+                message=f"Failed to start {command.name}: {e}",
+                error=str(e)
+            ), future)
+        return future
+    
+    def _executor(self, kind: str) -> Executor:
+        with self._lock:
+            executor = self._executors.get(kind)
+            if executor is None:
+                if kind == 'process':
+                    # Forking a process with running (Qt, pool) threads is unsafe
+                    executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+                else:
+                    executor = ThreadPoolExecutor(ASYNC_WORKERS[kind], thread_name_prefix=f'command-{kind}')
+                self._executors[kind] = executor
+            return executor
+    
+    def _run(self, command: Command) -> CommandResult:
+        try:
+            return command.execute()
+        except Exception as e:
+            return CommandResult(
+                success=False,
+                message=f"{command.name} raised: {e}",
+                error=str(e)
+            )
+    
+    def _finish(self, command: Command, done: Future) -> CommandResult:
+        try:
+            return command.finish_task(done.result())
+        except Exception as e:
+            return CommandResult(
+                success=False,
+                message=f"{command.name} failed in worker process: {e}",
+                error=str(e)
+            )
+    
+    def _complete(self, seq: int, command: Command, result: CommandResult, future: Future):
+        """Record finished submissions in order; later ones wait for earlier ones"""
+        with self._lock:
+            self._completed[seq] = (command, result, future)
+            ready = []
+            while self._next_to_apply in self._completed:
+                ready.append(self._completed.pop(self._next_to_apply))
+                self._next_to_apply += 1
+            for command, result, _ in ready:
+                self._record(command, result)
+        
+        for command, result, future in ready:
+            future.set_result(result)
+            for listener in list(self.completion_listeners):
+                try:
+                    listener(command, result)
+                except Exception as e:
+                    print(f"✗ Command completion listener failed: {e}")
+    
+    def pending_async(self) -> int:
+        """Number of execute_async submissions not yet in the history"""
+        with self._lock:
+            return self._submitted - self._next_to_apply
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pools (waiting for running commands by default)"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait)
+    
+    def _push_history(self, command: Command):
+        """Append to history, compacting and evicting old commands"""
+        history = self.command_history
+        self._since_snapshot += 1
+        if (self.core is not None and command.changes_widgets and
+                self._since_snapshot >= self.snapshot_interval):
+            self._take_snapshot(command)
+        command.history_size = command.estimate_size()
+        history.append(command)
+        self.history_bytes += command.history_size
+        
+        # Compact the command that just left the recent window
+        if len(history) > HISTORY_UNCOMPACTED:
+            self._compact(history[-HISTORY_UNCOMPACTED - 1])
+        
+        # Limit history size
+        while len(history) > 1 and (len(history) > self.max_history or
+                                    self.history_bytes > self.max_history_bytes):
+            self.history_bytes -= history.popleft().history_size
+            self.evicted_commands += 1
+    
+    def _take_snapshot(self, command: Command):
+        """Attach a widget snapshot, sharing unchanged widgets with the previous one"""
+        previous = self._last_snapshot
+        snapshot = self.core.widget_snapshot(previous)
+        shared = {id(record) for record in previous} if previous else set()
+        command.snapshot = snapshot
+        command.snapshot_size = sys.getsizeof(snapshot) + sum(
+            estimate_size(record) for record in snapshot if id(record) not in shared)
+        self._last_snapshot = snapshot
+        self._since_snapshot = 0
+    
+    def _coalesce(self, command: Command) -> bool:
+        """Merge command into the previous one if both belong to one gesture"""
+        target = self._coalesce_target
+        now = time.monotonic()
+        if (target is None or type(target) is not type(command) or
+                now - self._coalesce_time > self.coalesce_window):
+            return False
+        
+        key = command.merge_key()
+        if key is None or key != target.merge_key() or not target.merge(command):
+            return False
+        
+        self._coalesce_time = now
+        if target.snapshot is not None:
+            # The snapshot no longer matches the merged command; retake it on the next entry
+            target.snapshot = None
+            target.snapshot_size = 0
+            self._since_snapshot = self.snapshot_interval
+        if not self._transactions:
+            size = target.estimate_size()
+            self.history_bytes += size - target.history_size
+            target.history_size = size
+        return True
+    
+    def break_coalescing(self):
+        """End the current gesture (e.g. on mouse release); the next command starts a new step"""
+        self._coalesce_target = None
+    
+    @_synchronized
+    def begin_transaction(self, name: str, description: str = ""):
+        """
+        Group the following commands into one undo step until commit().
+        
+        Transactions nest; an inner transaction becomes one step of the outer one.
+        """
+        self._transactions.append(CompositeCommand(name, description))
+        self._coalesce_target = None
+        self._log({'op': 'begin', 'name': name, 'description': description})
+    
+    @_synchronized
+    def commit(self) -> Optional[Command]:
+        """
+        Close the innermost transaction and add it to the history.
+        
+        Returns:
+            Command: The recorded step (None if the transaction was empty)
+        """
+        if not self._transactions:
+            print("✗ No transaction to commit")
+            return None
+        
+        transaction = self._transactions.pop()
+        self._coalesce_target = None
+        self._log({'op': 'commit'})
+        if not transaction.children:
+            return None
+        
+        # A single command needs no wrapper
+        command = transaction.children[0] if len(transaction.children) == 1 else transaction
+        if self._transactions:
+            self._transactions[-1].add(command)
+        else:
+            self._push_history(command)
+            print(f"✓ Transaction committed: {transaction.name} ({len(transaction.children)} commands)")
+        return command
+    
+    @_synchronized
+    def rollback(self) -> bool:
+        """
+        Undo and discard the commands of the innermost transaction.
+        
+        Returns:
+            bool: Success status
+        """
+        if not self._transactions:
+            print("✗ No transaction to roll back")
+            return False
+        
+        transaction = self._transactions.pop()
+        self._coalesce_target = None
+        self._log({'op': 'rollback'})
+        result = transaction.undo()
+        if result.success:
+            print(f"✓ Transaction rolled back: {transaction.name}")
+        else:
+            print(f"✗ Rollback failed: {transaction.name} - {result.message}")
+        return result.success
+    
+    @contextmanager
+    def transaction(self, name: str, description: str = "") -> Iterator[CompositeCommand]:
+        """Context manager committing on success and rolling back on error"""
+        self.begin_transaction(name, description)
+        try:
+            yield self._transactions[-1]
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+    
+    def in_transaction(self) -> bool:
+        """Check if a transaction is open"""
+        return bool(self._transactions)
+    
+    def _compact(self, command: Command):
+        if type(command).compact is Command.compact:
+            return
+        try:
+            command.compact()
+        except Exception as e:
+            print(f"✗ Error compacting command {command.name}: {e}")
+            return
+        size = command.estimate_size()
+        self.history_bytes += size - command.history_size
+        command.history_size = size
     
     def create_and_execute(self, command_type: str, **kwargs) -> CommandResult:
         """
@@ -261,6 +1192,7 @@ class CommandDispatcher:
         
         return self.execute_command(command)
     
+    @_synchronized
     def undo(self) -> CommandResult:
         """
         Undo last command.
@@ -268,6 +1200,11 @@ class CommandDispatcher:
         Returns:
             CommandResult: Undo result
         """
+        if self._transactions:
+            return CommandResult(
+                success=False,
+                message="Cannot undo inside a transaction"
+            )
         if not self.command_history:
             return CommandResult(
                 success=False,
@@ -275,16 +1212,20 @@ class CommandDispatcher:
             )
         
         command = self.command_history.pop()
+        self.history_bytes -= command.history_size
+        self._coalesce_target = None
         result = command.undo()
         
         if result.success:
             self.undo_stack.append(command)
+            self._log({'op': 'undo'})
             print(f"✓ Command undone: {command.name}")
         else:
             print(f"✗ Undo failed: {command.name} - {result.message}")
         
         return result
     
+    @_synchronized
     def redo(self) -> CommandResult:
         """
         Redo last undone command.
@@ -292,6 +1233,11 @@ class CommandDispatcher:
         Returns:
             CommandResult: Redo result
         """
+        if self._transactions:
+            return CommandResult(
+                success=False,
+                message="Cannot redo inside a transaction"
+            )
         if not self.undo_stack:
             return CommandResult(
                 success=False,
@@ -299,24 +1245,145 @@ class CommandDispatcher:
             )
         
         command = self.undo_stack.pop()
+        self._coalesce_target = None
         result = command.redo()
         
         if result.success:
-            self.command_history.append(command)
+            command.executed_at = time.time()
+            self._push_history(command)
+            self._log({'op': 'redo'})
             print(f"✓ Command redone: {command.name}")
         else:
             print(f"✗ Redo failed: {command.name} - {result.message}")
         
         return result
     
+    @_synchronized
+    def undo_many(self, count: int) -> CommandResult:
+        """
+        Undo the last count commands as fast as possible.
+        
+        If a widget snapshot lies closer to the target than count steps, the
+        snapshot is restored and only the commands after it are replayed;
+        otherwise the commands are undone one by one. Undone commands can be
+        redone as after single undos.
+        
+        Args:
+            count: Number of history entries to undo
+        
+        Returns:
+            CommandResult: Undo result
+        """
+        if self._transactions:
+            return CommandResult(
+                success=False,
+                message="Cannot undo inside a transaction"
+            )
+        
+        history = self.command_history
+        count = min(count, len(history))
+        if count <= 0:
+            return CommandResult(
+                success=False,
+                message="No commands to undo"
+            )
+        
+        target = len(history) - count  # First command to undo
+        base = None
+        for i in range(target - 1, max(target - 1 - count, -1), -1):
+            if history[i].snapshot is not None:
+                base = i
+                break
+        
+        if self.core is None or base is None:
+            for undone in range(count):
+                result = self.undo()
+                if not result.success:
+                    return CommandResult(
+                        success=False,
+                        message=f"Undid {undone} of {count} commands: {result.message}"
+                    )
+            return CommandResult(
+                success=True,
+                message=f"Undid {count} commands",
+                data={'undone': count}
+            )
+        
+        replay = [history[i] for i in range(base + 1, target) if history[i].changes_widgets]
+        failed = None
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            self.core.restore_widget_snapshot(history[base].snapshot)
+            for command in replay:
+                result = command.redo()
+                if not result.success:
+                    failed = (command, result)
+                    break
+        
+        if failed is not None:
+            command, result = failed
+            print(f"✗ Undo failed while replaying {command.name} - {result.message}")
+            return CommandResult(
+                success=False,
+                message=f"Failed to replay {command.name}: {result.message}"
+            )
+        
+        for _ in range(count):
+            command = history.pop()
+            self.history_bytes -= command.history_size
+            self.undo_stack.append(command)
+            self._log({'op': 'undo'})
+        self._coalesce_target = None
+        
+        print(f"✓ Undid {count} commands (snapshot + {len(replay)} replayed)")
+        return CommandResult(
+            success=True,
+            message=f"Undid {count} commands",
+            data={'undone': count, 'replayed': len(replay)}
+        )
+    
+    @_synchronized
+    def revert_to(self, when: Union[float, datetime]) -> CommandResult:
+        """
+        Undo every command executed after a point in time (e.g. 5 minutes ago).
+        
+        Args:
+            when: time.time() seconds or a datetime
+        
+        Returns:
+            CommandResult: Undo result
+        """
+        if isinstance(when, datetime):
+            when = when.timestamp()
+        
+        count = 0
+        for command in reversed(self.command_history):
+            if command.executed_at is None or command.executed_at <= when:
+                break
+            count += 1
+        
+        if not count:
+            return CommandResult(
+                success=True,
+                message="Nothing to revert",
+                data={'undone': 0}
+            )
+        return self.undo_many(count)
+    
     def get_history(self) -> List[Dict[str, Any]]:
         """Get command history as list of dictionaries"""
         return [cmd.to_dict() for cmd in self.command_history]
     
+    @_synchronized
     def clear_history(self):
         """Clear command history"""
         self.command_history.clear()
         self.undo_stack.clear()
+        self.history_bytes = 0
+        self.evicted_commands = 0
+        self._since_snapshot = self.snapshot_interval
+        self._last_snapshot = None
+        self._transactions.clear()
+        self._coalesce_target = None
         print("✓ Command history cleared")
     
     def can_undo(self) -> bool:
@@ -333,26 +1400,111 @@ class CommandDispatcher:
             return self.command_history[-1]
         return None
     
-    def save_history(self, filepath: str) -> bool:
+    def serialize_command(self, command: Command) -> Dict[str, Any]:
+        """Get a command as {'type', 'args'} (args None if it cannot be serialised)"""
+        data = {
+            'type': self.command_types.get(type(command), type(command).__name__),
+            'args': command.to_args()
+        }
+        if isinstance(command, CompositeCommand):
+            data['commands'] = [self.serialize_command(child) for child in command.children]
+        return data
+    
+    def build_command(self, data: Dict[str, Any], core) -> Command:
+        """
+        Rebuild a command from serialize_command output.
+        
+        Raises:
+            ValueError: Unknown or unserialisable command type
+        """
+        command_class = self.registered_commands.get(data.get('type'))
+        if command_class is None or data.get('args') is None:
+            raise ValueError(f"Cannot rebuild command: {data.get('type')}")
+        
+        if command_class is CompositeCommand:
+            command = CompositeCommand(**data['args'])
+            command.children = [self.build_command(child, core) for child in data.get('commands') or []]
+            return command
+        return command_class(**data['args'], core=core)
+    
+    def _log_header(self, **fields) -> str:
+        return json.dumps({'format': HISTORY_LOG_FORMAT, 'version': HISTORY_LOG_VERSION,
+                           'created': datetime.now().isoformat(), **fields}) + '\n'
+    
+    def start_log(self, filepath: str) -> bool:
+        """
+        Append every executed, undone and redone command to a JSONL log.
+        
+        Args:
+            filepath: Log file (appended to if it exists)
+        
+        Returns:
+            bool: Success status
+        """
+        self.stop_log()
+        try:
+            new_file = not os.path.exists(filepath) or os.path.getsize(filepath) == 0
+            self._log_file = open(filepath, 'a', encoding='utf-8')
+            if new_file:
+                self._log_file.write(self._log_header())
+            print(f"✓ Logging commands to {filepath}")
+            return True
+        except Exception as e:
+            print(f"✗ Failed to open command log: {e}")
+            self._log_file = None
+            return False
+    
+    def stop_log(self):
+        """Close the command log"""
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+    
+    def _log(self, record: Dict[str, Any]):
+        if self._log_file is None:
+            return
+        try:
+            self._log_file.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+            self._log_file.flush()
+        except Exception as e:
+            print(f"✗ Failed to write command log, logging stopped: {e}")
+            self.stop_log()
+    
+    def save_history(self, filepath: str, allow_partial: bool = False) -> bool:
         """
-        Save command history to file.
+        Save command history to file, as a command log.
+        
+        Replaying the log reproduces the design only from the state the
+        history started in (an empty project for a new session). Once the
+        history bounds evicted old commands, the remaining ones refer to
+        widgets the log never creates; use start_log for a complete,
+        append-only log of the session instead.
         
         Args:
             filepath: Path to save file
+            allow_partial: Save even if commands were evicted (the header
+                records how many; replaying then warns)
             
         Returns:
             bool: Success status
         """
+        if self.evicted_commands and not allow_partial:
+            print(f"✗ Cannot save history: {self.evicted_commands} oldest commands were evicted, "
+                  f"the log would not replay from an empty project")
+            return False
+        
         try:
-            history_data = {
-                'commands': self.get_history(),
-                'total_commands': len(self.command_history),
-                'saved_at': datetime.now().isoformat()
-            }
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(history_data, f, indent=2)
+            skipped = 0
+            with atomic_open(filepath, 'w', encoding='utf-8') as f:
+                f.write(self._log_header(evicted=self.evicted_commands))
+                for command in self.command_history:
+                    record = {'op': 'execute', **self.serialize_command(command)}
+                    if record['args'] is None:
+                        skipped += 1
+                    f.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
             
+            if skipped:
+                print(f"✗ {skipped} commands cannot be serialised and will not be replayed")
             print(f"✓ Command history saved to {filepath}")
             return True
             
@@ -360,22 +1512,113 @@ class CommandDispatcher:
             print(f"✗ Failed to save history: {e}")
             return False
     
-    def load_history(self, filepath: str) -> bool:
+    def read_log(self, filepath: str) -> List[Dict[str, Any]]:
+        """
+        Read log records (operations) from a command log or saved history.
+        
+        Raises:
+            ValueError: Not a command log (e.g. an old metadata-only history file)
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline() or '{}')
+            if header.get('format') != HISTORY_LOG_FORMAT:
+                raise ValueError("Not a command log")
+            if header.get('version') != HISTORY_LOG_VERSION:
+                raise ValueError(f"Unsupported command log version: {header.get('version')}")
+            if header.get('evicted'):
+                print(f"✗ Command log misses its {header['evicted']} oldest commands; "
+                      f"replaying it only works on the design they produced")
+            return [json.loads(line) for line in f if line.strip()]
+    
+    def replay(self, records: List[Dict[str, Any]], core, quiet: bool = True) -> int:
+        """
+        Execute logged operations in order, reproducing the session.
+        
+        Coalescing follows the log, not the replay timing, so the resulting
+        history is the same as in the recorded session.
+        
+        Args:
+            records: Result of read_log
+            core: AppCore the commands act on
+            quiet: Suppress console output of the commands and the core
+        
+        Returns:
+            int: Number of operations replayed successfully
+        """
+        window = self.coalesce_window
+        self.coalesce_window = float('inf')
+        replayed = 0
+        failed = 0
+        
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+            try:
+                for record in records:
+                    op = record.get('op')
+                    try:
+                        if op == 'execute':
+                            if not record.get('merge'):
+                                self.break_coalescing()
+                            ok = self.execute_command(self.build_command(record, core)).success
+                        elif op == 'undo':
+                            ok = self.undo().success
+                        elif op == 'redo':
+                            ok = self.redo().success
+                        elif op == 'begin':
+                            self.begin_transaction(record.get('name', ''), record.get('description', ''))
+                            ok = True
+                        elif op == 'commit':
+                            self.commit()
+                            ok = True
+                        elif op == 'rollback':
+                            ok = self.rollback()
+                        else:
+                            ok = False
+                    except Exception:
+                        ok = False
+                    if ok:
+                        replayed += 1
+                    else:
+                        failed += 1
+            finally:
+                self.coalesce_window = window
+                self.break_coalescing()
+        
+        if failed:
+            print(f"✗ {failed} logged operations failed to replay")
+        print(f"✓ Replayed {replayed} logged operations")
+        return replayed
+    
+    def load_history(self, filepath: str, core=None, replay: bool = False) -> bool:
         """
         Load command history from file.
         
         Args:
-            filepath: Path to load file from
+            filepath: Path to load file from (a saved history or command log)
+            core: AppCore to rebuild the commands for
+            replay: Replay the commands on core (quietly); without replay only
+                the number of commands is reported
             
         Returns:
             bool: Success status
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
+            try:
+                records = self.read_log(filepath)
+            except ValueError:
+                # Metadata-only history written by older versions
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    history_data = json.load(f)
+                print(f"✓ Loaded {history_data.get('total_commands', 0)} commands from history "
+                      f"(metadata only, cannot replay)")
+                return not replay
             
-            print(f"✓ Loaded {history_data.get('total_commands', 0)} commands from history")
-            # Note: This only loads metadata, not actual command objects
+            if replay:
+                if core is None:
+                    raise ValueError("Replaying needs a core")
+                self.replay(records, core)
+            else:
+                executed = sum(1 for record in records if record.get('op') == 'execute')
+                print(f"✓ Loaded {executed} commands from history")
             return True
             
         except Exception as e:
@@ -392,4 +1635,4 @@ if __name__ == "__main__":
     print(f"Can redo: {dispatcher.can_redo()}")
     
     # Test command registration
-    print(f"Registered commands: {list(dispatcher.registered_commands.keys())}")
\ No newline at end of file
+    print(f"Registered commands: {list(dispatcher.registered_commands.keys())}")
@@ -0,0 +1,164 @@
+"""
+File Table - compact columnar store for project analysis results.
+Keeps per-file data in typed arrays with interned directory and
+extension tables, and builds file dicts lazily on query.
+"""
+
+import os
+from array import array
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
+
+
+class FileTable:
+    """Columnar table of project files"""
+    
+    NO_LINES = -1
+    
+    def __init__(self, root: str):
+        self.root = root
+        
+        # Interned lookup tables
+        self._dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self._exts: List[str] = []
+        self._ext_ids: Dict[str, int] = {}
+        
+        # One entry per file
+        self._names: List[str] = []
+        self._dir_col = array('I')
+        self._ext_col = array('I')
+        self._size_col = array('q')
+        self._lines_col = array('l')
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def _intern_dir(self, relative_dir: str) -> int:
+        dir_id = self._dir_ids.get(relative_dir)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            self._dirs.append(relative_dir)
+            self._dir_ids[relative_dir] = dir_id
+        return dir_id
+    
+    def _intern_ext(self, extension: str) -> int:
+        ext_id = self._ext_ids.get(extension)
+        if ext_id is None:
+            ext_id = len(self._exts)
+            self._exts.append(extension)
+            self._ext_ids[extension] = ext_id
+        return ext_id
+    
+    def add_directory(self, relative_dir: str):
+        """Register a project subdirectory"""
+        self._intern_dir(relative_dir)
+    
+    def add_file(self, relative_dir: str, name: str, extension: str, size: int,
+                 lines: Optional[int] = None) -> int:
+        """
+        Append a file row.
+        
+        Returns:
+            int: Row index of the new file
+        """
+        row = len(self._names)
+        self._names.append(name)
+        self._dir_col.append(self._intern_dir(relative_dir))
+        self._ext_col.append(self._intern_ext(extension))
+        self._size_col.append(size)
+        self._lines_col.append(self.NO_LINES if lines is None else lines)
+        return row
+    
+    def set_lines(self, row: int, lines: int):
+        """Set line count for a file row"""
+        self._lines_col[row] = lines
+    
+    def get_file(self, row: int) -> Dict[str, Any]:
+        """Build file dict for a row"""
+        relative_dir = self._dirs[self._dir_col[row]]
+        name = self._names[row]
+        relative_path = os.path.join(relative_dir, name) if relative_dir else name
+        
+        file_info = {
+            'name': name,
+            'path': os.path.join(self.root, relative_path),
+            'size': self._size_col[row],
+            'extension': self._exts[self._ext_col[row]],
+            'relative_path': relative_path
+        }
+        
+        lines = self._lines_col[row]
+        if lines != self.NO_LINES:
+            file_info['lines'] = lines
+        
+        return file_info
+    
+    def iter_rows(self, ext: Union[str, Iterable[str], None] = None,
+                  min_size: Optional[int] = None) -> Iterator[int]:
+        """Iterate row indices matching the filters"""
+        ext_ids = None
+        if ext is not None:
+            exts = [ext] if isinstance(ext, str) else ext
+            ext_ids = {self._ext_ids[e.lower()] for e in exts if e.lower() in self._ext_ids}
+            if not ext_ids:
+                return
+        
+        ext_col = self._ext_col
+        size_col = self._size_col
+        
+        for row in range(len(self._names)):
+            if ext_ids is not None and ext_col[row] not in ext_ids:
+                continue
+            if min_size is not None and size_col[row] < min_size:
+                continue
+            yield row
+    
+    def iter_files(self, ext: Union[str, Iterable[str], None] = None,
+                   min_size: Optional[int] = None, offset: int = 0,
+                   limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate files as dicts.
+        
+        Args:
+            ext: Extension or extensions to include (e.g. '.py')
+            min_size: Minimum file size in bytes
+            offset: Number of matching files to skip
+            limit: Maximum number of files to yield
+        
+        Yields:
+            Dict: File info in the metadata['analysis']['files'] format
+        """
+        produced = 0
+        for index, row in enumerate(self.iter_rows(ext, min_size)):
+            if index < offset:
+                continue
+            if limit is not None and produced >= limit:
+                return
+            produced += 1
+            yield self.get_file(row)
+    
+    def page(self, page: int, page_size: int = 100, **filters) -> List[Dict[str, Any]]:
+        """Get one page (0-based) of matching files"""
+        return list(self.iter_files(offset=page * page_size, limit=page_size, **filters))
+    
+    def iter_directories(self) -> Iterator[str]:
+        """Iterate absolute paths of project subdirectories"""
+        for relative_dir in self._dirs:
+            if relative_dir:
+                yield os.path.join(self.root, relative_dir)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate statistics suitable for persisting in the project file"""
+        file_types: Dict[str, int] = {}
+        for ext_id in self._ext_col:
+            extension = self._exts[ext_id]
+            file_types[extension] = file_types.get(extension, 0) + 1
+        
+        return {
+            'file_count': len(self._names),
+            'directory_count': sum(1 for d in self._dirs if d),
+            'python_files': file_types.get('.py', 0),
+            'total_size': sum(self._size_col),
+            'total_lines': sum(n for n in self._lines_col if n != self.NO_LINES),
+            'file_types': file_types
+        }
@@ -0,0 +1,133 @@
+"""
+Filesystem Walker - parallel os.scandir based directory traversal.
+Shared by AppCore, ProjectScanner and the analysis plugin so that all
+project walks use the same skip rules and a single stat per file.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Directories never descended into while walking a project
+SKIP_DIRS = ['venv', '.venv', '.git', '__pycache__', '.idea', '.vscode']
+
+
+class FileRecord(NamedTuple):
+    """Single file found while walking a tree"""
+    name: str
+    path: str
+    relative_path: str
+    extension: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+class DirRecord(NamedTuple):
+    """Listing of one directory: kept subdirectory names and its files"""
+    path: str
+    relative_path: str
+    dirs: List[str]
+    files: List[FileRecord]
+
+
+def should_skip_dir(dir_name: str) -> bool:
+    """Check if directory should be excluded from project walks"""
+    return dir_name in SKIP_DIRS or dir_name.startswith('.')
+
+
+def _scan_dir(dir_path: str, relative_dir: str) -> Tuple[DirRecord, List[Tuple[str, str]]]:
+    """
+    List one directory with os.scandir.
+    
+    Returns:
+        Tuple: Directory record and (path, relative_path) of subdirectories to descend into
+    """
+    dirs = []
+    files = []
+    descend = []
+    
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return DirRecord(dir_path, relative_dir, dirs, files), descend
+    
+    for entry in entries:
+        relative_path = os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+        
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        
+        if is_dir:
+            if should_skip_dir(entry.name):
+                continue
+            dirs.append(entry.name)
+            # Like os.walk, list symlinked directories but do not follow them
+            if not entry.is_symlink():
+                descend.append((entry.path, relative_path))
+            continue
+        
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        
+        files.append(FileRecord(
+            name=entry.name,
+            path=entry.path,
+            relative_path=relative_path,
+            extension=os.path.splitext(entry.name)[1].lower(),
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            inode=st.st_ino
+        ))
+    
+    return DirRecord(dir_path, relative_dir, dirs, files), descend
+
+
+def walk_tree(root: str, max_workers: Optional[int] = None) -> Iterator[DirRecord]:
+    """
+    Walk directory tree top-down, yielding one record per directory.
+    
+    Subdirectories are listed ahead of time on a thread pool, but records
+    are yielded in the same pre-order as os.walk.
+    
+    Args:
+        root: Directory to walk
+        max_workers: Thread pool size (None for executor default)
+    
+    Yields:
+        DirRecord: Directory listings in walk order
+    """
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    stack = [pool.submit(_scan_dir, root, '')]
+    
+    try:
+        while stack:
+            record, descend = stack.pop().result()
+            children = [pool.submit(_scan_dir, path, rel) for path, rel in descend]
+            stack.extend(reversed(children))
+            yield record
+    finally:
+        for future in stack:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def walk_files(root: str, max_workers: Optional[int] = None) -> Iterator[FileRecord]:
+    """
+    Stream file records for every file in a tree.
+    
+    Args:
+        root: Directory to walk
+        max_workers: Thread pool size (None for executor default)
+    
+    Yields:
+        FileRecord: Files in walk order
+    """
+    for record in walk_tree(root, max_workers):
+        yield from record.files
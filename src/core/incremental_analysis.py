@@ -0,0 +1,456 @@
+"""
+Incremental Analysis - re-analyzes only the edited parts of a source buffer.
+Splits the buffer into top-level blocks (and large classes into member
+blocks), analyzes each block on its own and merges the block results.
+Unchanged blocks are served from the previous update.
+"""
+
+import re
+import bisect
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from core.code_analysis import CodeAnalysisResult, analyze_block
+
+
+# Classes with at least this many lines are split into member blocks
+CLASS_SPLIT_MIN_LINES = 40
+
+# Largest span tried when re-joining a block that was split too eagerly
+JOIN_MAX_LINES = 200
+
+# Statements starting with these continue the previous block
+_CONTINUATION_PREFIXES = ('else', 'elif', 'except', 'finally')
+
+# Statements that start a new block inside a split class body
+_MEMBER_PREFIXES = ('def ', 'async def ', 'class ', '@')
+
+# Syntax errors suggesting a block was split inside an open bracket or string
+_UNCLOSED_ERRORS = ('was never closed', 'unterminated triple-quoted')
+
+_TRIPLE_QUOTES = ('"""', "'''")
+
+# Comments, one-line strings, and lone quotes of strings still open at the search end
+_LINE_TOKEN_RE = re.compile(r'''#|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|["']''')
+_BODY_INDENT_RE = re.compile(r'^([ \t]*)[^\s#]', re.MULTILINE)
+
+# Newlines before a statement at a given indentation, compiled per indentation
+_statement_patterns: Dict[str, 're.Pattern'] = {}
+
+
+class Block(NamedTuple):
+    """Consecutive lines analyzed together"""
+    start: int          # 0-based index of the first line
+    end: int            # index after the last line
+    start_pos: int      # offset of the first character
+    end_pos: int        # offset after the last character (excluding the final newline)
+    body_indent: str    # class-body indentation ('' for top-level blocks)
+    class_header: bool  # class statement whose members follow in later blocks
+
+
+def _statement_pattern(indent: str) -> 're.Pattern':
+    pattern = _statement_patterns.get(indent)
+    if pattern is None:
+        # Anchored on the newline so the regex engine can search for it quickly
+        pattern = re.compile('\n' + re.escape(indent) + r'(?=[^\s#)\]}])')
+        _statement_patterns[indent] = pattern
+    return pattern
+
+
+def _skip_quoted(code: str, segment_start: int, opening: int) -> Optional[int]:
+    """
+    Check if a triple quote lies in a comment or a one-line string literal.
+    
+    Returns:
+        int: Offset to resume searching from, or None if the quote opens a string
+    """
+    segment = code[segment_start:opening]
+    if '#' not in segment and '"' not in segment and "'" not in segment:
+        return None  # common case: nothing but code before the quote
+    
+    enclosing = None
+    for token in _LINE_TOKEN_RE.finditer(code, segment_start, opening):
+        enclosing = token if len(token.group()) == 1 else None
+        if token.group() == '#':
+            break
+    if enclosing is None:
+        return None
+    
+    string = _LINE_TOKEN_RE.match(code, enclosing.start())
+    if enclosing.group() != '#' and len(string.group()) > 1:
+        return string.end()
+    line_end = code.find('\n', opening)
+    return line_end if line_end >= 0 else len(code)
+
+
+def _string_spans(code: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) offsets of triple-quoted strings in code[start:end]"""
+    next_found = {quote: code.find(quote, start, end) for quote in _TRIPLE_QUOTES}
+    pos = start
+    
+    while True:
+        for quote, found in next_found.items():
+            if 0 <= found < pos:
+                next_found[quote] = code.find(quote, pos, end)
+        
+        candidates = [(found, quote) for quote, found in next_found.items() if found >= 0]
+        if not candidates:
+            return
+        opening, quote = min(candidates)
+        
+        segment_start = max(code.rfind('\n', 0, opening) + 1, pos)
+        resume = _skip_quoted(code, segment_start, opening)
+        if resume is not None:
+            pos = max(resume, opening + 1)
+            continue
+        
+        closing = code.find(quote, opening + 3, end)
+        if closing < 0:
+            yield opening, end
+            return
+        pos = closing + 3
+        yield opening, pos
+
+
+def _split_starts(code: str, start: int, end: int, spans: List[Tuple[int, int]],
+                  indent: str = '', members_only: bool = False) -> List[int]:
+    """
+    Find offsets in [start, end) of lines starting a new statement at indent.
+    
+    Splitting is conservative: lines inside triple-quoted strings, after a
+    backslash continuation or after a decorator never start a block.
+    
+    Args:
+        spans: Triple-quoted string spans of the whole source
+    
+    Returns:
+        List: Offsets of block starts, beginning with start
+    """
+    starts = [start]
+    width = len(indent)
+    span_index = bisect.bisect_left(spans, (start,))
+    after_decorator = code.startswith(indent + '@', start)
+    
+    for match in _statement_pattern(indent).finditer(code, start, end):
+        pos = match.start() + 1
+        
+        # Skip lines inside triple-quoted strings
+        while span_index < len(spans) and spans[span_index][1] <= pos:
+            span_index += 1
+        if span_index < len(spans) and spans[span_index][0] < pos:
+            continue
+        if code.endswith('\\\n', 0, pos):
+            continue
+        
+        statement = pos + width
+        if code.startswith(_CONTINUATION_PREFIXES, statement):
+            continue
+        if members_only and not code.startswith(_MEMBER_PREFIXES, statement):
+            after_decorator = False
+            continue
+        
+        if not after_decorator:
+            starts.append(pos)
+        after_decorator = code.startswith('@', statement)
+    
+    return starts
+
+
+def _split_class(code: str, start: int, end: int,
+                 spans: List[Tuple[int, int]]) -> Optional[Tuple[str, List[int]]]:
+    """
+    Split a top-level class block into header and member blocks.
+    
+    Returns:
+        Tuple: (body indentation, member block offsets), or None if the block
+        is not a class that can be split
+    """
+    # Skip decorators to the class statement
+    pos = start
+    while code.startswith('@', pos):
+        pos = code.find('\n', pos, end) + 1
+        if pos == 0:
+            return None
+    if not code.startswith('class ', pos):
+        return None
+    
+    line_end = code.find('\n', pos, end)
+    if line_end < 0 or not code[pos:line_end].rstrip().endswith(':'):
+        return None  # multi-line or single-line class statement
+    
+    # Body indentation from the first statement of the body
+    match = _BODY_INDENT_RE.search(code, line_end + 1, end)
+    if match is None or not match.group(1):
+        return None
+    body_indent = match.group(1)
+    
+    starts = _split_starts(code, start, end, spans, body_indent, members_only=True)
+    if len(starts) < 2:
+        return None
+    return body_indent, starts
+
+
+def split_blocks(code: str) -> List[Block]:
+    """
+    Split source into independently analyzable blocks.
+    
+    Args:
+        code: Python source code
+    
+    Returns:
+        List: Blocks covering all lines in order
+    """
+    # (offset, body indentation, class header) for every block
+    entries = []
+    spans = list(_string_spans(code, 0, len(code)))
+    top_level = _split_starts(code, 0, len(code), spans)
+    bounds = zip(top_level, top_level[1:] + [len(code)])
+    
+    for start, end in bounds:
+        split = None
+        if code.count('\n', start, end) >= CLASS_SPLIT_MIN_LINES:
+            split = _split_class(code, start, end, spans)
+        
+        if split:
+            body_indent, starts = split
+            entries.append((starts[0], body_indent, True))
+            entries.extend((pos, body_indent, False) for pos in starts[1:])
+        else:
+            entries.append((start, '', False))
+    
+    blocks = []
+    line = 0
+    for i, (pos, body_indent, class_header) in enumerate(entries):
+        if i + 1 < len(entries):
+            next_pos = entries[i + 1][0]
+            end_pos = next_pos - 1
+            next_line = line + code.count('\n', pos, next_pos)
+        else:
+            end_pos = len(code)
+            next_line = line + code.count('\n', pos) + 1
+        blocks.append(Block(line, next_line, pos, end_pos, body_indent, class_header))
+        line = next_line
+    
+    return blocks
+
+
+def _is_unclosed(message: str) -> bool:
+    return any(text in message for text in _UNCLOSED_ERRORS)
+
+
+def merge_results(parts: List[Tuple[int, CodeAnalysisResult]]) -> CodeAnalysisResult:
+    """
+    Merge block results into a result for the whole source.
+    
+    Args:
+        parts: (line offset, block result) pairs in source order
+    
+    Returns:
+        CodeAnalysisResult: Combined result (without tree)
+    """
+    merged = CodeAnalysisResult()
+    
+    for offset, part in parts:
+        merged.total_lines += part.total_lines
+        merged.code_lines += part.code_lines
+        merged.comment_lines += part.comment_lines
+        merged.blank_lines += part.blank_lines
+        merged.total_line_length += part.total_line_length
+        merged.line_imports += part.line_imports
+        merged.line_functions += part.line_functions
+        merged.line_classes += part.line_classes
+        merged.keyword_points += part.keyword_points
+        
+        merged.functions += part.functions
+        merged.classes += part.classes
+        merged.imports += part.imports
+        merged.if_statements += part.if_statements
+        merged.loops += part.loops
+        merged.try_blocks += part.try_blocks
+        
+        # Most blocks have no findings
+        if part.long_lines:
+            merged.long_lines.extend((line + offset, length) for line, length in part.long_lines)
+        if part.print_calls:
+            merged.print_calls.extend(line + offset for line in part.print_calls)
+            merged.print_statements.extend(line + offset for line in part.print_statements)
+        if part.bare_excepts:
+            merged.bare_excepts.extend(line + offset for line in part.bare_excepts)
+        if part.deep_ifs:
+            merged.deep_ifs.extend((line + offset, level) for line, level in part.deep_ifs)
+        
+        if part.syntax_error and merged.syntax_error is None:
+            message, line = part.syntax_error
+            merged.syntax_error = (message, line + offset if line is not None else None)
+    
+    # Like a failed full parse, a syntax error leaves no AST metrics
+    if merged.syntax_error:
+        merged.functions = merged.classes = merged.imports = 0
+        merged.if_statements = merged.loops = merged.try_blocks = 0
+        merged.bare_excepts = []
+        merged.deep_ifs = []
+    
+    return merged
+
+
+class IncrementalAnalyzer:
+    """
+    Analyzes successive versions of one buffer, reusing results of unchanged blocks.
+    
+    For valid code the merged result equals analyze_source() (except tree).
+    A syntax error is reported from the first block that fails to parse, so its
+    line can differ from a full parse; a block split inside a bracket that stays
+    open for more than JOIN_MAX_LINES lines is reported as a syntax error.
+    """
+    
+    def __init__(self):
+        self._blocks: Dict[Tuple[str, str, bool], CodeAnalysisResult] = {}
+        self.result: Optional[CodeAnalysisResult] = None
+        self.stats = {'updates': 0, 'blocks': 0, 'reanalyzed': 0}
+    
+    def update(self, code: str) -> CodeAnalysisResult:
+        """
+        Analyze the current buffer text.
+        
+        Args:
+            code: Full buffer text
+        
+        Returns:
+            CodeAnalysisResult: Merged result for the buffer (without tree)
+        """
+        blocks = split_blocks(code)
+        current = {}
+        parts = []
+        self.stats['reanalyzed'] = 0
+        
+        i = 0
+        while i < len(blocks):
+            result = self._analyze(code, blocks[i], current)
+            next_index = i + 1
+            
+            if result.syntax_error and _is_unclosed(result.syntax_error[0]):
+                joined = self._join(code, blocks, i, current)
+                if joined:
+                    result, next_index = joined
+            
+            parts.append((blocks[i].start, result))
+            i = next_index
+        
+        # Keep only blocks of the current version
+        self._blocks = current
+        self.result = merge_results(parts)
+        
+        self.stats['updates'] += 1
+        self.stats['blocks'] = len(parts)
+        return self.result
+    
+    def _analyze(self, code: str, block: Block,
+                 current: Dict[Tuple[str, str, bool], CodeAnalysisResult]) -> CodeAnalysisResult:
+        """Get block result from this or the previous update, or analyze it"""
+        text = code[block.start_pos:block.end_pos]
+        key = (text, block.body_indent, block.class_header)
+        
+        result = current.get(key) or self._blocks.get(key)
+        if result is None:
+            result = analyze_block(text, block.body_indent, block.class_header)
+            self.stats['reanalyzed'] += 1
+        current[key] = result
+        return result
+    
+    def _join(self, code: str, blocks: List[Block], index: int,
+              current: Dict[Tuple[str, str, bool], CodeAnalysisResult]) -> Optional[Tuple[CodeAnalysisResult, int]]:
+        """
+        Re-analyze a block together with the blocks after it.
+        
+        Used when a block fails with an unclosed bracket or string, which
+        usually means it was split in the middle of a statement. The span
+        doubles until the joined block parses or JOIN_MAX_LINES is reached.
+        
+        Returns:
+            Tuple: (result, index of the next block), or None if no span parses
+        """
+        first = blocks[index]
+        if first.body_indent and not first.class_header:
+            kind = {}  # class members stay wrapped
+        else:
+            kind = {'body_indent': '', 'class_header': False}  # starts at column 0
+        
+        limit = index + 1
+        while limit < len(blocks) and blocks[limit].end - first.start <= JOIN_MAX_LINES:
+            limit += 1
+        
+        span = 1
+        while index + span < limit:
+            span = min(span * 2, limit - index)
+            # Never end a span on a class statement without its members
+            while index + span < limit and blocks[index + span - 1].class_header:
+                span += 1
+            
+            last = blocks[index + span - 1]
+            joined = first._replace(end=last.end, end_pos=last.end_pos, **kind)
+            result = self._analyze(code, joined, current)
+            if not result.syntax_error or not _is_unclosed(result.syntax_error[0]):
+                return result, index + span
+        
+        return None
+    
+    def reset(self):
+        """Forget cached blocks"""
+        self._blocks = {}
+        self.result = None
+
+
+def _generate_module(classes: int, methods: int) -> str:
+    """Generate a module of classes with small methods"""
+    lines = ['import os', 'import sys', '']
+    for c in range(classes):
+        lines.append(f"class Generated{c}:")
+        lines.append(f'    """Generated class {c}"""')
+        lines.append('')
+        for m in range(methods):
+            lines.append(f"    def method_{m}(self, value):")
+            lines.append(f"        if value > {m}:")
+            lines.append(f"            print(value)")
+            lines.append(f"        for item in range(value):")
+            lines.append(f"            value += item")
+            lines.append(f"        return value")
+            lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+# Benchmark keystroke updates against full re-analysis
+# (from the repository root: PYTHONPATH=src python -m core.incremental_analysis)
+if __name__ == "__main__":
+    import random
+    import time
+    from core.code_analysis import analyze_source
+    
+    code = _generate_module(classes=25, methods=28)
+    lines = code.split('\n')
+    print(f"Benchmark: {len(lines)} lines")
+    
+    start = time.perf_counter()
+    full = analyze_source(code)
+    print(f"  full analysis:       {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    analyzer = IncrementalAnalyzer()
+    start = time.perf_counter()
+    assert analyzer.update(code) == full
+    print(f"  first update:        {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    # Type into random method bodies
+    rng = random.Random(0)
+    editable = [row for row, line in enumerate(lines) if line.endswith('+= item')]
+    timings = []
+    for keystroke in range(500):
+        row = rng.choice(editable)
+        lines[row] += 'x'
+        code = '\n'.join(lines)
+        
+        start = time.perf_counter()
+        result = analyzer.update(code)
+        timings.append(time.perf_counter() - start)
+    
+    assert result == analyze_source(code)
+    timings.sort()
+    print(f"  keystroke update:    median {timings[len(timings) // 2] * 1000:.2f} ms, "
+          f"p95 {timings[len(timings) * 95 // 100] * 1000:.2f} ms ({analyzer.stats['blocks']} blocks)")
@@ -0,0 +1,228 @@
+"""
+Project File - compact sqlite project format next to gui_constructor_project.json.
+Widgets are stored one compact JSON row each and metadata one row per key,
+so widgets can be loaded without the (large) project analysis. Files are
+written to a temp file and atomically moved into place.
+"""
+
+import os
+import json
+import sqlite3
+from typing import Dict, Any, List, Optional
+
+from core.atomic_io import atomic_open, atomic_path
+
+
+PROJECT_JSON_NAME = 'gui_constructor_project.json'
+PROJECT_DB_NAME = 'gui_constructor_project.guiproj'
+PROJECT_DB_EXT = '.guiproj'
+
+# Bump when the table layout changes
+PROJECT_DB_VERSION = 1
+
+# Project fields stored in the info table
+_INFO_FIELDS = ('name', 'path', 'created', 'last_modified', 'journal_seq')
+
+# Metadata keys skipped by partial loads
+ANALYSIS_KEYS = ('analysis',)
+
+_SCHEMA = '''
+CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE widgets (seq INTEGER PRIMARY KEY, data TEXT NOT NULL);
+'''
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def is_project_db(path: str) -> bool:
+    """Check if a path names a sqlite project file"""
+    return path.endswith(PROJECT_DB_EXT)
+
+
+def write_project_db(path: str, data: Dict[str, Any]):
+    """
+    Atomically write project data (the JSON project layout) to a sqlite file.
+    
+    Args:
+        path: Target .guiproj file
+        data: Dict with name, path, created, last_modified, metadata and widgets
+    """
+    with atomic_path(path, fsync=True) as tmp_path:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            # The temp file is replaced as a whole, no journal needed
+            conn.execute('PRAGMA journal_mode=OFF')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.executescript(_SCHEMA)
+            conn.execute('PRAGMA user_version=%d' % PROJECT_DB_VERSION)
+            
+            conn.executemany('INSERT INTO info VALUES (?, ?)',
+                             [(key, _dumps(data.get(key))) for key in _INFO_FIELDS])
+            conn.executemany('INSERT INTO metadata VALUES (?, ?)',
+                             [(key, _dumps(value)) for key, value in (data.get('metadata') or {}).items()])
+            conn.executemany('INSERT INTO widgets (data) VALUES (?)',
+                             [(_dumps(widget),) for widget in data.get('widgets') or []])
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def _connect_readonly(path: str) -> sqlite3.Connection:
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version != PROJECT_DB_VERSION:
+        conn.close()
+        raise ValueError(f"Unsupported project file version: {version}")
+    return conn
+
+
+def _read_widgets(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    # One parse of all rows is much faster than json.loads per widget
+    rows = conn.execute('SELECT data FROM widgets ORDER BY seq')
+    return json.loads('[' + ','.join(row[0] for row in rows) + ']')
+
+
+def read_project_widgets(path: str) -> List[Dict[str, Any]]:
+    """Read only the widgets of a sqlite project file, in design order"""
+    conn = _connect_readonly(path)
+    try:
+        return _read_widgets(conn)
+    finally:
+        conn.close()
+
+
+def read_project_db(path: str, include_analysis: bool = True) -> Dict[str, Any]:
+    """
+    Read a sqlite project file into the JSON project layout.
+    
+    Args:
+        path: .guiproj file
+        include_analysis: Also load analysis metadata (skipped for a fast partial load)
+    
+    Returns:
+        Dict: Project data as written by write_project_db
+    """
+    conn = _connect_readonly(path)
+    try:
+        data = {key: json.loads(value) for key, value in conn.execute('SELECT key, value FROM info')}
+        
+        if include_analysis:
+            rows = conn.execute('SELECT key, value FROM metadata')
+        else:
+            placeholders = ','.join('?' * len(ANALYSIS_KEYS))
+            rows = conn.execute(f'SELECT key, value FROM metadata WHERE key NOT IN ({placeholders})',
+                                ANALYSIS_KEYS)
+        data['metadata'] = {key: json.loads(value) for key, value in rows}
+        
+        data['widgets'] = _read_widgets(conn)
+        return data
+    finally:
+        conn.close()
+
+
+def read_project_file(path: str, include_analysis: bool = True) -> Dict[str, Any]:
+    """Read a project file in either format (by extension)"""
+    if is_project_db(path):
+        return read_project_db(path, include_analysis)
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not include_analysis:
+        metadata = data.get('metadata') or {}
+        data['metadata'] = {key: value for key, value in metadata.items() if key not in ANALYSIS_KEYS}
+    return data
+
+
+def write_project_json(path: str, data: Dict[str, Any]):
+    """Atomically write project data in the JSON format (fsynced, journal segments are dropped after it)"""
+    with atomic_open(path, 'w', encoding='utf-8', fsync=True) as f:
+        json.dump(data, f, indent=2)
+
+
+def convert_project_file(source: str, target: str) -> bool:
+    """
+    Convert a project file between JSON and sqlite formats (by extension).
+    
+    Args:
+        source: Existing project file
+        target: File to write
+    
+    Returns:
+        bool: Success status
+    """
+    try:
+        data = read_project_file(source)
+        if is_project_db(target):
+            write_project_db(target, data)
+        else:
+            write_project_json(target, data)
+        print(f"✓ Converted project file: {source} -> {target}")
+        return True
+    except Exception as e:
+        print(f"✗ Error converting project file: {e}")
+        return False
+
+
+def _sample_project(widget_count: int, file_count: int) -> Dict[str, Any]:
+    """Build project data with widgets and a large analysis"""
+    widgets = [{
+        'id': f'widget_{i + 1}', 'type': 'QPushButton', 'name': f'button_{i}', 'text': f'Button {i}',
+        'properties': {'color': 'red'}, 'position': [10 + i % 500, 10 + i // 500], 'size': [100, 30],
+        'created': '2024-01-01T00:00:00'
+    } for i in range(widget_count)]
+    files = [{'path': f'src/module_{i}.py', 'size': 1000 + i, 'lines': 40 + i % 300}
+             for i in range(file_count)]
+    return {
+        'name': 'Bench Project', 'path': '/tmp/bench', 'created': '2024-01-01T00:00:00',
+        'last_modified': '2024-01-01T00:00:00', 'widgets': widgets,
+        'metadata': {'analysis': {'total_files': file_count, 'files': files}, 'author': 'bench'}
+    }
+
+
+# Convert a project file: python project_file.py SOURCE TARGET
+# Without arguments: benchmark JSON against sqlite saves and loads
+if __name__ == "__main__":
+    import sys
+    import shutil
+    import tempfile
+    import time
+    
+    if len(sys.argv) == 3:
+        sys.exit(0 if convert_project_file(sys.argv[1], sys.argv[2]) else 1)
+    
+    data = _sample_project(100000, 50000)
+    bench_dir = tempfile.mkdtemp(prefix='project_file_bench_')
+    json_path = os.path.join(bench_dir, PROJECT_JSON_NAME)
+    db_path = os.path.join(bench_dir, PROJECT_DB_NAME)
+    try:
+        start = time.perf_counter()
+        with open(json_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        json_save = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        write_project_db(db_path, data)
+        db_save = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        read_project_file(json_path, include_analysis=False)
+        json_load = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        partial = read_project_db(db_path, include_analysis=False)
+        db_partial = time.perf_counter() - start
+        
+        assert read_project_db(db_path) == data
+        assert partial['widgets'] == data['widgets'] and 'analysis' not in partial['metadata']
+        
+        print(f"100000 widgets + 50000 analyzed files:")
+        print(f"  save: json {json_save * 1000:7.1f} ms ({os.path.getsize(json_path) / 2**20:5.1f} MiB), "
+              f"sqlite {db_save * 1000:7.1f} ms ({os.path.getsize(db_path) / 2**20:5.1f} MiB)")
+        print(f"  widgets-only load: json {json_load * 1000:7.1f} ms, sqlite {db_partial * 1000:7.1f} ms")
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
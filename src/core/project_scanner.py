@@ -0,0 +1,168 @@
+"""
+Project Scanner - incremental, cached analysis of project directories.
+Keeps a persistent scan index next to gui_constructor_project.json so that
+repeated loads only re-read files whose stat signature has changed.
+"""
+
+import os
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from core.atomic_io import safe_write_file
+from core.file_table import FileTable
+from core.fs_walker import FileRecord, walk_tree
+from core.line_counter import count_lines_many
+
+
+SCAN_INDEX_FILE = 'gui_constructor_scan_index.json'
+SCAN_INDEX_VERSION = 2
+
+# Files processed between progress reports
+PROGRESS_INTERVAL = 250
+
+# progress_callback(stage, done, total, partial); total is 0 while unknown
+ProgressCallback = Callable[[str, int, int, Dict[str, Any]], None]
+
+
+class ScanCancelled(Exception):
+    """Raised when a scan is cancelled through is_cancelled"""
+    pass
+
+
+class ProjectScanner:
+    """Scans a project tree, reusing cached results for unchanged files"""
+    
+    def __init__(self, project_path: str, processes: Optional[int] = None):
+        self.project_path = project_path
+        self.processes = processes
+        self.index_path = os.path.join(project_path, SCAN_INDEX_FILE)
+        self.index: Dict[str, List] = {}
+        self.stats = {'files': 0, 'reused': 0, 'read': 0}
+        self._dirty = False
+    
+    def load_index(self) -> Dict[str, List]:
+        """Load scan index from disk, discarding it if unreadable or outdated"""
+        self.index = {}
+        
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == SCAN_INDEX_VERSION:
+                    self.index = data.get('files', {})
+            except Exception as e:
+                print(f"✗ Error loading scan index: {e}")
+        
+        return self.index
+    
+    def save_index(self) -> bool:
+        """Atomically write scan index next to the project file"""
+        data = {'version': SCAN_INDEX_VERSION, 'files': self.index}
+        
+        if not safe_write_file(self.index_path, json.dumps(data, separators=(',', ':')), backup=False):
+            return False
+        self._dirty = False
+        return True
+    
+    def scan(self, progress_callback: Optional[ProgressCallback] = None,
+             is_cancelled: Optional[Callable[[], bool]] = None) -> FileTable:
+        """
+        Scan project directory.
+        
+        Args:
+            progress_callback: Called periodically with stage, progress and partial totals
+            is_cancelled: Polled between directories and batches; scan stops when it returns True
+        
+        Returns:
+            FileTable: Columnar table of project files
+        
+        Raises:
+            ScanCancelled: If is_cancelled returned True
+        """
+        path = self.project_path
+        self.load_index()
+        self.stats = {'files': 0, 'reused': 0, 'read': 0}
+        
+        table = FileTable(path)
+        seen = set()
+        pending = []
+        partial = {'file_count': 0, 'python_files': 0, 'total_size': 0}
+        next_report = PROGRESS_INTERVAL
+        
+        for dir_record in walk_tree(path):
+            if is_cancelled and is_cancelled():
+                raise ScanCancelled(path)
+            
+            for dir_name in dir_record.dirs:
+                table.add_directory(os.path.join(dir_record.relative_path, dir_name)
+                                    if dir_record.relative_path else dir_name)
+            
+            for record in dir_record.files:
+                if record.relative_path == SCAN_INDEX_FILE:
+                    continue
+                
+                lines = None
+                if record.extension == '.py':
+                    lines = self._cached_line_count(record)
+                
+                row = table.add_file(dir_record.relative_path, record.name,
+                                     record.extension, record.size, lines)
+                seen.add(record.relative_path)
+                self.stats['files'] += 1
+                
+                partial['file_count'] += 1
+                partial['total_size'] += record.size
+                if record.extension == '.py':
+                    partial['python_files'] += 1
+                    if lines is None:
+                        pending.append((record, row))
+            
+            if progress_callback and self.stats['files'] >= next_report:
+                progress_callback('scan', self.stats['files'], 0, dict(partial))
+                next_report = self.stats['files'] + PROGRESS_INTERVAL
+        
+        if progress_callback:
+            progress_callback('scan', self.stats['files'], self.stats['files'], dict(partial))
+        
+        # Count lines only for new or changed Python files
+        batch_size = max(PROGRESS_INTERVAL, len(pending) // 20)
+        for start in range(0, len(pending), batch_size):
+            if is_cancelled and is_cancelled():
+                raise ScanCancelled(path)
+            
+            batch = pending[start:start + batch_size]
+            counts = count_lines_many([record.path for record, _ in batch], self.processes)
+            for (record, row), lines in zip(batch, counts):
+                table.set_lines(row, lines)
+                self.index[record.relative_path] = self._signature(record) + [lines]
+            self.stats['read'] += len(batch)
+            self._dirty = True
+            
+            if progress_callback:
+                progress_callback('lines', start + len(batch), len(pending), dict(partial))
+        
+        # Forget files that no longer exist
+        for relative_path in list(self.index):
+            if relative_path not in seen:
+                del self.index[relative_path]
+                self._dirty = True
+        
+        if self._dirty:
+            self.save_index()
+        
+        return table
+    
+    def _cached_line_count(self, record: FileRecord) -> Optional[int]:
+        """Return cached line count if the file is unchanged since last scan"""
+        entry = self.index.get(record.relative_path)
+        
+        if entry and entry[:3] == self._signature(record):
+            self.stats['reused'] += 1
+            return entry[3]
+        
+        return None
+    
+    @staticmethod
+    def _signature(record: FileRecord) -> List[int]:
+        """Stat signature used to detect changed files"""
+        return [record.mtime_ns, record.size, record.inode]
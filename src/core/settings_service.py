@@ -0,0 +1,250 @@
+"""
+Settings Service - single source of truth for application settings.
+Settings are read once at startup; changes are coalesced by a debounce
+timer and written atomically from a background thread, so UI actions
+never wait on disk and bursts of changes cost one write.
+"""
+
+import os
+import atexit
+import copy
+import json
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.atomic_io import atomic_open
+
+
+SETTINGS_FILE_NAME = 'gui_constructor_settings.json'
+
+# Per-user settings location (settings used to live in the working directory)
+SETTINGS_DIR = os.path.join(os.path.expanduser('~'), '.gui_constructor')
+
+# Seconds without changes before pending settings are written
+SETTINGS_SAVE_DELAY = 1.0
+
+RECENT_PROJECTS_LIMIT = 10
+
+DEFAULT_SETTINGS = {
+    "theme": "light",
+    "autosave": True,
+    "autosave_interval": 300,  # 5 minutes
+    "ai_enabled": False,
+    "code_style": "pep8",
+    "recent_projects": [],
+    "window_width": 1400,
+    "window_height": 800,
+    "plugins_enabled": True,
+    "project_format": "json",  # or "sqlite" (.guiproj)
+    "grid_size": 10,
+    "snap_to_grid": False
+}
+
+
+# Services whose pending changes are written at exit (closed or collected ones drop out)
+_open_services: 'weakref.WeakSet[SettingsService]' = weakref.WeakSet()
+
+
+def _flush_open_services():
+    for service in list(_open_services):
+        service.flush()
+
+
+atexit.register(_flush_open_services)
+
+
+class SettingsService:
+    """
+    Thread-safe settings dict with debounced, atomic persistence.
+    
+    Supports the dict access AppCore used before (get, [], in); assignments
+    schedule a save. Values returned by get() must not be modified in
+    place, set them again instead. Pending changes are flushed at exit
+    unless the service was closed (or is no longer referenced).
+    """
+    
+    def __init__(self, path: Optional[str] = None, defaults: Optional[Dict[str, Any]] = None,
+                 save_delay: float = SETTINGS_SAVE_DELAY):
+        self.path = path or os.path.join(SETTINGS_DIR, SETTINGS_FILE_NAME)
+        self.save_delay = save_delay
+        
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._last_change = 0.0
+        self._values = copy.deepcopy(DEFAULT_SETTINGS if defaults is None else defaults)
+        self._load()
+        
+        # The debounce timer thread does not outlive the interpreter
+        _open_services.add(self)
+    
+    def _load(self):
+        """Merge saved settings into the defaults (once, at startup)"""
+        path = self.path
+        if not os.path.exists(path) and os.path.exists(SETTINGS_FILE_NAME):
+            # Settings written by older versions to the working directory
+            path = SETTINGS_FILE_NAME
+        if not os.path.exists(path):
+            return
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._values.update(json.load(f))
+            print(f"✓ Settings loaded from {path}")
+            if path != self.path:
+                self._dirty = True
+                self.schedule_save()
+        except Exception as e:
+            print(f"✗ Error loading settings: {e}")
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._values.get(key, default)
+    
+    def set(self, key: str, value: Any):
+        """Change a setting and schedule a save (no-op if unchanged)"""
+        with self._lock:
+            if key in self._values and self._values[key] == value:
+                return
+            self._values[key] = value
+            self._dirty = True
+        self.schedule_save()
+    
+    def update(self, values: Dict[str, Any]):
+        """Change several settings with one scheduled save"""
+        with self._lock:
+            self._values.update(values)
+            self._dirty = True
+        self.schedule_save()
+    
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            return self._values[key]
+    
+    def __setitem__(self, key: str, value: Any):
+        self.set(key, value)
+    
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._values
+    
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._values))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a copy of all settings"""
+        with self._lock:
+            return copy.deepcopy(self._values)
+    
+    def add_recent_project(self, project_path: str):
+        """Move a project to the top of the recent projects list"""
+        with self._lock:
+            recent = [path for path in self._values.get('recent_projects', []) if path != project_path]
+            recent.insert(0, project_path)
+            self.set('recent_projects', recent[:RECENT_PROJECTS_LIMIT])
+    
+    def recent_projects(self) -> List[str]:
+        """Get recent projects, most recent first"""
+        return list(self.get('recent_projects', []))
+    
+    def clear_recent_projects(self):
+        """Empty the recent projects list"""
+        self.set('recent_projects', [])
+    
+    def schedule_save(self):
+        """Write pending changes once no change happened for save_delay seconds"""
+        with self._lock:
+            self._last_change = time.monotonic()
+            # One timer per burst; it re-arms itself while changes keep coming
+            if self._timer is None:
+                self._start_timer(self.save_delay)
+    
+    def _start_timer(self, delay: float):
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _on_timer(self):
+        with self._lock:
+            remaining = self._last_change + self.save_delay - time.monotonic()
+            if remaining > 0:
+                self._start_timer(remaining)
+                return
+            self._timer = None
+        self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Write pending changes now.
+        
+        Returns:
+            bool: Success status (True if nothing was pending)
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return True
+                data = json.dumps(self._values, indent=2)
+                self._dirty = False
+            
+            try:
+                with atomic_open(self.path, 'w', encoding='utf-8', fsync=True) as f:
+                    f.write(data)
+                print(f"✓ Settings saved to {self.path}")
+                return True
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True
+                print(f"✗ Error saving settings: {e}")
+                return False
+
+
+    def close(self) -> bool:
+        """
+        Write pending changes and stop flushing this service at exit.
+        
+        Returns:
+            bool: Success status of the final write
+        """
+        _open_services.discard(self)
+        return self.flush()
+
+
+# Benchmark: 1000 settings changes written synchronously vs coalesced
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+    
+    bench_dir = tempfile.mkdtemp(prefix='settings_bench_')
+    try:
+        changes = 1000
+        sync_path = os.path.join(bench_dir, 'sync.json')
+        values = copy.deepcopy(DEFAULT_SETTINGS)
+        
+        start = time.perf_counter()
+        for i in range(changes):
+            values['recent_projects'] = [f'/projects/p{i - j}' for j in range(10)]
+            with atomic_open(sync_path, 'w', fsync=True) as f:
+                json.dump(values, f, indent=2)
+        sync_time = time.perf_counter() - start
+        
+        service = SettingsService(os.path.join(bench_dir, 'service.json'), save_delay=0.05)
+        start = time.perf_counter()
+        for i in range(changes):
+            service.add_recent_project(f'/projects/p{i}')
+        caller_time = time.perf_counter() - start
+        time.sleep(0.2)
+        
+        with open(service.path) as f:
+            assert json.load(f)['recent_projects'] == values['recent_projects']
+        print(f"{changes} recent project updates: synchronous writes {sync_time * 1000:.1f} ms, "
+              f"debounced {caller_time * 1000:.1f} ms on the caller + 1 background write")
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
@@ -0,0 +1,164 @@
+"""
+Spatial Index - uniform grid over widget rectangles on the design canvas.
+Point queries (hit-testing) and rectangle queries (rubber-band selection,
+snapping neighbours) only visit the grid cells they cover, so they stay
+fast with thousands of widgets.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Grid cell edge in canvas pixels; a typical widget covers 1-4 cells
+DEFAULT_CELL_SIZE = 128
+
+# Rectangle as (x, y, width, height)
+Rect = Tuple[float, float, float, float]
+
+
+class SpatialGrid:
+    """
+    Uniform grid index of rectangles keyed by id.
+    
+    Each rectangle is registered in every cell it overlaps. Rectangles cover
+    [x, x + width) x [y, y + height); negative sizes are treated as zero.
+    Ids also carry a stacking order (later inserts are on top) used to
+    return hit-test results topmost first.
+    """
+    
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set[str]] = {}
+        self._rects: Dict[str, Rect] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+    
+    def _cell_span(self, x: float, y: float, width: float, height: float):
+        cell_size = self.cell_size
+        return (int(x // cell_size), int((x + max(width, 0)) // cell_size),
+                int(y // cell_size), int((y + max(height, 0)) // cell_size))
+    
+    def insert(self, item_id: str, rect: Rect):
+        """Add a rectangle, or move it if the id is already indexed (keeps its order)"""
+        if item_id in self._rects:
+            self._unlink(item_id)
+        else:
+            self._order[item_id] = self._next_order
+            self._next_order += 1
+        
+        self._rects[item_id] = rect
+        cells = self._cells
+        x0, x1, y0, y1 = self._cell_span(*rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = {item_id}
+                else:
+                    cell.add(item_id)
+    
+    def _unlink(self, item_id: str):
+        cells = self._cells
+        x0, x1, y0, y1 = self._cell_span(*self._rects[item_id])
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells[(cx, cy)]
+                cell.discard(item_id)
+                if not cell:
+                    del cells[(cx, cy)]
+    
+    def remove(self, item_id: str) -> bool:
+        """Remove a rectangle; returns False if the id was not indexed"""
+        if item_id not in self._rects:
+            return False
+        self._unlink(item_id)
+        del self._rects[item_id]
+        del self._order[item_id]
+        return True
+    
+    def set_order(self, item_ids: Iterable[str]):
+        """Restack indexed ids bottom to top (e.g. after restoring removed widgets)"""
+        for order, item_id in enumerate(item_ids):
+            if item_id in self._order:
+                self._order[item_id] = order
+        self._next_order = max(self._order.values(), default=-1) + 1
+    
+    def clear(self):
+        """Remove all rectangles"""
+        self._cells.clear()
+        self._rects.clear()
+        self._order.clear()
+        self._next_order = 0
+    
+    def get_rect(self, item_id: str) -> Optional[Rect]:
+        """Get indexed rectangle (None if not indexed)"""
+        return self._rects.get(item_id)
+    
+    def query_point(self, x: float, y: float) -> List[str]:
+        """
+        Find rectangles containing a point.
+        
+        Returns:
+            List: Ids, topmost first
+        """
+        cell = self._cells.get((int(x // self.cell_size), int(y // self.cell_size)))
+        if not cell:
+            return []
+        
+        rects = self._rects
+        hits = []
+        for item_id in cell:
+            rx, ry, width, height = rects[item_id]
+            if rx <= x < rx + width and ry <= y < ry + height:
+                hits.append(item_id)
+        hits.sort(key=self._order.__getitem__, reverse=True)
+        return hits
+    
+    def query_rect(self, x: float, y: float, width: float, height: float,
+                   contained: bool = False) -> List[str]:
+        """
+        Find rectangles overlapping (or fully inside) a query rectangle.
+        
+        Args:
+            x, y, width, height: Query rectangle
+            contained: Only return rectangles lying completely inside the query
+        
+        Returns:
+            List: Ids, bottom to top
+        """
+        x0, x1, y0, y1 = self._cell_span(x, y, width, height)
+        cells = self._cells
+        
+        candidates: Set[str] = set()
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+            # Query covers more cells than are occupied
+            for (cx, cy), cell in cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    candidates.update(cell)
+        else:
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cell = cells.get((cx, cy))
+                    if cell:
+                        candidates.update(cell)
+        
+        rects = self._rects
+        right = x + max(width, 0)
+        bottom = y + max(height, 0)
+        found = []
+        for item_id in candidates:
+            rx, ry, rw, rh = rects[item_id]
+            rw = max(rw, 0)
+            rh = max(rh, 0)
+            if contained:
+                if x <= rx and rx + rw <= right and y <= ry and ry + rh <= bottom:
+                    found.append(item_id)
+            elif rx < right and x < rx + rw and ry < bottom and y < ry + rh:
+                found.append(item_id)
+        found.sort(key=self._order.__getitem__)
+        return found
+    
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._rects
+    
+    def __len__(self) -> int:
+        return len(self._rects)
@@ -0,0 +1,455 @@
+"""
+Widget Store - id-indexed container for the widgets of a project.
+Gives O(1) lookup, update and removal by id while keeping design order,
+and serialises to the list-of-dicts format used in project files.
+Widgets are kept as compact WidgetRecord objects.
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from core.spatial_index import Rect, SpatialGrid
+
+
+WIDGET_ID_PREFIX = 'widget_'
+
+# Properties that duplicate a record field are stored once (bit set = same value)
+_SHARED_PROPERTIES = ('name', 'text', 'position', 'size')
+
+# Geometry is packed as four 32-bit fields (x, y, width, height) in one int
+_COORD_BITS = 32
+_COORD_OFFSET = 1 << (_COORD_BITS - 1)
+_COORD_MASK = (1 << _COORD_BITS) - 1
+
+DEFAULT_POSITION = (10, 10)
+DEFAULT_SIZE = (100, 30)
+
+
+def _pack_geometry(position, size):
+    """Pack position and size into one int, or keep them as given if they do not fit"""
+    try:
+        x, y = position
+        width, height = size
+        coords = (x, y, width, height)
+        if all(type(c) is int and -_COORD_OFFSET <= c < _COORD_OFFSET for c in coords):
+            packed = 0
+            for c in coords:
+                packed = (packed << _COORD_BITS) | (c + _COORD_OFFSET)
+            return packed
+    except (TypeError, ValueError):
+        pass
+    return (position, size)
+
+
+def _timestamp_to_float(value):
+    """Convert an ISO timestamp to seconds; unparseable values are kept as-is"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return value
+    return value
+
+
+def _timestamp_to_iso(value):
+    return datetime.fromtimestamp(value).isoformat() if isinstance(value, float) else value
+
+
+class WidgetRecord:
+    """
+    Compact widget data: a __slots__ object instead of a dict per widget.
+    
+    Geometry is packed into one int, timestamps are float seconds, and
+    properties that repeat the name, text, position or size are not stored
+    twice. The record supports the read access of a widget dict (get, [] and
+    in) for code generation and plugins; to_dict() builds the full dict for
+    JSON export on demand. Dicts returned for 'properties' are copies, use
+    update_properties() to change them.
+    """
+    
+    __slots__ = ('id', 'type', 'name', 'text', 'created', 'last_modified',
+                 '_geometry', '_properties', '_shared', '_extra')
+    
+    def __init__(self, widget_id: Optional[str], widget_type: str, name: Optional[str] = None,
+                 text: Optional[str] = None, properties: Optional[Dict[str, Any]] = None,
+                 position=DEFAULT_POSITION, size=DEFAULT_SIZE, created=None):
+        self.id = widget_id
+        self.type = widget_type
+        self.name = name
+        self.text = text
+        self.created = time.time() if created is None else _timestamp_to_float(created)
+        self.last_modified = None
+        self._geometry = _pack_geometry(position, size)
+        self._properties = None
+        self._shared = 0
+        self._extra = None
+        if properties:
+            self._set_properties(properties)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WidgetRecord':
+        """Build record from a widget dict (project file format)"""
+        record = cls(data.get('id'), data.get('type'), data.get('name'), data.get('text'),
+                     data.get('properties'), data.get('position', DEFAULT_POSITION),
+                     data.get('size', DEFAULT_SIZE), data.get('created'))
+        if 'last_modified' in data:
+            record.last_modified = _timestamp_to_float(data['last_modified'])
+        extra = {key: value for key, value in data.items() if key not in _FIELDS}
+        record._extra = extra or None
+        return record
+    
+    @property
+    def position(self):
+        geometry = self._geometry
+        if isinstance(geometry, tuple):
+            return geometry[0]
+        return (((geometry >> 96) & _COORD_MASK) - _COORD_OFFSET,
+                ((geometry >> 64) & _COORD_MASK) - _COORD_OFFSET)
+    
+    @property
+    def size(self):
+        geometry = self._geometry
+        if isinstance(geometry, tuple):
+            return geometry[1]
+        return (((geometry >> 32) & _COORD_MASK) - _COORD_OFFSET,
+                (geometry & _COORD_MASK) - _COORD_OFFSET)
+    
+    def set_geometry(self, position=None, size=None):
+        """Move and/or resize the widget (properties keep their position and size values)"""
+        if self._shared & _GEOMETRY_BITS:
+            # Shared position/size properties are stored before the record fields change
+            stored = dict(self._properties) if self._properties else {}
+            for key in ('position', 'size'):
+                if self._shared & _SHARED_BITS[key]:
+                    stored[key] = getattr(self, key)
+            self._shared &= ~_GEOMETRY_BITS
+            self._properties = stored
+        self._geometry = _pack_geometry(position if position is not None else self.position,
+                                        size if size is not None else self.size)
+    
+    @property
+    def rect(self) -> Optional[Rect]:
+        """Canvas rectangle (x, y, width, height), None if geometry is not numeric"""
+        try:
+            (x, y), (width, height) = self.position, self.size
+            return (x + 0, y + 0, width + 0, height + 0)
+        except (TypeError, ValueError):
+            return None
+    
+    @property
+    def properties(self) -> Dict[str, Any]:
+        """Copy of the widget properties"""
+        properties = dict(self._properties) if self._properties else {}
+        if self._shared:
+            for bit, key in enumerate(_SHARED_PROPERTIES):
+                if self._shared & (1 << bit):
+                    properties[key] = getattr(self, key)
+        return properties
+    
+    def _set_properties(self, properties: Dict[str, Any]):
+        stored = self._properties or {}
+        for key, value in properties.items():
+            bit = _SHARED_BITS.get(key)
+            if bit is not None and getattr(self, key) == value:
+                self._shared |= bit
+                stored.pop(key, None)
+            else:
+                if bit is not None:
+                    self._shared &= ~bit
+                stored[key] = value
+        self._properties = stored or None
+    
+    def update_properties(self, properties: Dict[str, Any], timestamp: Optional[float] = None):
+        """Merge properties into the widget and stamp last_modified"""
+        self._set_properties(properties)
+        self.last_modified = time.time() if timestamp is None else timestamp
+    
+    def replace_properties(self, properties: Dict[str, Any], timestamp: Optional[float] = None):
+        """Replace all properties of the widget and stamp last_modified"""
+        self._properties = None
+        self._shared = 0
+        self.update_properties(properties, timestamp)
+    
+    def copy(self) -> 'WidgetRecord':
+        """Independent copy (properties are copied, their values are shared)"""
+        record = WidgetRecord.__new__(WidgetRecord)
+        for name in WidgetRecord.__slots__:
+            setattr(record, name, getattr(self, name))
+        if self._properties:
+            record._properties = dict(self._properties)
+        if self._extra:
+            record._extra = dict(self._extra)
+        return record
+    
+    def same_state(self, other: 'WidgetRecord') -> bool:
+        """Check if another record holds the same data (e.g. an unchanged copy)"""
+        return all(getattr(self, name) == getattr(other, name) for name in WidgetRecord.__slots__)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get widget as a dict in the project file format"""
+        data = {
+            'id': self.id,
+            'type': self.type,
+            'name': self.name,
+            'text': self.text,
+            'properties': self.properties,
+            'position': self.position,
+            'size': self.size,
+            'created': _timestamp_to_iso(self.created)
+        }
+        if self.last_modified is not None:
+            data['last_modified'] = _timestamp_to_iso(self.last_modified)
+        if self._extra:
+            data.update(self._extra)
+        return data
+    
+    # Read access compatible with widget dicts
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        getter = _GETTERS.get(key)
+        if getter is None:
+            return self._extra.get(key, default) if self._extra else default
+        value = getter(self)
+        return default if value is None else value
+    
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None and key not in self:
+            raise KeyError(key)
+        return value
+    
+    def __contains__(self, key: object) -> bool:
+        getter = _GETTERS.get(key)
+        if getter is None:
+            return bool(self._extra) and key in self._extra
+        return getter(self) is not None
+    
+    def __repr__(self) -> str:
+        return f"WidgetRecord({self.id!r}, {self.type!r}, name={self.name!r})"
+
+
+_FIELDS = ('id', 'type', 'name', 'text', 'properties', 'position', 'size', 'created', 'last_modified')
+_SHARED_BITS = {key: 1 << bit for bit, key in enumerate(_SHARED_PROPERTIES)}
+_GEOMETRY_BITS = _SHARED_BITS['position'] | _SHARED_BITS['size']
+_GETTERS = {
+    'id': WidgetRecord.id.__get__,
+    'type': WidgetRecord.type.__get__,
+    'name': WidgetRecord.name.__get__,
+    'text': WidgetRecord.text.__get__,
+    'properties': WidgetRecord.properties.fget,
+    'position': WidgetRecord.position.fget,
+    'size': WidgetRecord.size.fget,
+    'created': lambda record: _timestamp_to_iso(record.created),
+    'last_modified': lambda record: _timestamp_to_iso(record.last_modified)
+}
+
+
+class WidgetStore:
+    """
+    Ordered collection of widget records keyed by widget id.
+    
+    Widgets are held in an insertion-ordered dict, so iteration yields them
+    in design order and removal needs no index bookkeeping. Ids come from a
+    monotonic counter and are never reused, even after removals. The
+    spatial grid indexes widget rectangles; geometry changes must go
+    through move() to keep it in sync.
+    """
+    
+    def __init__(self, widgets: Optional[Iterable[Union[WidgetRecord, Dict[str, Any]]]] = None):
+        self._widgets: Dict[str, WidgetRecord] = {}
+        self._next_id = 1
+        self.spatial = SpatialGrid()
+        
+        for widget in widgets or ():
+            self.add(widget)
+    
+    @classmethod
+    def from_list(cls, widgets: List[Dict[str, Any]]) -> 'WidgetStore':
+        """Build a store from the list-of-dicts project format"""
+        return cls(widgets)
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Get widgets in design order as a list of dicts"""
+        return [record.to_dict() for record in self._widgets.values()]
+    
+    def allocate_id(self) -> str:
+        """Reserve the next unused widget id"""
+        widget_id = f"{WIDGET_ID_PREFIX}{self._next_id}"
+        self._next_id += 1
+        # Ids loaded from files may not follow the counter
+        while widget_id in self._widgets:
+            widget_id = f"{WIDGET_ID_PREFIX}{self._next_id}"
+            self._next_id += 1
+        return widget_id
+    
+    def add(self, widget: Union[WidgetRecord, Dict[str, Any]]) -> WidgetRecord:
+        """
+        Add widget at the end of the design.
+        
+        Args:
+            widget: Widget record or dict; an id is allocated if it has none
+        
+        Returns:
+            WidgetRecord: The added widget
+        """
+        if not isinstance(widget, WidgetRecord):
+            widget = WidgetRecord.from_dict(widget)
+        
+        widget_id = widget.id
+        if widget_id is None:
+            widget_id = widget.id = self.allocate_id()
+        elif widget_id in self._widgets:
+            raise ValueError(f"Duplicate widget id: {widget_id}")
+        else:
+            self._reserve(widget_id)
+        
+        self._widgets[widget_id] = widget
+        self._index(widget)
+        return widget
+    
+    def put(self, widget: WidgetRecord) -> WidgetRecord:
+        """Replace the widget with the same id in place, or add it at the end"""
+        if widget.id is None:
+            raise ValueError("Cannot put widget without id")
+        if widget.id not in self._widgets:
+            return self.add(widget)
+        self._widgets[widget.id] = widget
+        self._index(widget)
+        return widget
+    
+    def _index(self, widget: WidgetRecord):
+        rect = widget.rect
+        if rect is not None:
+            self.spatial.insert(widget.id, rect)
+        else:
+            self.spatial.remove(widget.id)
+    
+    def _reserve(self, widget_id: str):
+        """Keep the id counter past explicitly given ids"""
+        if widget_id.startswith(WIDGET_ID_PREFIX):
+            suffix = widget_id[len(WIDGET_ID_PREFIX):]
+            if suffix.isdigit() and int(suffix) >= self._next_id:
+                self._next_id = int(suffix) + 1
+    
+    def get(self, widget_id: str) -> Optional[WidgetRecord]:
+        """Get widget by id (None if not found)"""
+        return self._widgets.get(widget_id)
+    
+    def remove(self, widget_id: str) -> Optional[WidgetRecord]:
+        """Remove widget by id and return it (None if not found)"""
+        self.spatial.remove(widget_id)
+        return self._widgets.pop(widget_id, None)
+    
+    def move(self, widget_id: str, position=None, size=None) -> Optional[WidgetRecord]:
+        """
+        Move and/or resize a widget, keeping the spatial index in sync.
+        
+        Returns:
+            WidgetRecord: The moved widget (None if not found)
+        """
+        widget = self._widgets.get(widget_id)
+        if widget is not None:
+            widget.set_geometry(position, size)
+            self._index(widget)
+        return widget
+    
+    def remove_many(self, widget_ids: Iterable[str]) -> List[Tuple[int, WidgetRecord]]:
+        """
+        Remove several widgets in one pass.
+        
+        Args:
+            widget_ids: Ids to remove (unknown ids are ignored)
+        
+        Returns:
+            List: (position, record) of removed widgets in design order,
+                suitable for insert_many to restore them
+        """
+        wanted = set(widget_ids).intersection(self._widgets)
+        if not wanted:
+            return []
+        
+        removed = [(i, record) for i, record in enumerate(self._widgets.values()) if record.id in wanted]
+        for _, record in removed:
+            del self._widgets[record.id]
+            self.spatial.remove(record.id)
+        return removed
+    
+    def insert_many(self, items: Iterable[Tuple[int, WidgetRecord]]):
+        """
+        Insert widgets at design positions in one pass.
+        
+        Args:
+            items: (position, record) pairs; positions refer to the order
+                after insertion, as returned by remove_many
+        """
+        items = sorted(items, key=lambda item: item[0])
+        for _, record in items:
+            if record.id is None or record.id in self._widgets:
+                raise ValueError(f"Cannot insert widget with id: {record.id}")
+            self._reserve(record.id)
+        
+        widgets = {}
+        pending = iter(items)
+        item = next(pending, None)
+        for record in self._widgets.values():
+            while item is not None and item[0] <= len(widgets):
+                widgets[item[1].id] = item[1]
+                item = next(pending, None)
+            widgets[record.id] = record
+        while item is not None:
+            widgets[item[1].id] = item[1]
+            item = next(pending, None)
+        self._widgets = widgets
+        for _, record in items:
+            self._index(record)
+        # Restored widgets go back to their place in the stacking order
+        self.spatial.set_order(widgets)
+    
+    def clear(self):
+        """Remove all widgets (ids are still not reused)"""
+        self._widgets.clear()
+        self.spatial.clear()
+    
+    def snapshot(self, base: Optional[Tuple[WidgetRecord, ...]] = None) -> Tuple[WidgetRecord, ...]:
+        """
+        Copy all widgets in design order, for restore().
+        
+        Args:
+            base: Earlier snapshot; its copies of unchanged widgets are shared
+                instead of copied again
+        """
+        if not base:
+            return tuple(record.copy() for record in self._widgets.values())
+        
+        previous = {record.id: record for record in base}
+        copies = []
+        for record in self._widgets.values():
+            old = previous.get(record.id)
+            copies.append(old if old is not None and old.same_state(record) else record.copy())
+        return tuple(copies)
+    
+    def restore(self, snapshot: Iterable[WidgetRecord]):
+        """
+        Replace all widgets with a snapshot (copied, so it can be restored again).
+        
+        The id counter is kept, so ids allocated after the snapshot are not reused.
+        """
+        self.clear()
+        for record in snapshot:
+            self.add(record.copy())
+    
+    def __getitem__(self, widget_id: str) -> WidgetRecord:
+        return self._widgets[widget_id]
+    
+    def __contains__(self, widget_id: object) -> bool:
+        return widget_id in self._widgets
+    
+    def __iter__(self) -> Iterator[WidgetRecord]:
+        return iter(self._widgets.values())
+    
+    def __len__(self) -> int:
+        return len(self._widgets)
+    
+    def __repr__(self) -> str:
+        return f"WidgetStore({len(self._widgets)} widgets)"
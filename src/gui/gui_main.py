@@ -15,15 +15,17 @@ from PyQt5.QtWidgets import (QAction,
     QInputDialog, QComboBox, QSpinBox, QCheckBox, QGroupBox,
     QFormLayout, QGridLayout, QScrollArea, QFrame
 )
-from PyQt5.QtCore import Qt, QSize, pyqtSignal, QTimer, QSettings
+from PyQt5.QtCore import Qt, QSize, pyqtSignal, QTimer, QByteArray, QThreadPool
 from PyQt5.QtGui import QIcon, QFont, QPalette, QColor, QKeySequence, QPixmap
 
 # Import application modules
 from core.app_core import AppCore
 from core.plugin_manager import PluginManager
-from core.command_dispatcher import CommandDispatcher
+from core.command_dispatcher import (AddWidgetCommand, AnalyzeCodeCommand, CommandDispatcher, GenerateCodeCommand,
+                                     MoveWidgetsCommand)
 from gui.tab_manager import TabManager
 from gui.windows_style import Windows10Style, ModernButtonStyle
+from gui.workers import ProjectLoadWorker, ProjectAnalysisWorker
 
 
 class MainWindow(QMainWindow):
@@ -31,6 +33,7 @@ class MainWindow(QMainWindow):
     
     project_loaded = pyqtSignal(str)
     project_saved = pyqtSignal(str)
+    command_finished = pyqtSignal(object, object)  # Command, CommandResult (from worker threads)
     
     def __init__(self):
         super().__init__()
@@ -38,10 +41,22 @@ class MainWindow(QMainWindow):
         # Initialize core components
         self.core = AppCore()
         self.plugin_manager = PluginManager(self.core)
-        self.command_dispatcher = CommandDispatcher()
+        self.command_dispatcher = CommandDispatcher(core=self.core)
         
-        # Load settings
-        self.settings = QSettings("GUI Constructor", "GUI Constructor")
+        # Long commands run off the GUI thread; results arrive through a queued signal
+        self.command_dispatcher.completion_listeners.append(self.command_finished.emit)
+        self.command_finished.connect(self._on_command_finished)
+        
+        # Settings are shared with the core (one file, saved in the background)
+        self.settings = self.core.settings
+        
+        # Background tasks
+        self.thread_pool = QThreadPool.globalInstance()
+        self._load_worker = None
+        self._analysis_worker = None
+        
+        # Designer selection (widget ids)
+        self.selected_widget_ids: List[str] = []
         
         # Setup UI
         self._setup_ui()
@@ -53,6 +68,12 @@ class MainWindow(QMainWindow):
         # Load plugins
         self._load_plugins()
         
+        # Autosave only fsyncs the project journal, so it can run often
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.core.autosave)
+        if self.core.settings.get('autosave'):
+            self.autosave_timer.start(int(self.core.settings.get('autosave_interval', 300)) * 1000)
+        
         # Set window properties
         self.setWindowTitle("GUI Constructor Platform")
         self.setGeometry(100, 100, 1400, 800)
@@ -65,6 +86,8 @@ class MainWindow(QMainWindow):
         # Central widget with tabs
         self.tab_manager = TabManager()
         self.tab_manager.add_default_tabs()
+        self.tab_manager.analysis_cancel_requested.connect(self.cancel_background_task)
+        self.code_editor = self.tab_manager.code_edit
         self.setCentralWidget(self.tab_manager)
         
         # Apply styling
@@ -326,7 +349,7 @@ class MainWindow(QMainWindow):
     
     def _populate_recent_projects(self, menu):
         """Populate recent projects menu"""
-        recent_projects = self.settings.value("recent_projects", [])
+        recent_projects = self.settings.recent_projects()
         
         if not recent_projects:
             no_projects = QAction("No recent projects", self)
@@ -515,12 +538,20 @@ class MainWindow(QMainWindow):
         self.progress_bar.setMaximumWidth(200)
         self.progress_bar.setVisible(False)
         
+        # Cancel button for background tasks
+        self.cancel_task_button = QToolButton()
+        self.cancel_task_button.setText("✖ Cancel")
+        self.cancel_task_button.setToolTip("Cancel running task")
+        self.cancel_task_button.setVisible(False)
+        self.cancel_task_button.clicked.connect(self.cancel_background_task)
+        
         # Add widgets to status bar
         status_bar.addPermanentWidget(self.project_status_label, 1)
         status_bar.addPermanentWidget(self.cursor_position_label)
         status_bar.addPermanentWidget(self.file_type_label)
         status_bar.addPermanentWidget(self.encoding_label)
         status_bar.addPermanentWidget(self.progress_bar)
+        status_bar.addPermanentWidget(self.cancel_task_button)
     
     def _load_plugins(self):
         """Load available plugins"""
@@ -606,19 +637,22 @@ class MainWindow(QMainWindow):
     
     def _restore_window_state(self):
         """Restore window state from settings"""
-        geometry = self.settings.value("window_geometry")
-        state = self.settings.value("window_state")
+        geometry = self.settings.get("window_geometry")
+        state = self.settings.get("window_state")
         
+        # Stored base64-encoded, the settings file is JSON
         if geometry:
-            self.restoreGeometry(geometry)
+            self.restoreGeometry(QByteArray.fromBase64(geometry.encode('ascii')))
         if state:
-            self.restoreState(state)
+            self.restoreState(QByteArray.fromBase64(state.encode('ascii')))
     
     def closeEvent(self, event):
         """Handle window close event"""
         # Save window state
-        self.settings.setValue("window_geometry", self.saveGeometry())
-        self.settings.setValue("window_state", self.saveState())
+        self.settings.update({
+            "window_geometry": bytes(self.saveGeometry().toBase64()).decode('ascii'),
+            "window_state": bytes(self.saveState().toBase64()).decode('ascii')
+        })
         
         # Check for unsaved changes
         if self.core.project.modified:
@@ -635,11 +669,20 @@ class MainWindow(QMainWindow):
                 return
             elif reply == QMessageBox.StandardButton.Yes:
                 self.save_project()
+            else:
+                # Do not recover rejected changes on the next open
+                self.core.discard_unsaved_changes()
         
         # Cleanup plugins
         for plugin in self.plugin_manager.plugins.values():
             plugin.cleanup()
         
+        # Let running commands finish before the window goes away
+        self.command_dispatcher.shutdown()
+        
+        # Write pending settings before the background timer is lost
+        self.core.close()
+        
         event.accept()
     
     # ===== Menu Action Handlers =====
@@ -695,8 +738,70 @@ class MainWindow(QMainWindow):
             )
     
     def _load_project(self, project_path):
-        """Load project from path"""
-        if self.core.load_project(project_path):
+        """Load project from path on a background thread"""
+        if self._load_worker:
+            self._load_worker.cancel()
+        
+        worker = ProjectLoadWorker(self.core, project_path)
+        worker.signals.progress.connect(self._on_project_load_progress)
+        worker.signals.partial.connect(self._on_project_load_partial)
+        worker.signals.finished.connect(self._on_project_load_finished)
+        worker.signals.cancelled.connect(self._on_project_load_cancelled)
+        self._load_worker = worker
+        
+        project_name = os.path.basename(project_path)
+        self.project_status_label.setText(f"Loading: {project_name}...")
+        self.statusBar().showMessage(f"Loading project: {project_name}...")
+        self.progress_bar.setRange(0, 0)  # Indeterminate until file count is known
+        self.progress_bar.setVisible(True)
+        self.cancel_task_button.setVisible(True)
+        
+        self.thread_pool.start(worker)
+    
+    def _is_current_load(self):
+        """Check that a load signal comes from the active worker, not a superseded one"""
+        return self._load_worker is not None and self.sender() is self._load_worker.signals
+    
+    def _on_project_load_progress(self, stage, done, total):
+        """Update progress bar while project is loading"""
+        if not self._is_current_load():
+            return
+        
+        if total:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+        else:
+            self.progress_bar.setRange(0, 0)
+        
+        if stage == 'scan':
+            self.statusBar().showMessage(f"Scanning project: {done} files...")
+        else:
+            self.statusBar().showMessage(f"Counting lines: {done}/{total} Python files...")
+    
+    def _on_project_load_partial(self, partial):
+        """Show running totals while project is loading"""
+        if not self._is_current_load():
+            return
+        
+        self.project_status_label.setText(
+            f"Loading: {partial.get('file_count', 0)} files, "
+            f"{partial.get('python_files', 0)} Python"
+        )
+    
+    def _on_project_load_finished(self, project_path, scan):
+        """Apply a completed project scan (the core is only changed here, on the GUI thread)"""
+        if not self._is_current_load():
+            return
+        
+        if self._load_worker.is_cancelled():
+            # Cancelled after the scan finished; keep the current project
+            self._on_project_load_cancelled(project_path)
+            return
+        
+        self._load_worker = None
+        self._hide_task_progress()
+        
+        if scan is not None and self.core.apply_project_scan(scan):
             project_name = os.path.basename(project_path)
             self.project_status_label.setText(f"Project: {project_name}")
             self.statusBar().showMessage(f"Loaded project: {project_name}", 3000)
@@ -707,30 +812,48 @@ class MainWindow(QMainWindow):
             # Emit signal
             self.project_loaded.emit(project_path)
         else:
+            self._restore_project_status()
             QMessageBox.critical(
                 self, "Load Error",
                 f"Failed to load project: {project_path}"
             )
     
+    def _on_project_load_cancelled(self, project_path):
+        """Handle cancelled project load"""
+        if not self._is_current_load():
+            return
+        
+        self._load_worker = None
+        self._hide_task_progress()
+        self._restore_project_status()
+        self.statusBar().showMessage(f"Loading cancelled: {os.path.basename(project_path)}", 3000)
+    
+    def _restore_project_status(self):
+        """Show the currently open project in the status bar"""
+        if self.core.project.name:
+            self.project_status_label.setText(f"Project: {self.core.project.name}")
+        else:
+            self.project_status_label.setText("No project loaded")
+    
+    def _hide_task_progress(self):
+        """Hide progress bar and cancel button"""
+        self.progress_bar.setVisible(False)
+        self.cancel_task_button.setVisible(False)
+    
+    def cancel_background_task(self):
+        """Cancel running background tasks"""
+        for worker in (self._load_worker, self._analysis_worker):
+            if worker:
+                worker.cancel()
+                self.statusBar().showMessage("Cancelling...")
+    
     def _add_to_recent_projects(self, project_path):
         """Add project to recent projects list"""
-        recent = self.settings.value("recent_projects", [])
-        
-        # Remove if already in list
-        if project_path in recent:
-            recent.remove(project_path)
-        
-        # Add to beginning
-        recent.insert(0, project_path)
-        
-        # Keep only last 10
-        recent = recent[:10]
-        
-        self.settings.setValue("recent_projects", recent)
+        self.settings.add_recent_project(project_path)
     
     def clear_recent_projects(self):
         """Clear recent projects list"""
-        self.settings.setValue("recent_projects", [])
+        self.settings.clear_recent_projects()
         self.statusBar().showMessage("Cleared recent projects", 3000)
     
     def save_project(self):
@@ -773,8 +896,11 @@ class MainWindow(QMainWindow):
                 return
             elif reply == QMessageBox.StandardButton.Yes:
                 self.save_project()
+            else:
+                # Do not recover rejected changes on the next open
+                self.core.discard_unsaved_changes()
         
-        self.core.project = self.core.ProjectState()
+        self.core.clear_project()
         self.project_status_label.setText("No project loaded")
         self.statusBar().showMessage("Project closed", 3000)
     
@@ -891,33 +1017,59 @@ class MainWindow(QMainWindow):
         pass
     
     def analyze_project(self):
-        """Analyze current project"""
+        """Analyze all Python files of the current project on a process pool"""
         if not self.core.project.path:
             QMessageBox.information(self, "No Project", "Please open a project first")
             return
         
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate
+        if self._analysis_worker:
+            self.statusBar().showMessage("Analysis already running", 3000)
+            return
         
-        # Simulate analysis
-        QTimer.singleShot(2000, self._finish_analysis)
-    
-    def _finish_analysis(self):
-        """Finish project analysis"""
-        self.progress_bar.setVisible(False)
+        file_paths = [info['path'] for info in self.core.iter_project_files(ext='.py')]
+        if not file_paths:
+            QMessageBox.information(self, "Analyze Project", "No Python files found in project")
+            return
         
-        # Show results
-        result = self.core.analyze_code("# Sample code\nprint('Hello')")
+        worker = ProjectAnalysisWorker(file_paths)
+        worker.signals.file_analyzed.connect(self.tab_manager.add_analysis_result)
+        worker.signals.progress.connect(self._on_analysis_progress)
+        worker.signals.finished.connect(self._finish_analysis)
+        worker.signals.cancelled.connect(self._on_analysis_cancelled)
+        self._analysis_worker = worker
         
-        result_text = f"""
-        Project Analysis Complete:
-        - Lines: {result.get('lines', 'N/A')}
-        - Complexity: {result.get('complexity', 'N/A')}
-        - Issues: {len(result.get('issues', []))}
-        """
+        self.tab_manager.start_analysis_results(len(file_paths))
+        self.show_analysis()
         
-        QMessageBox.information(self, "Analysis Results", result_text)
-        self.statusBar().showMessage("Project analysis complete", 3000)
+        self.progress_bar.setRange(0, len(file_paths))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_task_button.setVisible(True)
+        self.statusBar().showMessage(f"Analyzing {len(file_paths)} files...")
+        
+        self.thread_pool.start(worker)
+    
+    def _on_analysis_progress(self, done, total):
+        """Update determinate progress while analysis runs"""
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.statusBar().showMessage(f"Analyzing: {done}/{total} files")
+    
+    def _finish_analysis(self, summary):
+        """Finish project analysis"""
+        self._analysis_worker = None
+        self._hide_task_progress()
+        self.tab_manager.finish_analysis_results(summary)
+        self.statusBar().showMessage(
+            f"Project analysis complete: {summary['files']} files, {summary['issues']} issues", 3000
+        )
+    
+    def _on_analysis_cancelled(self, summary):
+        """Handle cancelled project analysis"""
+        self._analysis_worker = None
+        self._hide_task_progress()
+        self.tab_manager.finish_analysis_results(summary, cancelled=True)
+        self.statusBar().showMessage("Project analysis cancelled", 3000)
     
     def run_project(self):
         """Run current project"""
@@ -965,14 +1117,25 @@ class MainWindow(QMainWindow):
         pass
     
     def generate_code(self):
-        """Generate code from design"""
-        code = self.core.generate_gui_code()
-        
-        # Show in code editor tab
-        self.tab_manager.setCurrentIndex(1)  # Switch to code editor
-        # TODO: Set code in editor
+        """Generate code from design (in the background, see _on_command_finished)"""
+        self.command_dispatcher.execute_async(GenerateCodeCommand(self.core))
+        self.statusBar().showMessage("Generating code...")
+    
+    def _on_command_finished(self, command, result):
+        """Show the result of a command run by execute_async (on the GUI thread)"""
+        if not result.success:
+            self.statusBar().showMessage(result.message, 5000)
+            return
         
-        self.statusBar().showMessage("Code generated", 3000)
+        if isinstance(command, GenerateCodeCommand):
+            # Show in code editor tab
+            self.tab_manager.setCurrentIndex(1)  # Switch to code editor
+            self.code_editor.setPlainText(result.data['code'])
+            self.statusBar().showMessage("Code generated", 3000)
+        elif isinstance(command, AnalyzeCodeCommand):
+            analysis = result.data['analysis']
+            self.statusBar().showMessage(f"Code analyzed: {analysis['total_lines']} lines, "
+                                         f"{len(analysis['issues'])} issues", 5000)
     
     def refactor_code(self):
         """Refactor code"""
@@ -980,9 +1143,14 @@ class MainWindow(QMainWindow):
         pass
     
     def analyze_code(self):
-        """Analyze code"""
-        # TODO: Implement code analysis
-        pass
+        """Analyze the code in the editor (in the background)"""
+        code = self.code_editor.toPlainText()
+        if not code.strip():
+            self.statusBar().showMessage("No code to analyze", 3000)
+            return
+        
+        self.command_dispatcher.execute_async(AnalyzeCodeCommand(code, self.core))
+        self.statusBar().showMessage("Analyzing code...")
     
     def generate_docs(self):
         """Generate documentation"""
@@ -1111,8 +1279,10 @@ class MainWindow(QMainWindow):
         }
         
         # Create and execute command
-        command = AddWidgetCommand(widget_type, properties, self)
+        command = AddWidgetCommand(widget_type, properties, self.core)
         result = self.command_dispatcher.execute_command(command)
+        # Discrete action: the next command starts a new undo step
+        self.command_dispatcher.break_coalescing()
         
         if result.success:
             self.statusBar().showMessage(f"Added {widget_type} to canvas", 3000)
@@ -1124,20 +1294,42 @@ class MainWindow(QMainWindow):
         # TODO: Implement design preview
         pass
     
+    def select_widgets_in_rect(self, x: float, y: float, width: float, height: float):
+        """Select widgets inside a rubber-band rectangle on the canvas"""
+        self.selected_widget_ids = self.core.widgets_in_rect(x, y, width, height)
+        self.statusBar().showMessage(f"Selected {len(self.selected_widget_ids)} widgets", 3000)
+    
+    def _align_selection(self, mode: str):
+        """Align selected widgets as one undoable command"""
+        if len(self.selected_widget_ids) < 2:
+            self.statusBar().showMessage("Select at least two widgets to align", 3000)
+            return
+        
+        positions = self.core.align_positions(self.selected_widget_ids, mode)
+        if not positions:
+            self.statusBar().showMessage("Widgets already aligned", 3000)
+            return
+        
+        command = MoveWidgetsCommand(positions, self.core, f"Align {mode.title()}")
+        result = self.command_dispatcher.execute_command(command)
+        # Discrete action: the next command starts a new undo step
+        self.command_dispatcher.break_coalescing()
+        if result.success:
+            self.statusBar().showMessage(f"Aligned {len(positions)} widgets {mode}", 3000)
+        else:
+            QMessageBox.warning(self, "Align Widgets", result.message)
+    
     def align_left(self):
         """Align widgets left"""
-        # TODO: Implement alignment
-        pass
+        self._align_selection('left')
     
     def align_center(self):
         """Align widgets center"""
-        # TODO: Implement alignment
-        pass
+        self._align_selection('center')
     
     def align_right(self):
         """Align widgets right"""
-        # TODO: Implement alignment
-        pass
+        self._align_selection('right')
     
     def toggle_grid(self):
         """Toggle design grid"""
@@ -1146,8 +1338,9 @@ class MainWindow(QMainWindow):
     
     def toggle_snap(self):
         """Toggle snap to grid"""
-        # TODO: Implement snap toggle
-        pass
+        snap = not self.core.settings.get('snap_to_grid', False)
+        self.core.settings['snap_to_grid'] = snap
+        self.statusBar().showMessage(f"Snap to grid {'on' if snap else 'off'}", 3000)
     
     def edit_style(self):
         """Edit style sheet"""
@@ -2,22 +2,31 @@
 Tab Manager - handles tabbed interface for GUI Constructor.
 """
 
-from PyQt5.QtWidgets import (QTabWidget, QWidget, QVBoxLayout, QHBoxLayout,, QAction
+from PyQt5.QtWidgets import (QTabWidget, QWidget, QVBoxLayout, QHBoxLayout, QAction,
                              QPushButton, QLabel, QTextEdit, QTreeWidget,
                              QTreeWidgetItem, QListWidget, QSplitter,
                              QToolBar, QStatusBar, QDockWidget)
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QIcon
 
+from core.code_analysis import collect_issues
+from core.incremental_analysis import IncrementalAnalyzer
+
+
+# Issues listed in the code editor output panel
+MAX_LINT_ISSUES = 200
+
 
 class TabManager(QTabWidget):
     """Manages application tabs with Windows 10 style"""
     
     tab_changed = pyqtSignal(int)  # Signal when tab changes
+    analysis_cancel_requested = pyqtSignal()  # Cancel button in analysis tab
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.tabs_data = {}  # Store tab-specific data
+        self.code_analyzer = IncrementalAnalyzer()  # Live linting of the code editor
         self._setup_ui()
     
     def _setup_ui(self):
@@ -242,6 +251,13 @@ class TabManager(QTabWidget):
         layout.addWidget(output_label)
         layout.addWidget(output_edit)
         
+        # Lint on every edit; only changed blocks are re-analyzed
+        self.code_edit = code_edit
+        self.code_output = output_edit
+        self.code_output_label = output_label
+        self.code_analyzer.reset()
+        code_edit.textChanged.connect(self._lint_code_editor)
+        
         self.tabs_data[id(tab)] = {
             'type': 'code_editor',
             'file_path': None,
@@ -250,6 +266,24 @@ class TabManager(QTabWidget):
         
         return tab
     
+    def _lint_code_editor(self):
+        """Re-analyze the code editor buffer and list issues in the output panel"""
+        code = self.code_edit.toPlainText()
+        if not code.strip():
+            self.code_output.clear()
+            self.code_output_label.setText("📤 Output")
+            return
+        
+        issues = collect_issues(self.code_analyzer.update(code))
+        
+        lines = [f"Line {issue['line']}: [{issue['severity']}] {issue['message']}"
+                 for issue in issues[:MAX_LINT_ISSUES]]
+        if len(issues) > MAX_LINT_ISSUES:
+            lines.append(f"... {len(issues) - MAX_LINT_ISSUES} more")
+        
+        self.code_output.setPlainText('\n'.join(lines))
+        self.code_output_label.setText(f"📤 Output — {len(issues)} issues" if issues else "📤 Output — no issues")
+    
     def create_analysis_tab(self) -> QWidget:
         """Create project analysis tab"""
         tab = QWidget()
@@ -272,6 +306,13 @@ class TabManager(QTabWidget):
             action.setToolTip(tooltip)
             analysis_toolbar.addAction(action)
         
+        analysis_toolbar.addSeparator()
+        cancel_action = QAction("⏹ Cancel", self)
+        cancel_action.setToolTip("Cancel running analysis")
+        cancel_action.setEnabled(False)
+        cancel_action.triggered.connect(self.analysis_cancel_requested.emit)
+        analysis_toolbar.addAction(cancel_action)
+        
         # Analysis results area
         splitter = QSplitter(Qt.Orientation.Horizontal)
         
@@ -350,6 +391,10 @@ class TabManager(QTabWidget):
         layout.addWidget(analysis_toolbar)
         layout.addWidget(splitter)
         
+        self.analysis_tree = project_tree
+        self.analysis_results_view = metrics_text
+        self.analysis_cancel_action = cancel_action
+        
         self.tabs_data[id(tab)] = {
             'type': 'analysis',
             'project_path': None,
@@ -358,6 +403,57 @@ class TabManager(QTabWidget):
         
         return tab
     
+    def start_analysis_results(self, total_files: int):
+        """Reset analysis tab before streaming per-file results"""
+        self.analysis_tree.clear()
+        self.analysis_tree.setHeaderLabels(["File", "Issues", "Complexity"])
+        self.analysis_results_view.setHtml(
+            f"<h3>Analyzing {total_files} Python files...</h3>"
+        )
+        self.analysis_cancel_action.setEnabled(True)
+    
+    def add_analysis_result(self, result):
+        """Append one file's analysis result"""
+        report = result.get('report', {})
+        if 'error' in result:
+            complexity = f"Error: {result['error']}"
+        elif 'error' in report:
+            complexity = report['error']
+        else:
+            complexity = f"{report.get('complexity_level', 'N/A')} ({report.get('complexity_score', 0)})"
+        
+        item = QTreeWidgetItem(self.analysis_tree, [
+            result.get('path', ''),
+            str(len(result.get('issues', []))),
+            complexity
+        ])
+        for issue in result.get('issues', []):
+            QTreeWidgetItem(item, [
+                f"Line {issue.get('line', 0)}: {issue.get('message', '')}",
+                issue.get('severity', ''),
+                issue.get('type', '')
+            ])
+    
+    def finish_analysis_results(self, summary, cancelled: bool = False):
+        """Show project totals once analysis ends"""
+        self.analysis_cancel_action.setEnabled(False)
+        
+        title = "Project Analysis Cancelled" if cancelled else "Project Analysis Results"
+        severity_rows = ''.join(
+            f"<tr><td><b>{severity.capitalize()}:</b></td><td>{count}</td></tr>"
+            for severity, count in summary.get('issues_by_severity', {}).items()
+        )
+        self.analysis_results_view.setHtml(f"""
+            <h3>{title}</h3>
+            <table border="1" cellpadding="5">
+            <tr><td><b>Files Analyzed:</b></td><td>{summary.get('files', 0)}</td></tr>
+            <tr><td><b>Code Issues:</b></td><td>{summary.get('issues', 0)}</td></tr>
+            {severity_rows}
+            <tr><td><b>Files With Errors:</b></td><td>{summary.get('errors', 0)}</td></tr>
+            <tr><td><b>Total Complexity Score:</b></td><td>{summary.get('complexity_score', 0)}</td></tr>
+            </table>
+        """)
+    
     def create_ai_assistant_tab(self) -> QWidget:
         """Create AI assistant tab"""
         tab = QWidget()
@@ -0,0 +1,117 @@
+"""
+Background Workers - QThreadPool tasks for long-running operations.
+Keeps project loading and analysis off the GUI thread.
+PyQt5 compatible version.
+"""
+
+import threading
+from typing import Dict, Any, List
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from core.analysis_pipeline import ProjectAnalysisPipeline
+from core.project_scanner import ScanCancelled
+
+
+class ProjectLoadSignals(QObject):
+    """Signals emitted by ProjectLoadWorker (delivered on the GUI thread)"""
+    
+    progress = pyqtSignal(str, int, int)  # stage, done, total (0 if unknown)
+    partial = pyqtSignal(dict)            # running totals while scanning
+    finished = pyqtSignal(str, object)    # project path, ProjectScan
+    cancelled = pyqtSignal(str)           # project path
+
+
+class ProjectLoadWorker(QRunnable):
+    """
+    Scans a project through AppCore.scan_project on a pool thread.
+    
+    The core is not changed here; the GUI thread applies the emitted scan
+    with AppCore.apply_project_scan.
+    """
+    
+    def __init__(self, core, project_path: str):
+        super().__init__()
+        self.core = core
+        self.project_path = project_path
+        self.signals = ProjectLoadSignals()
+        self._cancel_event = threading.Event()
+        self.setAutoDelete(False)
+    
+    def cancel(self):
+        """Request cancellation; the scan stops at the next directory or batch"""
+        self._cancel_event.set()
+    
+    def is_cancelled(self) -> bool:
+        """Check if cancellation was requested"""
+        return self._cancel_event.is_set()
+    
+    def _report_progress(self, stage: str, done: int, total: int, partial: Dict[str, Any]):
+        self.signals.progress.emit(stage, done, total)
+        self.signals.partial.emit(partial)
+    
+    def run(self):
+        """Run project scanning"""
+        try:
+            scan = self.core.scan_project(
+                self.project_path,
+                progress_callback=self._report_progress,
+                is_cancelled=self.is_cancelled
+            )
+        except ScanCancelled:
+            scan = None
+        except Exception as e:
+            print(f"✗ Error in project load worker: {e}")
+            scan = None
+        
+        if self.is_cancelled():
+            self.signals.cancelled.emit(self.project_path)
+        else:
+            self.signals.finished.emit(self.project_path, scan)
+
+
+class ProjectAnalysisSignals(QObject):
+    """Signals emitted by ProjectAnalysisWorker (delivered on the GUI thread)"""
+    
+    file_analyzed = pyqtSignal(dict)   # per-file result
+    progress = pyqtSignal(int, int)    # done, total
+    finished = pyqtSignal(dict)        # project summary
+    cancelled = pyqtSignal(dict)       # summary of files analyzed before cancel
+
+
+class ProjectAnalysisWorker(QRunnable):
+    """Drives ProjectAnalysisPipeline from a pool thread"""
+    
+    def __init__(self, file_paths: List[str]):
+        super().__init__()
+        self.pipeline = ProjectAnalysisPipeline(file_paths)
+        self.signals = ProjectAnalysisSignals()
+        self._cancel_event = threading.Event()
+        self.setAutoDelete(False)
+    
+    def cancel(self):
+        """Request cancellation; files still queued are skipped"""
+        self._cancel_event.set()
+    
+    def is_cancelled(self) -> bool:
+        """Check if cancellation was requested"""
+        return self._cancel_event.is_set()
+    
+    def run(self):
+        """Run project analysis"""
+        results = []
+        total = len(self.pipeline.file_paths)
+        
+        try:
+            for result in self.pipeline.iter_results(self.is_cancelled):
+                results.append(result)
+                self.signals.file_analyzed.emit(result)
+                self.signals.progress.emit(len(results), total)
+        except Exception as e:
+            print(f"✗ Error in project analysis worker: {e}")
+        
+        summary = ProjectAnalysisPipeline.summarize(results)
+        if self.is_cancelled():
+            self.signals.cancelled.emit(summary)
+        else:
+            self.signals.finished.emit(summary)
@@ -4,6 +4,7 @@ Example plugin demonstrating plugin system capabilities.
 """
 
 from core.plugin_manager import BasePlugin, PluginInfo
+from core.analysis_cache import analyze_source_cached
 from typing import List, Dict, Any
 import re
 
@@ -170,21 +171,16 @@ class RefactorPlugin(BasePlugin):
     
     def show_code_metrics(self, code: str) -> Dict[str, Any]:
         """Calculate code metrics"""
-        lines = code.split('\n')
+        result = analyze_source_cached(code)
         
         # Basic metrics
-        total_lines = len(lines)
-        code_lines = len([l for l in lines if l.strip() and not l.strip().startswith('#')])
-        comment_lines = len([l for l in lines if l.strip().startswith('#')])
+        total_lines = result.total_lines
+        code_lines = result.code_lines
+        comment_lines = result.comment_lines
         blank_lines = total_lines - code_lines - comment_lines
         
         # Estimate complexity (simplified)
-        complexity_points = 0
-        for line in lines:
-            if any(keyword in line for keyword in ['if ', 'for ', 'while ', 'def ', 'class ']):
-                complexity_points += 1
-            if ' and ' in line or ' or ' in line:
-                complexity_points += 0.5
+        complexity_points = result.keyword_points
         
         complexity_level = "Low"
         if complexity_points > 20:
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for the analysis cache: disk cache limits, reloading, analyzer version
+invalidation and background writes
+"""
+
+import sys
+import os
+import subprocess
+import textwrap
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import core.analysis_cache as analysis_cache
+from core.analysis_cache import AnalysisCache, source_key
+
+# Sources of equal length, so disk entries have the same size
+SOURCES = [f"def func_{i}(x):\n    return x + {i}\n" for i in range(10, 20)]
+
+
+def _cache(disk_dir, **limits):
+    cache = AnalysisCache(disk_dir=str(disk_dir), **limits)
+    cache.background_writes = False
+    return cache
+
+
+def _entry(code):
+    return f"{source_key(code)}.json"
+
+
+def _fill(disk_dir, sources):
+    """Write sources to the disk cache with increasing modification times"""
+    cache = _cache(disk_dir)
+    for i, code in enumerate(sources):
+        cache.analyze(code)
+        os.utime(os.path.join(str(disk_dir), _entry(code)), (1000000 + i, 1000000 + i))
+    return os.path.getsize(os.path.join(str(disk_dir), _entry(sources[0])))
+
+
+def test_sources_share_an_entry_size(tmp_path):
+    sizes = set()
+    for code in SOURCES:
+        _fill(tmp_path, [code])
+        sizes.add(os.path.getsize(str(tmp_path / _entry(code))))
+    assert len(sizes) == 1
+
+
+def test_disk_cache_evicts_oldest_by_entry_count(tmp_path):
+    cache = _cache(tmp_path, max_disk_entries=3)
+    for code in SOURCES[:5]:
+        cache.analyze(code)
+    
+    assert sorted(os.listdir(str(tmp_path))) == sorted(_entry(code) for code in SOURCES[2:5])
+    assert cache.stats()['disk_evictions'] == 2
+
+
+def test_disk_cache_evicts_oldest_by_bytes(tmp_path):
+    os.makedirs(str(tmp_path / 'probe'))
+    size = _fill(tmp_path / 'probe', SOURCES[:1])
+    
+    cache = _cache(tmp_path, max_disk_bytes=int(size * 2.5))
+    for code in SOURCES[:5]:
+        cache.analyze(code)
+    
+    assert sorted(os.listdir(str(tmp_path))) == sorted(['probe'] + [_entry(code) for code in SOURCES[3:5]])
+    assert cache.stats()['disk_evictions'] == 3
+
+
+def test_entries_read_from_disk_are_evicted_last(tmp_path):
+    _fill(tmp_path, SOURCES[:3])
+    cache = _cache(tmp_path, max_disk_entries=3)
+    
+    # Reads before the first write of a new cache count too
+    assert cache.analyze(SOURCES[0]).tree is None
+    assert cache.disk_hits == 1
+    cache.analyze(SOURCES[3])
+    assert sorted(os.listdir(str(tmp_path))) == sorted(_entry(code) for code in (SOURCES[0], SOURCES[2], SOURCES[3]))
+    
+    cache.clear()
+    assert cache.analyze(SOURCES[2]).tree is None
+    cache.analyze(SOURCES[4])
+    assert sorted(os.listdir(str(tmp_path))) == sorted(_entry(code) for code in (SOURCES[2], SOURCES[3], SOURCES[4]))
+
+
+@pytest.mark.parametrize('max_entries, bytes_factor, survivors', [
+    (4, 10, 4),    # Entry count is the tighter limit
+    (10, 3.5, 3),  # Byte budget is the tighter limit
+    (2, 3.5, 2),
+])
+def test_reloaded_cache_applies_both_limits(tmp_path, max_entries, bytes_factor, survivors):
+    size = _fill(tmp_path, SOURCES[:6])
+    assert len(os.listdir(str(tmp_path))) == 6
+    
+    # A new cache (e.g. after a restart) indexes the directory on its first write
+    cache = _cache(tmp_path, max_disk_entries=max_entries, max_disk_bytes=int(size * bytes_factor))
+    cache.analyze(SOURCES[6])
+    
+    kept = SOURCES[7 - survivors:7]
+    assert sorted(os.listdir(str(tmp_path))) == sorted(_entry(code) for code in kept)
+    assert cache.disk_evictions == 7 - survivors
+    
+    reloaded = _cache(tmp_path, max_disk_entries=max_entries, max_disk_bytes=int(size * bytes_factor))
+    for code in kept:
+        reloaded.analyze(code)
+    reloaded.analyze(SOURCES[0])
+    assert reloaded.disk_hits == survivors
+    assert reloaded.misses == 1
+
+
+def test_analyzer_version_bump_misses_the_disk_cache(tmp_path, monkeypatch):
+    _fill(tmp_path, SOURCES[:2])
+    
+    monkeypatch.setattr(analysis_cache, 'ANALYZER_VERSION', analysis_cache.ANALYZER_VERSION + 1)
+    cache = _cache(tmp_path)
+    result = cache.analyze(SOURCES[0])
+    assert result.tree is not None
+    assert (cache.misses, cache.disk_hits) == (1, 0)
+    assert len(os.listdir(str(tmp_path))) == 3
+    
+    monkeypatch.undo()
+    cache = _cache(tmp_path)
+    assert cache.analyze(SOURCES[0]).tree is None
+    assert (cache.misses, cache.disk_hits) == (0, 1)
+
+
+def test_background_writes_finish_on_flush(tmp_path):
+    cache = AnalysisCache(disk_dir=str(tmp_path))
+    assert cache.background_writes
+    for code in SOURCES[:3]:
+        cache.analyze(code)
+    cache.flush()
+    
+    assert cache.disk_writes == 3
+    assert sorted(os.listdir(str(tmp_path))) == sorted(_entry(code) for code in SOURCES[:3])
+
+
+def test_pending_background_writes_are_flushed_at_exit(tmp_path):
+    # The writer is a daemon thread, so only the exit handler saves slow writes
+    script = textwrap.dedent(f"""
+        import sys
+        import time
+        sys.path.insert(0, {os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')!r})
+        from core.analysis_cache import get_analysis_cache
+        
+        cache = get_analysis_cache()
+        cache.set_disk_dir({str(tmp_path)!r})
+        save = cache._save_to_disk
+        
+        def slow_save(*args):
+            time.sleep(0.2)
+            return save(*args)
+        
+        cache._save_to_disk = slow_save
+        for code in {SOURCES[:3]!r}:
+            cache.analyze(code)
+        print(cache.disk_writes)
+    """)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    
+    assert output.strip() == '0'
+    assert sorted(os.listdir(str(tmp_path))) == sorted(_entry(code) for code in SOURCES[:3])
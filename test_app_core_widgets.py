@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for AppCore widget batches: one undo step per batch, design order and
+stacking after remove/restore, and widget snapshots
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import core.settings_service as settings_service
+from core.analysis_cache import get_analysis_cache
+from core.app_core import AppCore
+from core.command_dispatcher import (AddWidgetsCommand, CommandDispatcher, MoveWidgetsCommand, RemoveWidgetsCommand,
+                                     UpdateWidgetsCommand)
+
+
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    """AppCore with settings kept inside tmp_path"""
+    monkeypatch.setattr(settings_service, 'SETTINGS_DIR', str(tmp_path / 'home'))
+    monkeypatch.chdir(tmp_path)
+    app_core = AppCore()
+    app_core.project.name = 'Test'
+    yield app_core
+    get_analysis_cache().set_disk_dir(None)
+
+
+def _state(core):
+    """Design order and content of all widgets (timestamps left out)"""
+    return [(record.id, record.type, record.name, record.text, record.properties, record.position, record.size)
+            for record in core.project.widgets]
+
+
+def _stacking(core, x, y):
+    return core.project.widgets.spatial.query_point(x, y)
+
+
+def _overlapping(core, count):
+    """Add widgets that all cover (50, 50), bottom to top"""
+    return [record.id for record in core.add_widgets(
+        ('QPushButton', {'text': f'Button {i}', 'position': (i * 5, i * 5), 'size': (100, 100)})
+        for i in range(count))]
+
+
+def test_batches_are_one_undo_step_each(core):
+    dispatcher = CommandDispatcher()
+    changes = []
+    core.add_change_listener(changes.append)
+    states = [_state(core)]
+    
+    commands = [
+        AddWidgetsCommand([('QPushButton', {'text': f'Button {i}'}) for i in range(5)] + [('Label', {})], core),
+        UpdateWidgetsCommand({f'widget_{i}': {'text': 'Changed', 'color': 'red'} for i in (1, 3, 6)}, core),
+        RemoveWidgetsCommand(['widget_2', 'widget_4', 'widget_6'], core),
+        MoveWidgetsCommand({'widget_1': (200, 10), 'widget_5': (200, 60)}, core, name="Align Right"),
+    ]
+    for command in commands:
+        assert dispatcher.execute_command(command).success
+        states.append(_state(core))
+    
+    assert list(dispatcher.command_history) == commands
+    assert [change.kind for change in changes] == ['added', 'updated', 'removed', 'updated']
+    assert changes[2].widget_ids == ['widget_2', 'widget_4', 'widget_6']
+    
+    # Each undo reverts exactly one batch, each redo reapplies it
+    for state in reversed(states[:-1]):
+        assert dispatcher.undo().success
+        assert _state(core) == state
+    assert not dispatcher.can_undo()
+    for state in states[1:]:
+        assert dispatcher.redo().success
+        assert _state(core) == state
+
+
+def test_remove_and_restore_keep_design_order_and_stacking(core):
+    ids = _overlapping(core, 7)
+    state = _state(core)
+    assert _stacking(core, 50, 50) == ids[::-1]
+    
+    removed = core.remove_widgets([ids[5], ids[0], ids[3]])
+    assert [record.id for _, record in removed] == [ids[0], ids[3], ids[5]]
+    assert _stacking(core, 50, 50) == [ids[6], ids[4], ids[2], ids[1]]
+    
+    assert core.restore_widgets(removed)
+    assert _state(core) == state
+    assert _stacking(core, 50, 50) == ids[::-1]
+    assert core.hit_test(50, 50) == ids[6]
+    
+    # New widgets still go on top, restored ids cannot be restored twice
+    added = core.add_widget('Label', {'position': (40, 40), 'size': (20, 20)})
+    assert core.hit_test(50, 50) == added.id
+    assert not core.restore_widgets(removed)
+
+
+def test_undo_of_a_removal_restores_stacking(core):
+    dispatcher = CommandDispatcher()
+    ids = _overlapping(core, 5)
+    state = _state(core)
+    
+    dispatcher.execute_command(RemoveWidgetsCommand([ids[4], ids[1]], core))
+    dispatcher.execute_command(RemoveWidgetsCommand([ids[0]], core))
+    assert _stacking(core, 50, 50) == [ids[3], ids[2]]
+    
+    dispatcher.undo()
+    assert _stacking(core, 50, 50) == [ids[3], ids[2], ids[0]]
+    dispatcher.undo()
+    assert _state(core) == state
+    assert _stacking(core, 50, 50) == ids[::-1]
+    assert core.widgets_in_rect(0, 0, 200, 200) == ids
+
+
+def test_restore_widget_snapshot(core):
+    changes = []
+    ids = _overlapping(core, 4)
+    snapshot = core.widget_snapshot()
+    state = _state(core)
+    core.add_change_listener(changes.append)
+    
+    core.move_widgets({ids[0]: (500, 500)})
+    core.update_widgets({ids[1]: {'text': 'Changed'}})
+    core.remove_widgets([ids[2]])
+    core.add_widget('Label', {})
+    
+    core.restore_widget_snapshot(snapshot)
+    assert _state(core) == state
+    assert _stacking(core, 50, 50) == ids[::-1]
+    assert changes[-1].kind == 'reset' and changes[-1].widget_ids == ids
+    
+    # The snapshot is copied, so it can be restored again after more edits
+    core.move_widgets({ids[3]: (900, 900)})
+    assert snapshot[3].position == (15, 15)
+    core.restore_widget_snapshot(snapshot)
+    assert _state(core) == state
+    
+    # Ids allocated after the snapshot are not reused
+    assert core.add_widget('Label', {}).id == 'widget_6'
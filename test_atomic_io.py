@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for atomic writes: content, failure handling and file permissions
+"""
+
+import sys
+import os
+import stat
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import core.atomic_io as atomic_io
+from core.atomic_io import atomic_open, atomic_path, safe_write_file
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_replaces_content_and_keeps_target_on_error(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with atomic_open(path) as f:
+        f.write('first')
+    
+    with pytest.raises(RuntimeError):
+        with atomic_open(path) as f:
+            f.write('partial')
+            raise RuntimeError("writer failed")
+    
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == 'first'
+    assert os.listdir(tmp_path) == ['out.txt']
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+@pytest.mark.parametrize('mode', [0o644, 0o600, 0o755])
+def test_existing_target_keeps_its_mode(tmp_path, mode):
+    path = str(tmp_path / 'settings.json')
+    with open(path, 'w') as f:
+        f.write('{}')
+    os.chmod(path, mode)
+    
+    with atomic_open(path, fsync=True) as f:
+        f.write('{"theme": "dark"}')
+    assert _mode(path) == mode
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permissions")
+def test_new_file_gets_umask_default(tmp_path):
+    expected = 0o666 & ~atomic_io._UMASK
+    with open(str(tmp_path / 'plain.py'), 'w') as f:
+        f.write('')
+    assert _mode(str(tmp_path / 'plain.py')) == expected
+    
+    assert safe_write_file(str(tmp_path / 'generated.py'), 'print(1)\n', backup=False)
+    with atomic_path(str(tmp_path / 'project.guiproj'), fsync=True) as tmp:
+        with open(tmp, 'wb') as f:
+            f.write(b'data')
+    assert _mode(str(tmp_path / 'generated.py')) == expected
+    assert _mode(str(tmp_path / 'project.guiproj')) == expected
+
+
+def test_fsync_flushes_the_directory(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(atomic_io, '_fsync_dir', synced.append)
+    path = str(tmp_path / 'project.json')
+    
+    with atomic_open(path) as f:
+        f.write('{}')
+    assert synced == []
+    with atomic_open(path, fsync=True) as f:
+        f.write('{}')
+    assert synced == [str(tmp_path)]
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for code analysis: single-pass if-nesting depth against the previous recount
+"""
+
+import sys
+import os
+import ast
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.code_analysis import MAX_IF_NESTING, analyze_source
+from benchmarks.bench_code_analysis import deep_ifs_quadratic, generate_nested_module
+
+
+ELIF_AND_LOOPS = '''
+def classify(values):
+    for value in values:
+        if value > 0:
+            if value > 10:
+                while value > 100:
+                    if value % 2:
+                        if value % 3:
+                            value -= 1
+                    elif value % 5:
+                        value -= 5
+                    else:
+                        break
+        elif value < 0:
+            if value < -10:
+                pass
+    return values
+
+
+class Sorter:
+    def pick(self, a, b):
+        if a:
+            return [x for x in b if x if x > a]
+        return None
+'''
+
+
+@pytest.mark.parametrize('depth', [1, MAX_IF_NESTING, MAX_IF_NESTING + 1, 12, 40])
+def test_nested_depth_matches_recount(depth):
+    code = generate_nested_module(3, depth)
+    result = analyze_source(code)
+    assert sorted(result.deep_ifs) == deep_ifs_quadratic(ast.parse(code))
+    assert result.if_statements == 3 * depth
+
+
+def test_elif_chains_and_loops_match_recount():
+    result = analyze_source(ELIF_AND_LOOPS)
+    assert result.deep_ifs
+    assert sorted(result.deep_ifs) == deep_ifs_quadratic(ast.parse(ELIF_AND_LOOPS))
+    assert result.loops == 2
+    assert result.functions == 2
+    assert result.classes == 1
+
+
+def test_syntax_error_reports_no_nesting():
+    result = analyze_source("def broken(:\n    if x:\n        pass\n")
+    assert not result.parsed
+    assert result.deep_ifs == []
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for code generation: emitter templates, output of the previous
+generator and incremental regeneration
+"""
+
+import sys
+import os
+import io
+from datetime import datetime
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.code_generator import (IncrementalCodeGenerator, WidgetEmitter, apply_code_edits, generate_gui_code,
+                                 generate_gui_code_to)
+from benchmarks.bench_code_generator import generate_gui_code_legacy, sample_widgets
+
+
+GENERATED_AT = datetime(2024, 1, 1)
+
+
+def test_emitter_substitutes_name_and_text():
+    emitter = WidgetEmitter('Spin Box', ["{name} = QSpinBox()  # {text}: 100%", "layout.addWidget({name})"],
+                            ["", "    # {text} {{literal}}"])
+    layout, handlers = emitter.render('spin_1', 'Count')
+    assert layout == "        spin_1 = QSpinBox()  # Count: 100%\n        layout.addWidget(spin_1)\n"
+    assert handlers == "\n    # Count {literal}\n"
+    
+    constant = WidgetEmitter('Separator', ["main_layout.addStretch()"])
+    assert constant.render('sep_1', 'ignored') == ("        main_layout.addStretch()\n", '')
+
+
+def test_values_are_not_evaluated():
+    emitter = WidgetEmitter('Label', ["{name} = QLabel('{text}')"])
+    text = "{name.__class__} %s %(x)s"
+    assert emitter.render('label_1', text)[0] == f"        label_1 = QLabel('{text}')\n"
+
+
+@pytest.mark.parametrize('line', ["{name.__class__}", "{text!r}", "{name:>10}", "{0}", "{widget}",
+                                  "{text[0]}"])
+def test_unsupported_fields_are_rejected(line):
+    with pytest.raises(ValueError):
+        WidgetEmitter('Broken', [line])
+
+
+@pytest.mark.parametrize('count', [0, 1, 13, 500])
+def test_output_matches_previous_generator(count):
+    widgets = sample_widgets(count)
+    expected = generate_gui_code_legacy('Test Project', widgets, GENERATED_AT)
+    assert generate_gui_code('Test Project', widgets, GENERATED_AT) == expected
+    
+    out = io.StringIO()
+    generate_gui_code_to(out, 'Test Project', widgets, GENERATED_AT)
+    assert out.getvalue() == expected
+
+
+def test_incremental_edits_rebuild_the_code():
+    widgets = sample_widgets(200)
+    generator = IncrementalCodeGenerator()
+    previous = generator.generate('Test Project', widgets, GENERATED_AT).code
+    
+    widgets[3]['text'] = 'Renamed'
+    del widgets[50]
+    widgets.append({'id': 'widget_999', 'type': 'QPushButton', 'name': 'widget_999', 'text': 'New'})
+    update = generator.generate('Test Project', widgets, GENERATED_AT)
+    
+    assert update.code == generate_gui_code('Test Project', widgets, GENERATED_AT)
+    assert apply_code_edits(previous, update.edits) == update.code
+    assert update.regenerated == 2
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Tests for the command dispatcher: history bounds, coalescing, transactions,
+command logs, undo_many and asynchronous execution
+"""
+
+import sys
+import os
+import time
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import core.settings_service as settings_service
+from core.analysis_cache import get_analysis_cache
+from core.app_core import AppCore
+from core.command_dispatcher import (HISTORY_UNCOMPACTED, AddWidgetCommand, AddWidgetsCommand, AnalyzeCodeCommand,
+                                     Command, CommandDispatcher, CommandResult, GenerateCodeCommand,
+                                     MoveWidgetsCommand, RemoveWidgetsCommand, UpdateWidgetCommand,
+                                     UpdateWidgetsCommand)
+
+
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    """AppCore with settings kept inside tmp_path"""
+    monkeypatch.setattr(settings_service, 'SETTINGS_DIR', str(tmp_path / 'home'))
+    monkeypatch.chdir(tmp_path)
+    app_core = AppCore()
+    app_core.project.name = 'Test'
+    yield app_core
+    get_analysis_cache().set_disk_dir(None)
+
+
+class _PayloadCommand(Command):
+    """Command holding a payload of a given size, changing nothing"""
+    
+    changes_widgets = False
+    
+    def __init__(self, size: int):
+        super().__init__("Payload")
+        self.payload = 'x' * size
+    
+    def execute(self) -> CommandResult:
+        self.executed = True
+        return CommandResult(success=True, message="Payload kept")
+    
+    def undo(self) -> CommandResult:
+        return CommandResult(success=True, message="Payload dropped")
+
+
+def test_history_is_bounded_by_count():
+    dispatcher = CommandDispatcher(max_history=5)
+    commands = [_PayloadCommand(10) for _ in range(8)]
+    for command in commands:
+        dispatcher.execute_command(command)
+    
+    assert list(dispatcher.command_history) == commands[3:]
+    assert dispatcher.evicted_commands == 3
+    assert dispatcher.history_bytes == sum(command.history_size for command in commands[3:])
+
+
+def test_history_is_bounded_by_bytes():
+    dispatcher = CommandDispatcher(max_history=100, max_history_bytes=10000)
+    for _ in range(20):
+        dispatcher.execute_command(_PayloadCommand(1000))
+    assert dispatcher.history_bytes <= 10000
+    assert 1 < len(dispatcher.command_history) < 20
+    
+    # The newest command is kept even when it exceeds the budget alone
+    huge = _PayloadCommand(50000)
+    dispatcher.execute_command(huge)
+    assert list(dispatcher.command_history) == [huge]
+    
+    dispatcher.clear_history()
+    assert dispatcher.history_bytes == 0
+    assert dispatcher.evicted_commands == 0
+
+
+def test_compacted_commands_keep_their_payload(core):
+    dispatcher = CommandDispatcher()
+    code = "def scale(value):\n    return value * 2\n"
+    for _ in range(HISTORY_UNCOMPACTED + 2):
+        dispatcher.execute_command(AddWidgetCommand('QPushButton', {}, core))
+        dispatcher.execute_command(GenerateCodeCommand(core))
+        dispatcher.execute_command(AnalyzeCodeCommand(code, core))
+    
+    history = list(dispatcher.command_history)
+    generated, analyzed = history[1], history[2]
+    assert generated._code is None and 'QPushButton' in generated.generated_code
+    assert analyzed._code is None and analyzed.code == code
+    assert analyzed._analysis is None and analyzed.analysis_result == core.analyze_code(code)
+    
+    while dispatcher.can_undo():
+        assert dispatcher.undo().success
+    assert len(core.project.widgets) == 0
+
+
+def test_drag_is_one_undo_step(core):
+    dispatcher = CommandDispatcher()
+    widget = core.add_widget('QPushButton', {})
+    start = widget.position
+    for i in range(1, 50):
+        dispatcher.execute_command(MoveWidgetsCommand({widget.id: (i, i)}, core))
+    
+    assert len(dispatcher.command_history) == 1
+    assert core.project.widgets[widget.id].position == (49, 49)
+    assert dispatcher.undo().success
+    assert core.project.widgets[widget.id].position == start
+    assert dispatcher.redo().success
+    assert core.project.widgets[widget.id].position == (49, 49)
+
+
+def test_coalescing_stops_at_gesture_and_action_boundaries(core):
+    dispatcher = CommandDispatcher()
+    widget = core.add_widget('QPushButton', {})
+    dispatcher.execute_command(MoveWidgetsCommand({widget.id: (10, 0)}, core, name="Align Left"))
+    dispatcher.execute_command(MoveWidgetsCommand({widget.id: (90, 0)}, core, name="Align Right"))
+    assert len(dispatcher.command_history) == 2
+    
+    dispatcher.break_coalescing()
+    dispatcher.execute_command(MoveWidgetsCommand({widget.id: (90, 20)}, core, name="Align Right"))
+    assert len(dispatcher.command_history) == 3
+    
+    dispatcher.undo()
+    assert core.project.widgets[widget.id].position == (90, 0)
+
+
+def test_transaction_is_one_undo_step(core):
+    dispatcher = CommandDispatcher()
+    with dispatcher.transaction("Add form"):
+        dispatcher.execute_command(AddWidgetCommand('QLabel', {'text': 'Name'}, core))
+        dispatcher.execute_command(AddWidgetCommand('QLineEdit', {}, core))
+    assert len(dispatcher.command_history) == 1
+    assert len(core.project.widgets) == 2
+    
+    assert dispatcher.undo().success
+    assert len(core.project.widgets) == 0
+    assert dispatcher.redo().success
+    assert [widget.type for widget in core.project.widgets] == ['QLabel', 'QLineEdit']
+
+
+def test_nested_transaction_and_rollback(core):
+    dispatcher = CommandDispatcher()
+    dispatcher.begin_transaction("Outer")
+    dispatcher.execute_command(AddWidgetCommand('QLabel', {}, core))
+    dispatcher.begin_transaction("Inner")
+    dispatcher.execute_command(AddWidgetCommand('QPushButton', {}, core))
+    dispatcher.execute_command(AddWidgetCommand('QPushButton', {}, core))
+    assert dispatcher.rollback()
+    assert [widget.type for widget in core.project.widgets] == ['QLabel']
+    
+    with pytest.raises(RuntimeError):
+        with dispatcher.transaction("Failing"):
+            dispatcher.execute_command(AddWidgetCommand('QCheckBox', {}, core))
+            raise RuntimeError("cancelled")
+    assert [widget.type for widget in core.project.widgets] == ['QLabel']
+    
+    assert dispatcher.commit() is not None
+    assert not dispatcher.in_transaction()
+    assert len(dispatcher.command_history) == 1
+    assert dispatcher.undo().success
+    assert len(core.project.widgets) == 0
+
+
+def _design(core):
+    return [(w.id, w.type, w.position, w.size, w.properties) for w in core.project.widgets]
+
+
+def _record_session(dispatcher, core):
+    for i in range(1, 6):
+        dispatcher.execute_command(AddWidgetCommand('QPushButton', {'text': f'Button {i}'}, core))
+        for step in range(3):
+            dispatcher.execute_command(MoveWidgetsCommand({f'widget_{i}': (i * 10 + step, step)}, core))
+        dispatcher.break_coalescing()
+    with dispatcher.transaction("Remove and recolor"):
+        dispatcher.execute_command(RemoveWidgetsCommand(['widget_2'], core))
+        dispatcher.execute_command(UpdateWidgetsCommand({'widget_3': {'color': 'red'}}, core))
+    dispatcher.undo()
+    dispatcher.redo()
+    dispatcher.undo()
+
+
+@pytest.fixture
+def second_core(core):
+    """Another AppCore sharing the settings isolation of core"""
+    app_core = AppCore()
+    app_core.project.name = core.project.name
+    return app_core
+
+
+def test_command_log_replays_the_session(tmp_path, core, second_core):
+    log_path = str(tmp_path / 'session.jsonl')
+    recorder = CommandDispatcher()
+    assert recorder.start_log(log_path)
+    _record_session(recorder, core)
+    recorder.stop_log()
+    
+    player = CommandDispatcher()
+    records = player.read_log(log_path)
+    assert player.replay(records, second_core) == len(records)
+    assert _design(second_core) == _design(core)
+    assert len(player.command_history) == len(recorder.command_history)
+    assert len(player.undo_stack) == len(recorder.undo_stack)
+
+
+def test_saved_history_replays_from_an_empty_project(tmp_path, core, second_core):
+    history_path = str(tmp_path / 'history.json')
+    dispatcher = CommandDispatcher()
+    _record_session(dispatcher, core)
+    assert dispatcher.save_history(history_path)
+    
+    assert CommandDispatcher().load_history(history_path, second_core, replay=True)
+    assert _design(second_core) == _design(core)
+
+
+def test_save_history_refuses_after_eviction(tmp_path, core):
+    history_path = str(tmp_path / 'history.json')
+    dispatcher = CommandDispatcher(max_history=3)
+    _record_session(dispatcher, core)
+    assert dispatcher.evicted_commands > 0
+    
+    assert not dispatcher.save_history(history_path)
+    assert not os.path.exists(history_path)
+    assert dispatcher.save_history(history_path, allow_partial=True)
+
+
+def _edit_session(dispatcher, core, steps):
+    dispatcher.execute_command(AddWidgetsCommand([('QLabel', {'text': f'Label {i}'}) for i in range(20)], core))
+    for i in range(steps):
+        widget_id = f'widget_{i % 20 + 1}'
+        if i % 4 == 0:
+            dispatcher.execute_command(AddWidgetCommand('QPushButton', {}, core))
+        elif i % 4 == 1:
+            dispatcher.execute_command(MoveWidgetsCommand({widget_id: (i, i)}, core))
+        elif i % 4 == 2:
+            dispatcher.execute_command(UpdateWidgetCommand(widget_id, {'color': i}, core))
+        else:
+            with dispatcher.transaction("Remove and add"):
+                dispatcher.execute_command(RemoveWidgetsCommand([widget_id], core))
+                dispatcher.execute_command(AddWidgetCommand('QCheckBox', {}, core))
+            dispatcher.execute_command(GenerateCodeCommand(core))
+
+
+@pytest.mark.parametrize('count', [1, 7, 30, 61])
+def test_undo_many_matches_stepwise_undo(core, second_core, count):
+    stepwise = CommandDispatcher(coalesce_window=0)
+    jumping = CommandDispatcher(coalesce_window=0, core=second_core, snapshot_interval=5)
+    _edit_session(stepwise, core, 60)
+    _edit_session(jumping, second_core, 60)
+    assert _design(second_core) == _design(core)
+    
+    for _ in range(count):
+        assert stepwise.undo().success
+    result = jumping.undo_many(count)
+    assert result.success
+    assert count < 5 or 'replayed' in result.data  # Restored from a snapshot
+    assert _design(second_core) == _design(core)
+    assert len(jumping.command_history) == len(stepwise.command_history)
+    
+    # Undone steps redo one by one as after single undos
+    for _ in range(min(count, 3)):
+        assert stepwise.redo().success
+        assert jumping.redo().success
+        assert _design(second_core) == _design(core)
+
+
+def test_revert_to_undoes_later_commands(core):
+    dispatcher = CommandDispatcher(coalesce_window=0, core=core, snapshot_interval=5)
+    _edit_session(dispatcher, core, 20)
+    expected = _design(core)
+    checkpoint = dispatcher.command_history[-1].executed_at
+    kept = len(dispatcher.command_history)
+    
+    _edit_session(dispatcher, core, 20)
+    # Executed within the same clock tick; place them after the checkpoint
+    for command in list(dispatcher.command_history)[kept:]:
+        command.executed_at = checkpoint + 1
+    assert dispatcher.revert_to(checkpoint).success
+    assert _design(core) == expected
+
+
+class _SleepCommand(Command):
+    """'io' command finishing after a delay"""
+    
+    changes_widgets = False
+    execution_kind = 'io'
+    
+    def __init__(self, label: str, delay: float, finished: list):
+        super().__init__(label)
+        self.delay = delay
+        self.finished = finished
+    
+    def execute(self) -> CommandResult:
+        time.sleep(self.delay)
+        self.finished.append(self.name)
+        self.executed = True
+        return CommandResult(success=True, message=f"Slept {self.delay} s")
+    
+    def undo(self) -> CommandResult:
+        return CommandResult(success=True, message="Nothing to undo")
+
+
+def test_execute_async_records_in_submission_order():
+    dispatcher = CommandDispatcher()
+    finished = []
+    completed = []
+    dispatcher.completion_listeners.append(lambda command, result: completed.append(command.name))
+    try:
+        futures = [dispatcher.execute_async(_SleepCommand(f'sleep {i}', 0.2 - i * 0.05, finished))
+                   for i in range(4)]
+        inline = dispatcher.execute_async(_PayloadCommand(10))
+        # Inline commands run at once but still wait for earlier submissions
+        assert not inline.done()
+        
+        assert all(future.result(timeout=5).success for future in futures + [inline])
+    finally:
+        dispatcher.shutdown()
+    
+    expected = [f'sleep {i}' for i in range(4)]
+    assert finished != expected
+    assert [command.name for command in dispatcher.command_history] == expected + ['Payload']
+    assert completed == expected + ['Payload']
+    assert dispatcher.pending_async() == 0
+
+
+def test_execute_async_keeps_order_of_failed_starts():
+    class _BrokenCommand(_PayloadCommand):
+        def prepare(self):
+            raise RuntimeError("no input")
+    
+    dispatcher = CommandDispatcher()
+    try:
+        first = dispatcher.execute_async(_SleepCommand('sleep', 0.1, []))
+        broken = dispatcher.execute_async(_BrokenCommand(10))
+        last = dispatcher.execute_async(_PayloadCommand(10))
+        assert last.result(timeout=5).success
+        assert first.done() and first.result().success
+        assert not broken.result().success
+    finally:
+        dispatcher.shutdown()
+    assert [command.name for command in dispatcher.command_history] == ['sleep', 'Payload']
+
+
+def test_analysis_runs_in_worker_processes(core):
+    sources = [f"def function_{i}(value):\n    print(value)\n    return value * {i}\n" for i in range(3)]
+    dispatcher = CommandDispatcher(core=core, use_processes=True)
+    try:
+        futures = [dispatcher.execute_async(AnalyzeCodeCommand(source, core)) for source in sources]
+        results = [future.result(timeout=60) for future in futures]
+    finally:
+        dispatcher.shutdown()
+    
+    assert all(result.success for result in results)
+    assert [command.code for command in dispatcher.command_history] == sources
+    for command, source in zip(dispatcher.command_history, sources):
+        assert command.analysis_result == core.analyze_code(source)
+
+
+def test_process_task_needs_finish_task():
+    with pytest.raises(TypeError):
+        class _HalfCommand(_PayloadCommand):
+            def process_task(self):
+                return len, ('payload',)
+    
+    with pytest.raises(TypeError):
+        _PayloadCommand(10).finish_task(7)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the main window: commands it creates and palette undo steps
+"""
+
+import sys
+import os
+import ast
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+GUI_MAIN = os.path.join(os.path.dirname(__file__), 'src', 'gui', 'gui_main.py')
+
+
+def test_commands_used_by_the_window_are_imported():
+    # Runs without PyQt5: a missing import only fails when the action is used
+    with open(GUI_MAIN, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    
+    imported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            imported.update(alias.asname or alias.name for alias in node.names)
+    used = {node.id for node in ast.walk(tree)
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id.endswith('Command')}
+    
+    assert 'AddWidgetCommand' in used
+    assert used <= imported
+
+
+@pytest.fixture
+def window(tmp_path, monkeypatch):
+    pytest.importorskip('PyQt5')
+    monkeypatch.setenv('QT_QPA_PLATFORM', 'offscreen')
+    import core.settings_service as settings_service
+    monkeypatch.setattr(settings_service, 'SETTINGS_DIR', str(tmp_path / 'home'))
+    monkeypatch.chdir(tmp_path)
+    
+    from PyQt5.QtWidgets import QApplication
+    from gui.gui_main import MainWindow
+    app = QApplication.instance() or QApplication([])
+    main_window = MainWindow()
+    yield main_window
+    main_window.command_dispatcher.shutdown()
+    main_window.core.close()
+    app.processEvents()
+
+
+def test_palette_adds_are_one_undo_step_each(window):
+    dispatcher = window.command_dispatcher
+    window.add_widget_to_canvas('QPushButton')
+    window.add_widget_to_canvas('QPushButton')
+    window.add_widget_to_canvas('Label')
+    
+    assert len(dispatcher.command_history) == 3
+    assert [widget.type for widget in window.core.project.widgets] == ['QPushButton', 'QPushButton', 'Label']
+    assert dispatcher.undo().success
+    assert [widget.type for widget in window.core.project.widgets] == ['QPushButton', 'QPushButton']
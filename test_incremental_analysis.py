@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental analysis: merged block results against a full analysis
+after sequences of edits
+"""
+
+import sys
+import os
+import random
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.code_analysis import analyze_source
+from core.incremental_analysis import CLASS_SPLIT_MIN_LINES, IncrementalAnalyzer, _generate_module, split_blocks
+
+
+def _methods(count):
+    lines = []
+    for m in range(count):
+        lines += [f"    def method_{m}(self, value):",
+                  f"        if value > {m}:",
+                  f"            print(value)",
+                  f"        return value",
+                  ""]
+    return lines
+
+
+BASE = '\n'.join([
+    'import os',
+    '',
+    'TEMPLATE = """',
+    'def not_a_function():',
+    'class NotAClass:',
+    '"""',
+    '',
+    'NOTE = "a \\"\\"\\" quote"  # and """ in a comment',
+    '',
+    '',
+    'def helper(items):',
+    '    try:',
+    '        return [x for x in items if x]',
+    '    except:',
+    '        return []',
+    '',
+    '',
+    '@decorator',
+    'class Large(Base):',
+    '    """Large class split into member blocks"""',
+    '    ',
+    '    limit = 10',
+    '',
+] + _methods(10) + [
+    '    @property',
+    '    def size(self):',
+    '        return self.limit',
+    '',
+    '',
+    'if __name__ == "__main__":',
+    '    print(helper([1, 2]))',
+]) + '\n'
+
+
+def _check(analyzer, code):
+    """Incremental result must equal a full analysis (syntax error lines may differ)"""
+    result = analyzer.update(code)
+    full = analyze_source(code)
+    if full.parsed:
+        assert result == full
+    else:
+        assert not result.parsed
+        assert result.functions == result.classes == 0
+    return result
+
+
+def _replace_line(code, old, new):
+    assert code.count(old) == 1
+    return code.replace(old, new)
+
+
+def test_base_source_is_split_and_merged_exactly():
+    assert BASE.count('\n') > CLASS_SPLIT_MIN_LINES
+    blocks = split_blocks(BASE)
+    assert any(block.class_header for block in blocks)
+    assert sum(block.end - block.start for block in blocks) == BASE.count('\n') + 1
+    
+    # Lines inside the triple-quoted string never start blocks
+    lines = BASE.split('\n')
+    starts = {lines[block.start] for block in blocks}
+    assert 'def not_a_function():' not in starts and 'class NotAClass:' not in starts
+    
+    _check(IncrementalAnalyzer(), BASE)
+
+
+def test_edits_inside_a_large_class():
+    analyzer = IncrementalAnalyzer()
+    code = BASE
+    _check(analyzer, code)
+    
+    # Typing into one method re-analyzes only its block
+    code = _replace_line(code, "        if value > 3:", "        if value > 3 and value < 300:")
+    _check(analyzer, code)
+    assert analyzer.stats['reanalyzed'] == 1
+    
+    code = _replace_line(code, "            print(value)\n        return value\n\n    def method_5",
+                         "            if value:\n                if value:\n                    if value:\n"
+                         "                        print(value)\n        return value\n\n    def method_5")
+    result = _check(analyzer, code)
+    assert result.deep_ifs
+    
+    # Add, decorate and delete members
+    code = _replace_line(code, "    limit = 10\n", "    limit = 10\n\n    def added(self):\n        return 1\n")
+    _check(analyzer, code)
+    code = _replace_line(code, "    def method_7(", "    @staticmethod\n    def method_7(")
+    _check(analyzer, code)
+    start = code.index("    def method_2(")
+    code = code[:start] + code[code.index("    def method_3("):]
+    _check(analyzer, code)
+
+
+def test_unclosed_bracket_is_opened_and_closed():
+    analyzer = IncrementalAnalyzer()
+    code = BASE
+    _check(analyzer, code)
+    
+    # Arguments at column 0 look like top-level statements and split the block
+    steps = ["    result = compute(\n",
+             "    result = compute(\nitems,\n",
+             "    result = compute(\nitems,\n\nlater(2),\n",
+             "    result = compute(\nitems,\n\nlater(2),\n)\n"]
+    anchor = "        return []\n"
+    for step in steps:
+        result = _check(analyzer, code.replace(anchor, anchor + step))
+    assert result.parsed
+
+
+def test_unclosed_triple_quote_is_opened_and_closed():
+    analyzer = IncrementalAnalyzer()
+    code = BASE
+    _check(analyzer, code)
+    
+    anchor = "    def method_4(self, value):\n"
+    steps = ['        """Start of a docstring\n',
+             '        """Start of a docstring\n\n    def method_x(self):\n',
+             '        """Start of a docstring\n\n    def method_x(self):\n        """\n']
+    for step in steps:
+        result = _check(analyzer, code.replace(anchor, anchor + step))
+    assert result.parsed
+    
+    anchor = "def helper(items):\n"
+    steps = ["DOC = '''\n", "DOC = '''\ndef inside():\n", "DOC = '''\ndef inside():\n'''\n"]
+    for step in steps:
+        result = _check(analyzer, code.replace(anchor, step + anchor))
+    assert result.parsed
+
+
+# Valid snippets inserted before a line starting with the anchor; their inner
+# lines look like statements at block-start columns
+RANDOM_EDITS = [
+    ('        return value', '        value = (value +\n1)\n'),
+    ('        return value', '        """Text\ndef not_code():\n    """\n'),
+    ('        return value', "        x = 1  # '''\n"),
+    ('        return value', '        if value:\n            if value:\n                if value:\n'
+                            '                    pass\n'),
+    ('    def method_', '    @wrap\n    def extra(self):\n        return [\n    1]\n\n'),
+    ('class Generated', 'TABLE = {\nclass_: 1 for class_ in range(3)\n}\n\n'),
+]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_random_edits_match_full_analysis(seed):
+    rng = random.Random(seed)
+    original = _generate_module(classes=3, methods=8)
+    code = original
+    inserted = []  # (offset, snippet) still in code
+    
+    analyzer = IncrementalAnalyzer()
+    for _ in range(40):
+        if inserted and rng.random() < 0.3:
+            offset, snippet = inserted.pop(rng.randrange(len(inserted)))
+            code = code[:offset] + code[offset + len(snippet):]
+            inserted = [(o - len(snippet) if o > offset else o, t) for o, t in inserted]
+        else:
+            anchor, snippet = rng.choice(RANDOM_EDITS)
+            offset = rng.choice([i + 1 for i in range(len(code)) if code.startswith('\n' + anchor, i)])
+            if any(o <= offset < o + len(t) for o, t in inserted):
+                continue
+            code = code[:offset] + snippet + code[offset:]
+            inserted = [(o + len(snippet) if o >= offset else o, t) for o, t in inserted]
+            inserted.append((offset, snippet))
+        
+        assert _check(analyzer, code).parsed
+    
+    for offset, snippet in sorted(inserted, reverse=True):
+        code = code[:offset] + code[offset + len(snippet):]
+    assert code == original
+    assert _check(analyzer, code) == analyze_source(original)
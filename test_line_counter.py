@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for line counting: agreement with readlines() across chunk and mmap paths
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.line_counter import count_lines, count_lines_many
+from benchmarks.bench_line_counter import count_lines_readlines
+
+
+CONTENTS = {
+    'empty': b'',
+    'one_line': b'print(1)\n',
+    'no_trailing_newline': b'a = 1\nb = 2',
+    'blank_lines': b'\n\n\n',
+    'crlf': b'a = 1\r\nb = 2\r\n',
+    'unicode': 'x = "éè"\ny = "中"\n'.encode('utf-8'),
+    'long': b''.join(b'line %d\n' % i for i in range(1000)) + b'tail',
+}
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = {}
+    for name, content in CONTENTS.items():
+        path = tmp_path / f'{name}.py'
+        path.write_bytes(content)
+        paths[name] = str(path)
+    return paths
+
+
+@pytest.mark.parametrize('name', sorted(CONTENTS))
+@pytest.mark.parametrize('chunk_size, mmap_threshold', [(1024 * 1024, 2**40), (7, 2**40), (7, 1)])
+def test_count_matches_readlines(files, name, chunk_size, mmap_threshold):
+    path = files[name]
+    assert count_lines(path, chunk_size, mmap_threshold) == count_lines_readlines(path)
+
+
+def test_unreadable_file_counts_zero(tmp_path):
+    assert count_lines(str(tmp_path / 'missing.py')) == 0
+    assert count_lines(str(tmp_path)) == 0
+
+
+def test_count_many_keeps_order(files):
+    paths = [files[name] for name in sorted(CONTENTS)]
+    assert count_lines_many(paths) == [count_lines_readlines(path) for path in paths]
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for project files: sqlite (.guiproj) round trip, partial load and conversion
+"""
+
+import sys
+import os
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.project_file import (PROJECT_DB_NAME, PROJECT_JSON_NAME, _sample_project, convert_project_file,
+                               read_project_db, read_project_file, read_project_widgets, write_project_db,
+                               write_project_json)
+
+
+def test_guiproj_round_trip(tmp_path):
+    data = _sample_project(50, 20)
+    data['journal_seq'] = 7
+    path = str(tmp_path / PROJECT_DB_NAME)
+    write_project_db(path, data)
+    
+    assert read_project_db(path) == data
+    assert read_project_widgets(path) == data['widgets']
+
+
+def test_partial_load_skips_analysis(tmp_path):
+    data = _sample_project(10, 1000)
+    db_path = str(tmp_path / PROJECT_DB_NAME)
+    json_path = str(tmp_path / PROJECT_JSON_NAME)
+    write_project_db(db_path, data)
+    write_project_json(json_path, data)
+    
+    for path in (db_path, json_path):
+        partial = read_project_file(path, include_analysis=False)
+        assert partial['widgets'] == data['widgets']
+        assert 'analysis' not in partial['metadata']
+        assert partial['metadata']['author'] == 'bench'
+
+
+def test_convert_between_formats(tmp_path):
+    data = _sample_project(5, 3)
+    json_path = str(tmp_path / PROJECT_JSON_NAME)
+    db_path = str(tmp_path / PROJECT_DB_NAME)
+    write_project_json(json_path, data)
+    
+    assert convert_project_file(json_path, db_path)
+    assert read_project_file(db_path)['widgets'] == data['widgets']
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the project journal: crash recovery, compaction and switching projects
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import core.settings_service as settings_service
+from core.analysis_cache import get_analysis_cache
+from core.app_core import AppCore
+from core.project_file import PROJECT_JSON_NAME, read_project_file, write_project_json
+from core.project_journal import JOURNAL_DIR_NAME, ProjectJournal
+from core.widget_store import WidgetStore
+
+
+@pytest.fixture
+def new_core(tmp_path, monkeypatch):
+    """Factory of AppCores with settings kept inside tmp_path"""
+    monkeypatch.setattr(settings_service, 'SETTINGS_DIR', str(tmp_path / 'home'))
+    monkeypatch.chdir(tmp_path)
+    yield AppCore
+    get_analysis_cache().set_disk_dir(None)
+
+
+def _project_dir(tmp_path, name):
+    path = tmp_path / name
+    path.mkdir()
+    return str(path)
+
+
+def _widget_types(core):
+    return [widget.type for widget in core.project.widgets]
+
+
+def test_replay_recovers_changes_after_snapshot(tmp_path, new_core):
+    project = _project_dir(tmp_path, 'p1')
+    core = new_core()
+    assert core.load_project(project)
+    core.add_widget('QPushButton', {'text': 'saved'})
+    assert core.save_project()
+
+    # Journaled only, then the process "crashes"
+    widget = core.add_widget('QLabel', {'text': 'unsaved'})
+    core.move_widgets({widget.id: (40, 50)})
+    core.journal.sync()
+
+    recovered = new_core()
+    assert recovered.load_project(project)
+    assert _widget_types(recovered) == ['QPushButton', 'QLabel']
+    assert recovered.project.widgets[widget.id].position == (40, 50)
+    assert recovered.project.modified
+
+
+def test_compaction_drops_covered_segments(tmp_path):
+    project = _project_dir(tmp_path, 'p1')
+    store = WidgetStore()
+    journal = ProjectJournal(project)
+    for i in range(5):
+        record = store.add({'type': 'QLabel', 'text': f'Label {i}'})
+        journal.put([record])
+
+    snapshot_path = os.path.join(project, PROJECT_JSON_NAME)
+    assert journal.compact({'name': 'p1', 'widgets': store.to_list()},
+                           lambda data: write_project_json(snapshot_path, data), background=False)
+    assert journal.pending == 0
+    assert list(journal.records()) == []
+
+    data = read_project_file(snapshot_path)
+    assert data['journal_seq'] == 5
+
+    # Records after the snapshot are kept and replayed on top of it
+    journal.remove([store.to_list()[0]['id']])
+    journal.close()
+    loaded = WidgetStore.from_list(data['widgets'])
+    assert ProjectJournal(project, start_seq=5).replay(loaded, after_seq=5) == 1
+    assert len(loaded) == 4
+
+
+def test_switching_projects_journals_into_the_new_project(tmp_path, new_core):
+    first = _project_dir(tmp_path, 'p1')
+    second = _project_dir(tmp_path, 'p2')
+    core = new_core()
+    assert core.load_project(first)
+    core.add_widget('QPushButton', {})
+    assert core.save_project()
+    first_segments = sorted(os.listdir(os.path.join(first, JOURNAL_DIR_NAME)))
+
+    assert core.load_project(second)
+    assert core.journal.directory == os.path.join(second, JOURNAL_DIR_NAME)
+    assert len(core.project.widgets) == 0
+    core.add_widget('QLineEdit', {})
+    core.journal.sync()
+
+    # The first project's journal is untouched
+    assert sorted(os.listdir(os.path.join(first, JOURNAL_DIR_NAME))) == first_segments
+    reopened = new_core()
+    assert reopened.load_project(first)
+    assert _widget_types(reopened) == ['QPushButton']
+    assert reopened.load_project(second)
+    assert _widget_types(reopened) == ['QLineEdit']
+
+
+def test_saving_over_another_project_keeps_its_journal(tmp_path, new_core):
+    first = _project_dir(tmp_path, 'p1')
+    second = _project_dir(tmp_path, 'p2')
+    other = new_core()
+    assert other.load_project(second)
+    other.add_widget('QLabel', {'text': 'unsaved in p2'})
+    other.journal.sync()
+
+    core = new_core()
+    assert core.load_project(first)
+    core.add_widget('QPushButton', {})
+    assert core.save_project(second)
+
+    backups = [name for name in os.listdir(second) if name.startswith(JOURNAL_DIR_NAME + '.bak')]
+    assert len(backups) == 1
+    assert os.listdir(os.path.join(second, backups[0]))
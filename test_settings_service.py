@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the settings service: debounced saving, flush and recent projects
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import weakref
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import core.settings_service as settings_service
+from core.settings_service import RECENT_PROJECTS_LIMIT, SettingsService
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Record the paths the settings service writes to"""
+    paths = []
+    atomic_open = settings_service.atomic_open
+    
+    def counting_open(path, *args, **kwargs):
+        paths.append(path)
+        return atomic_open(path, *args, **kwargs)
+    
+    monkeypatch.setattr(settings_service, 'atomic_open', counting_open)
+    return paths
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_burst_of_changes_is_written_once(tmp_path, writes):
+    service = SettingsService(str(tmp_path / 'settings.json'), save_delay=0.05)
+    for i in range(100):
+        service.set('grid_size', i)
+    assert writes == []
+    
+    time.sleep(0.3)
+    assert writes == [service.path]
+    assert _read(service.path)['grid_size'] == 99
+
+
+def test_flush_writes_pending_changes_now(tmp_path, writes):
+    service = SettingsService(str(tmp_path / 'settings.json'), save_delay=60)
+    service['theme'] = 'dark'
+    assert service.flush()
+    assert _read(service.path)['theme'] == 'dark'
+    
+    # Nothing pending: no second write
+    assert service.flush()
+    assert len(writes) == 1
+
+
+def test_settings_are_loaded_back(tmp_path):
+    path = str(tmp_path / 'settings.json')
+    service = SettingsService(path, save_delay=60)
+    service.update({'theme': 'dark', 'snap_to_grid': True})
+    service.flush()
+    
+    loaded = SettingsService(path, save_delay=60)
+    assert loaded['theme'] == 'dark'
+    assert loaded.get('snap_to_grid') is True
+    assert loaded['autosave_interval'] == 300
+
+
+def test_recent_projects_are_unique_and_limited(tmp_path):
+    service = SettingsService(str(tmp_path / 'settings.json'), save_delay=60)
+    for i in range(RECENT_PROJECTS_LIMIT + 5):
+        service.add_recent_project(f'/projects/p{i}')
+    service.add_recent_project('/projects/p10')
+    
+    recent = service.recent_projects()
+    assert len(recent) == RECENT_PROJECTS_LIMIT
+    assert recent[0] == '/projects/p10'
+    assert recent.count('/projects/p10') == 1
+    
+    service.clear_recent_projects()
+    assert service.recent_projects() == []
+
+
+def test_only_open_services_are_flushed_at_exit(tmp_path, writes):
+    closed = SettingsService(str(tmp_path / 'closed.json'), save_delay=60)
+    closed['theme'] = 'dark'
+    assert closed.close()
+    closed['theme'] = 'changed after close'
+    live = SettingsService(str(tmp_path / 'live.json'), save_delay=60)
+    live['theme'] = 'live'
+    
+    writes.clear()
+    settings_service._flush_open_services()
+    assert [path for path in writes if path.startswith(str(tmp_path))] == [live.path]
+    assert _read(closed.path)['theme'] == 'dark'
+
+
+def test_exit_handler_does_not_keep_services_alive(tmp_path):
+    service = SettingsService(str(tmp_path / 'settings.json'), save_delay=60)
+    reference = weakref.ref(service)
+    del service
+    gc.collect()
+    assert reference() is None
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the spatial grid: stacking order, moves, removal and rectangle
+queries on cell boundaries
+"""
+
+import sys
+import os
+import random
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.spatial_index import SpatialGrid
+from benchmarks.bench_spatial_index import scan_point, scan_rect
+
+CELL = 100
+
+
+def _grid(rects):
+    grid = SpatialGrid(cell_size=CELL)
+    for item_id, rect in rects.items():
+        grid.insert(item_id, rect)
+    return grid
+
+
+def test_query_point_is_topmost_first():
+    grid = _grid({'a': (0, 0, 50, 50), 'b': (10, 10, 50, 50), 'c': (20, 20, 50, 50)})
+    assert grid.query_point(30, 30) == ['c', 'b', 'a']
+    assert grid.query_point(5, 5) == ['a']
+    assert grid.query_point(500, 500) == []
+    
+    grid.set_order(['c', 'a', 'b'])
+    assert grid.query_point(30, 30) == ['b', 'a', 'c']
+    assert grid.query_rect(0, 0, 100, 100) == ['c', 'a', 'b']
+    
+    # New inserts go on top of the restacked ids
+    grid.insert('d', (25, 25, 10, 10))
+    assert grid.query_point(30, 30) == ['d', 'b', 'a', 'c']
+
+
+def test_set_order_skips_unknown_ids():
+    grid = _grid({'a': (0, 0, 10, 10), 'b': (0, 0, 10, 10)})
+    grid.set_order(['b', 'removed', 'a'])
+    assert grid.query_point(5, 5) == ['a', 'b']
+    grid.insert('c', (0, 0, 10, 10))
+    assert grid.query_point(5, 5) == ['c', 'a', 'b']
+
+
+def test_repeat_insert_moves_and_keeps_order():
+    grid = _grid({'a': (0, 0, 50, 50), 'b': (0, 0, 50, 50)})
+    grid.insert('a', (250, 250, 120, 30))
+    
+    assert len(grid) == 2
+    assert grid.get_rect('a') == (250, 250, 120, 30)
+    assert grid.query_point(10, 10) == ['b']
+    assert grid.query_point(360, 260) == ['a']
+    
+    # Moving back keeps the original stacking
+    grid.insert('a', (0, 0, 50, 50))
+    assert grid.query_point(10, 10) == ['b', 'a']
+    assert grid.query_rect(200, 200, 300, 300) == []
+    assert grid._cells == _grid({'a': (0, 0, 50, 50), 'b': (0, 0, 50, 50)})._cells
+
+
+def test_remove():
+    grid = _grid({'a': (0, 0, 150, 150), 'b': (50, 50, 10, 10)})
+    assert grid.remove('a')
+    assert not grid.remove('a')
+    assert 'a' not in grid and grid.get_rect('a') is None
+    assert grid.query_point(120, 120) == []
+    assert grid.query_point(55, 55) == ['b']
+    
+    assert grid.remove('b')
+    assert len(grid) == 0
+    assert grid._cells == {}
+
+
+def test_edges_are_exclusive_on_cell_boundaries():
+    grid = _grid({'left': (0, 0, CELL, CELL), 'right': (CELL, 0, CELL, CELL)})
+    assert grid.query_point(CELL - 0.5, 10) == ['left']
+    assert grid.query_point(CELL, 10) == ['right']
+    assert grid.query_point(2 * CELL, 10) == []
+    
+    assert grid.query_rect(CELL, 0, CELL, CELL) == ['right']
+    assert grid.query_rect(0, 0, CELL, CELL) == ['left']
+    assert grid.query_rect(CELL - 1, 0, 2, 1) == ['left', 'right']
+
+
+def test_query_rect_contained_on_cell_boundaries():
+    grid = _grid({'cell': (CELL, CELL, CELL, CELL),
+                  'inner': (CELL + 10, CELL + 10, 20, 20),
+                  'wide': (CELL, CELL, CELL + 1, CELL),
+                  'before': (CELL - 1, CELL, 10, 10),
+                  'corner': (2 * CELL, 2 * CELL, 0, 0),
+                  'negative': (CELL + 50, CELL + 50, -5, -5)})
+    
+    # The query matching a cell exactly contains rectangles touching its far edges
+    assert grid.query_rect(CELL, CELL, CELL, CELL, contained=True) == ['cell', 'inner', 'corner', 'negative']
+    assert grid.query_rect(CELL, CELL, CELL, CELL) == ['cell', 'inner', 'wide', 'before', 'negative']
+    assert grid.query_rect(CELL, CELL, CELL - 1, CELL, contained=True) == ['inner', 'negative']
+    assert grid.query_rect(0, 0, 3 * CELL, 3 * CELL, contained=True) == list(grid._rects)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_queries_match_linear_scans(seed):
+    rng = random.Random(seed)
+    rects = {f'widget_{i}': (rng.randrange(0, 1000, 25), rng.randrange(0, 1000, 25),
+                             rng.randrange(0, 300, 25), rng.randrange(0, 300, 25)) for i in range(300)}
+    grid = _grid(rects)
+    for item_id in rng.sample(sorted(rects), 50):
+        rects[item_id] = (rng.randrange(0, 1000, 50), rng.randrange(0, 1000, 50), 100, 100)
+        grid.insert(item_id, rects[item_id])
+    
+    for _ in range(200):
+        x, y = rng.randrange(0, 1100, 25), rng.randrange(0, 1100, 25)
+        assert sorted(grid.query_point(x, y)) == sorted(scan_point(rects, x, y))
+        width, height = rng.randrange(0, 400, 50), rng.randrange(0, 400, 50)
+        assert sorted(grid.query_rect(x, y, width, height)) == sorted(scan_rect(rects, x, y, width, height))
+        contained = [item_id for item_id, (rx, ry, rw, rh) in rects.items()
+                     if x <= rx and rx + rw <= x + width and y <= ry and ry + rh <= y + height]
+        assert sorted(grid.query_rect(x, y, width, height, contained=True)) == sorted(contained)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for compact widget records: dict round trip, shared properties and the store
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add src to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.widget_store import DEFAULT_POSITION, WidgetRecord, WidgetStore
+
+
+WIDGET = {
+    'id': 'widget_3',
+    'type': 'QPushButton',
+    'name': 'ok_button',
+    'text': 'OK',
+    'properties': {'text': 'OK', 'position': [40, 50], 'size': [80, 24], 'color': 'blue'},
+    'position': [40, 50],
+    'size': [80, 24],
+    'created': '2024-01-01T12:00:00',
+    'last_modified': '2024-01-02T08:30:00.500000',
+    'tooltip': 'Confirm'  # Unknown keys are kept
+}
+
+
+def _json_round_trip(data):
+    return json.loads(json.dumps(data))
+
+
+def test_dict_round_trip():
+    record = WidgetRecord.from_dict(WIDGET)
+    assert _json_round_trip(record.to_dict()) == WIDGET
+    assert WidgetRecord.from_dict(_json_round_trip(record.to_dict())).same_state(record)
+
+
+def test_dict_compatible_access():
+    record = WidgetRecord.from_dict(WIDGET)
+    assert record['name'] == 'ok_button'
+    assert record.get('position') == (40, 50)
+    assert record.get('tooltip') == 'Confirm'
+    assert record.get('missing', 'default') == 'default'
+    assert 'text' in record and 'missing' not in record
+    with pytest.raises(KeyError):
+        record['missing']
+
+
+def test_properties_keep_their_values_after_a_move():
+    record = WidgetRecord('widget_1', 'QPushButton', text='OK', position=(40, 50), size=(80, 24),
+                          properties={'text': 'OK', 'position': (40, 50), 'size': (80, 24), 'color': 'blue'})
+    record.set_geometry(position=(100, 200), size=(10, 10))
+    assert record.position == (100, 200)
+    assert record.properties == {'text': 'OK', 'position': (40, 50), 'size': (80, 24), 'color': 'blue'}
+    
+    # Properties matching the new geometry are shared again
+    record.update_properties({'position': (100, 200)})
+    record.set_geometry(position=(0, 0))
+    assert record.properties['position'] == (100, 200)
+
+
+def test_geometry_that_does_not_pack_is_kept():
+    record = WidgetRecord('widget_1', 'QLabel', position=(1.5, 2), size=(2**40, 10))
+    assert record.position == (1.5, 2)
+    assert record.size == (2**40, 10)
+    record = WidgetRecord('widget_2', 'QLabel', position=(-5, -(2**31)))
+    assert record.position == (-5, -(2**31))
+
+
+def test_copies_are_independent():
+    record = WidgetRecord.from_dict(WIDGET)
+    copy = record.copy()
+    assert copy.same_state(record)
+    copy.update_properties({'color': 'red'})
+    copy.set_geometry(position=(0, 0))
+    assert record.properties['color'] == 'blue'
+    assert record.position == (40, 50)
+    assert not copy.same_state(record)
+
+
+def test_store_remove_and_insert_restore_design_order():
+    store = WidgetStore({'type': 'QLabel', 'text': f'Label {i}'} for i in range(6))
+    ids = [record.id for record in store]
+    removed = store.remove_many([ids[0], ids[3], ids[5]])
+    assert [record.id for record in store] == [ids[1], ids[2], ids[4]]
+    
+    store.insert_many(removed)
+    assert [record.id for record in store] == ids
+    assert sorted(store.spatial.query_point(*DEFAULT_POSITION)) == sorted(ids)
+
+
+def test_snapshot_restore_shares_unchanged_widgets():
+    store = WidgetStore({'type': 'QLabel'} for _ in range(4))
+    first = store.snapshot()
+    store.move('widget_2', position=(300, 300))
+    store.add({'type': 'QPushButton'})
+    second = store.snapshot(first)
+    assert second[0] is first[0]
+    assert second[1] is not first[1]
+    
+    store.restore(first)
+    assert [record.position for record in store] == [DEFAULT_POSITION] * 4
+    # Ids allocated after the snapshot are not reused
+    assert store.add({'type': 'QCheckBox'}).id == 'widget_6'